@@ -0,0 +1,139 @@
+"""
+    Microbenchmark comparing the legacy text decoder against MessageReader + decode_message.
+Run from repository root: python -m benchmark.bench_decoder
+"""
+import sys
+import time
+
+from crawler_ipx.generic_utils import COMMAND_HEADER, DATA_HEADER
+from crawler_ipx.frame_utils import MessageReader
+from crawler_ipx.frame_utils import decode_message, encode_frame
+
+# ===================================================== CONSTANTS =====================================================
+# Number of messages decoded by each benchmark
+NUMBER_OF_MESSAGES = 200000
+
+# Content sent with each message
+PAYLOAD = 'u:RaspberryPIScorpionIPX\np:Qwerty123'
+
+# Accepted command ids
+COMMAND_IDS = {1, 2, 3}
+# ===================================================== CONSTANTS =====================================================
+
+
+def legacy_decode_response(response_bytes, command_ids, encoding='utf-8'):
+    """
+        Text decoder used by Host.decode_response / Client.decode_server_response before framing, kept as reference.
+    :param response_bytes: "header\\nid\\nvalue" bytes
+    :param command_ids: accepted command ids
+    :param encoding: character encoding key
+    :return: decoded response as dictionary
+    """
+    response = {"Type": None, "ID": None, "Content": None, "Valid": True, "Error": None}
+
+    response_bytes = response_bytes.decode(encoding)
+    response_bytes = response_bytes.split()
+    response["Type"] = response_bytes[0]
+    response["ID"] = response_bytes[1]
+
+    content = ''
+    for index, item in enumerate(response_bytes):
+        if index > 1:
+            content += '\n'
+            content += str(item)
+
+    response["Content"] = content
+
+    if response["Valid"]:
+        if (response["Type"]) == str(COMMAND_HEADER) or str(response["Type"]) == str(DATA_HEADER):
+            response["Valid"] = True
+        else:
+            response["Valid"] = False
+            response["Error"] = "Invalid header ID!"
+
+    if response["Valid"]:
+        id_is_valid = False
+        for command_id in command_ids:
+            if str(command_id) == str(response["ID"]):
+                id_is_valid = True
+                break
+        if not id_is_valid:
+            response["Valid"] = False
+            response["Error"] = "Invalid data/command ID!"
+
+    return response
+
+
+class StreamSource:
+    """
+        In memory replacement of a socket, serves a prebuilt stream through recv_into.
+    """
+    def __init__(self, stream):
+        """
+            Constructor
+        :param stream: bytes to be served
+        """
+        self.stream = memoryview(stream)
+        self.offset = 0
+
+    def recv_into(self, buffer):
+        """
+            Copy next chunk of the stream in buffer, same as socket.recv_into.
+        :param buffer: writable buffer
+        :return: number of bytes copied
+        """
+        size = min(len(buffer), len(self.stream) - self.offset)
+        buffer[:size] = self.stream[self.offset:self.offset + size]
+        self.offset += size
+        return size
+
+
+def bench_legacy(number_of_messages):
+    """
+        Decode legacy text packets.
+    :param number_of_messages: number of messages to decode
+    :return: messages per second
+    """
+    packet = bytes(str(COMMAND_HEADER) + '\n' + '2' + '\n' + PAYLOAD, 'utf-8')
+    packets = [packet] * number_of_messages
+
+    start = time.perf_counter()
+    for packet in packets:
+        legacy_decode_response(packet, COMMAND_IDS)
+    return number_of_messages / (time.perf_counter() - start)
+
+
+def bench_reader(number_of_messages, decode=True):
+    """
+        Parse a framed stream with MessageReader, optionally building the response dictionary.
+    :param number_of_messages: number of messages to decode
+    :param decode: build the decode_message dictionary for each message
+    :return: messages per second
+    """
+    stream = encode_frame(COMMAND_HEADER, 2, bytes(PAYLOAD, 'utf-8')) * number_of_messages
+    source = StreamSource(stream)
+    reader = MessageReader()
+
+    start = time.perf_counter()
+    if decode:
+        for message in reader.read_messages(source):
+            decode_message(message, COMMAND_IDS)
+    else:
+        for _ in reader.read_messages(source):
+            pass
+    return number_of_messages / (time.perf_counter() - start)
+
+
+def main(number_of_messages=NUMBER_OF_MESSAGES):
+    results = [
+        ("legacy decode_response", bench_legacy(number_of_messages)),
+        ("MessageReader + decode_message", bench_reader(number_of_messages)),
+        ("MessageReader parse only", bench_reader(number_of_messages, decode=False)),
+    ]
+    for name, rate in results:
+        print("{:<32} {:>12,.0f} messages/s".format(name, rate))
+    return results
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUMBER_OF_MESSAGES)
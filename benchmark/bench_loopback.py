@@ -0,0 +1,150 @@
+"""
+    End to end benchmark: a Host and a Client connected over loopback exchange ping commands.
+Measures command round trip latency (p50/p95/p99), commands/s and bytes/s for every payload size and concurrency level
+(number of commands in flight at once). Results are printed as a table and returned as a list of dictionaries.
+Run from repository root: python -m benchmark.bench_loopback [--output results.json]
+"""
+import argparse
+import json
+import socket
+import threading
+import time
+
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+from crawler_ipx.frame_utils import FRAME_PREFIX
+
+# ===================================================== CONSTANTS =====================================================
+# Commands sent for every payload size and concurrency level
+NUMBER_OF_COMMANDS = 2000
+
+# Size of the value sent with each ping, echoed back by the client
+PAYLOAD_SIZES = (0, 64, 1024, 16384)
+
+# Number of commands in flight at once
+CONCURRENCY_LEVELS = (1, 8, 32)
+
+# Seconds to wait for a single reply
+REPLY_TIMEOUT = 10.0
+# ===================================================== CONSTANTS =====================================================
+
+
+def percentile(sorted_values, percent):
+    """
+        Get the nearest rank percentile of sorted values.
+    :param sorted_values: values sorted ascending
+    :param percent: percentile, between 0 and 100
+    :return: value
+    """
+    if not sorted_values:
+        return None
+    rank = int(round(percent / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+
+def connect_over_loopback(commands_in_flight):
+    """
+        Start a Host and a Client connected to it over loopback, client running in slave mode.
+    :param commands_in_flight: maximum number of commands waiting for client's reply at once
+    :return: (host, client)
+    """
+    host = Host(port=0, commands_in_flight=commands_in_flight)
+    client = Client(host.get_name(), host.port)
+
+    accepting = threading.Thread(target=host.connect_with_client, daemon=True)
+    accepting.start()
+    client.connect_to_host()
+    accepting.join()
+
+    for sock in (host.client, client.socket):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    threading.Thread(target=client.run_in_slave_mode, daemon=True).start()
+    return host, client
+
+
+def bench_pings(host, payload_size, concurrency, number_of_commands):
+    """
+        Send pings keeping concurrency commands in flight and time every round trip.
+    :param host: Host connected to a client
+    :param payload_size: size of each ping's value in bytes
+    :param concurrency: number of commands in flight at once
+    :param number_of_commands: number of pings to send
+    :return: result as dictionary
+    """
+    value = 'x' * payload_size if payload_size else None
+    window = threading.Semaphore(concurrency)
+    finished = threading.Event()
+    round_trips = []
+    errors = []
+
+    def on_reply(future, sent_at):
+        round_trips.append(time.perf_counter() - sent_at)
+        if future.exception() is not None:
+            errors.append(future.exception())
+        window.release()
+        if len(round_trips) == number_of_commands:
+            finished.set()
+
+    start = time.perf_counter()
+    for _ in range(number_of_commands):
+        window.acquire()
+        sent_at = time.perf_counter()
+        future = host.submit_command(host.commands.ping, value, REPLY_TIMEOUT)
+        future.add_done_callback(lambda done, sent_at=sent_at: on_reply(done, sent_at))
+    finished.wait(REPLY_TIMEOUT)
+    elapsed = time.perf_counter() - start
+
+    round_trips.sort()
+    # ping and its echoed reply
+    frame_size = FRAME_PREFIX.size + payload_size
+    return {
+        "payload_size": payload_size,
+        "concurrency": concurrency,
+        "commands": len(round_trips),
+        "errors": len(errors),
+        "seconds": elapsed,
+        "latency_p50_ms": percentile(round_trips, 50) * 1000.0,
+        "latency_p95_ms": percentile(round_trips, 95) * 1000.0,
+        "latency_p99_ms": percentile(round_trips, 99) * 1000.0,
+        "commands_per_second": len(round_trips) / elapsed,
+        "bytes_per_second": 2 * frame_size * len(round_trips) / elapsed,
+    }
+
+
+def main(number_of_commands=NUMBER_OF_COMMANDS, payload_sizes=PAYLOAD_SIZES, concurrency_levels=CONCURRENCY_LEVELS):
+    host, client = connect_over_loopback(max(concurrency_levels))
+    results = []
+    try:
+        # warm up connection and handlers
+        bench_pings(host, 0, 1, 100)
+
+        for payload_size in payload_sizes:
+            for concurrency in concurrency_levels:
+                results.append(bench_pings(host, payload_size, concurrency, number_of_commands))
+    finally:
+        host.stop_receiver()
+        host.client.close()
+        client.socket.close()
+        host.terminate()
+
+    print("{:>8} {:>5} {:>9} {:>9} {:>9} {:>12} {:>14}".format(
+        "payload", "conc", "p50 ms", "p95 ms", "p99 ms", "commands/s", "bytes/s"))
+    for result in results:
+        print("{payload_size:>8} {concurrency:>5} {latency_p50_ms:>9.3f} {latency_p95_ms:>9.3f} "
+              "{latency_p99_ms:>9.3f} {commands_per_second:>12,.0f} {bytes_per_second:>14,.0f}".format(**result))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Host/Client loopback latency and throughput benchmark")
+    parser.add_argument('--commands', type=int, default=NUMBER_OF_COMMANDS)
+    parser.add_argument('--payload-sizes', type=int, nargs='+', default=PAYLOAD_SIZES)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=CONCURRENCY_LEVELS)
+    parser.add_argument('--output', help="write results to this JSON file")
+    arguments = parser.parse_args()
+
+    loopback_results = main(arguments.commands, arguments.payload_sizes, arguments.concurrency)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(loopback_results, output, indent=2)
@@ -0,0 +1,336 @@
+"""
+    Scaling benchmark: virtual crawlers (real Clients doing the full handshake and answering commands in slave mode)
+are added to a HostServer step by step until the host saturates.
+For every number of clients, pings are sent round robin to every client and the host reports command round trip
+latency (p50/p99), commands/s and the CPU time its event loop spent per client. The host is saturated when clients
+fail to connect, commands fail or p99 latency exceeds --latency-limit. Crawlers run as threads of this process or,
+with --mode process, in worker processes so their CPU time is not mixed with the host's.
+Run from repository root: python -m benchmark.bench_scaling [--clients 1 8 32 64] [--mode process]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+
+from crawler_ipx.host_commands_constants import PING_CMD_ID
+from crawler_ipx.telemetry import SPEED_CHANNEL
+from crawler_ipx.host_server import HostServer
+from crawler_ipx.client import Client
+
+from benchmark.bench_loopback import percentile
+
+# ===================================================== CONSTANTS =====================================================
+# Numbers of connected clients measured, in increasing order
+CLIENT_COUNTS = (1, 4, 16, 32)
+
+# Seconds pings are sent at every number of clients
+STEP_DURATION = 1.0
+
+# Pings in flight at once for every client
+COMMANDS_PER_CLIENT = 2
+
+# Seconds every virtual crawler's handler sleeps before replying, simulating the crawler's work
+HANDLER_DELAY = 0.0
+
+# Telemetry samples recorded by every virtual crawler per second, 0 for no telemetry
+TELEMETRY_RATE = 50.0
+
+# p99 round trip latency above which the host is considered saturated, in milliseconds
+LATENCY_LIMIT_MS = 100.0
+
+# Seconds to wait for clients to connect or for a single reply
+CONNECT_TIMEOUT = 10.0
+REPLY_TIMEOUT = 10.0
+
+# Ways of running virtual crawlers
+THREAD_MODE = 'thread'
+PROCESS_MODE = 'process'
+# ===================================================== CONSTANTS =====================================================
+
+
+class VirtualCrawler:
+    """
+        Class used to simulate a crawler: a Client connected to the host with the real handshake, answering host's
+    commands in slave mode after handler_delay seconds and recording telemetry_rate telemetry samples per second.
+    """
+    def __init__(self, host, port, handler_delay=HANDLER_DELAY, telemetry_rate=TELEMETRY_RATE):
+        """
+            Constructor
+        :param host: host's name or ip as string
+        :param port: host's communication port as integer
+        :param handler_delay: seconds slept by ping's handler before replying
+        :param telemetry_rate: telemetry samples recorded per second, 0 for no telemetry
+        """
+        self.client = Client(host, port)
+        self.telemetry_rate = telemetry_rate
+        self.running = False
+
+        if handler_delay:
+            @self.client.handlers.register(PING_CMD_ID)
+            def delayed_ping(client, host_command, value, request_id):
+                time.sleep(handler_delay)
+                client.send_data(client.data.command_accepted, value, request_id)
+
+    def start(self):
+        """
+            Connect to the host and start answering its commands and sending telemetry.
+        :return: True if connected, False otherwise
+        """
+        if not self.client.connect_to_host():
+            return False
+
+        self.running = True
+        threading.Thread(target=self.client.run_in_slave_mode, daemon=True).start()
+        if self.telemetry_rate:
+            threading.Thread(target=self.__record_telemetry__, daemon=True).start()
+        return True
+
+    def __record_telemetry__(self):
+        """
+            Telemetry thread's loop: record a speed sample every 1 / telemetry_rate seconds.
+        :return: None
+        """
+        interval = 1.0 / self.telemetry_rate
+        while self.running:
+            self.client.record_telemetry(SPEED_CHANNEL, 1.0)
+            time.sleep(interval)
+
+    def stop(self):
+        """
+            Stop telemetry and disconnect from the host.
+        :return: None
+        """
+        self.running = False
+        self.client.terminate()
+
+
+def run_virtual_crawlers(host, port, count, handler_delay, telemetry_rate, connected, stop):
+    """
+        Worker process' entry point: start count virtual crawlers and keep them running until stop is set.
+    :param host: host's name or ip as string
+    :param port: host's communication port as integer
+    :param count: number of virtual crawlers started
+    :param handler_delay: seconds slept by ping's handler before replying
+    :param telemetry_rate: telemetry samples recorded per second by every crawler
+    :param connected: multiprocessing.Value incremented for every connected crawler
+    :param stop: multiprocessing.Event set to stop the crawlers
+    :return: None
+    """
+    crawlers = []
+    for _ in range(count):
+        crawler = VirtualCrawler(host, port, handler_delay, telemetry_rate)
+        if crawler.start():
+            crawlers.append(crawler)
+            with connected.get_lock():
+                connected.value += 1
+    stop.wait()
+    for crawler in crawlers:
+        crawler.stop()
+
+
+class CrawlerFleet:
+    """
+        Class used to add virtual crawlers to a host, as threads of this process or in worker processes.
+    """
+    def __init__(self, host, port, mode=THREAD_MODE, handler_delay=HANDLER_DELAY, telemetry_rate=TELEMETRY_RATE):
+        """
+            Constructor
+        :param host: host's name or ip as string
+        :param port: host's communication port as integer
+        :param mode: THREAD_MODE or PROCESS_MODE
+        :param handler_delay: seconds slept by ping's handler before replying
+        :param telemetry_rate: telemetry samples recorded per second by every crawler
+        """
+        if mode not in (THREAD_MODE, PROCESS_MODE):
+            error = "Invalid mode: {}!".format(mode) + "\nExpected {} or {}!".format(THREAD_MODE, PROCESS_MODE)
+            raise NameError(error)
+
+        self.host = host
+        self.port = port
+        self.mode = mode
+        self.handler_delay = handler_delay
+        self.telemetry_rate = telemetry_rate
+
+        # crawlers started in this process
+        self.crawlers = []
+
+        # worker processes, sharing the connected counter and stop event
+        context = multiprocessing.get_context('spawn')
+        self.context = context
+        self.processes = []
+        self.connected = context.Value('i', 0)
+        self.stop_event = context.Event()
+
+    def add(self, count):
+        """
+            Start count more virtual crawlers, returns once they tried to connect.
+        :param count: number of virtual crawlers added
+        :return: number of connected crawlers
+        """
+        if self.mode == THREAD_MODE:
+            for _ in range(count):
+                crawler = VirtualCrawler(self.host, self.port, self.handler_delay, self.telemetry_rate)
+                if crawler.start():
+                    self.crawlers.append(crawler)
+            return len(self.crawlers)
+
+        expected = self.connected.value + count
+        process = self.context.Process(target=run_virtual_crawlers, daemon=True, args=(
+            self.host, self.port, count, self.handler_delay, self.telemetry_rate, self.connected, self.stop_event))
+        process.start()
+        self.processes.append(process)
+
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while self.connected.value < expected and process.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.connected.value
+
+    def stop(self):
+        """
+            Stop every virtual crawler.
+        :return: None
+        """
+        for crawler in self.crawlers:
+            crawler.stop()
+        self.crawlers = []
+
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(CONNECT_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+
+def get_loop_cpu_time(server):
+    """
+        Get CPU time spent by the server's event loop thread.
+    :param server: HostServer running in its thread
+    :return: seconds
+    """
+    async def read_thread_time():
+        return time.thread_time()
+    return server.call(read_thread_time(), REPLY_TIMEOUT)
+
+
+async def ping(server, client_name):
+    """
+        Ping a client and wait for its reply on the server's event loop.
+    :param server: HostServer running in its thread
+    :param client_name: name of the pinged client
+    :return: client's decoded reply
+    """
+    future = await server.submit_command(client_name, server.commands.ping, None, REPLY_TIMEOUT)
+    return await future
+
+
+def bench_clients(server, duration, commands_per_client):
+    """
+        Ping every connected client round robin for duration seconds and measure the host.
+    :param server: HostServer running in its thread
+    :param duration: seconds pings are sent
+    :param commands_per_client: pings in flight at once for every client
+    :return: result as dictionary
+    """
+    client_names = server.get_client_names()
+    window = threading.Semaphore(commands_per_client * len(client_names))
+    lock = threading.Lock()
+    round_trips = []
+    errors = []
+    sent = [0]
+
+    def on_reply(future, sent_at):
+        with lock:
+            round_trips.append(time.perf_counter() - sent_at)
+            if future.exception() is not None:
+                errors.append(future.exception())
+        window.release()
+
+    messages_start = server.metrics.messages_received.value
+    cpu_start = get_loop_cpu_time(server)
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for client_name in client_names:
+            if not window.acquire(timeout=REPLY_TIMEOUT):
+                break
+            sent_at = time.perf_counter()
+            future = asyncio.run_coroutine_threadsafe(ping(server, client_name), server.loop)
+            sent[0] += 1
+            future.add_done_callback(lambda done, sent_at=sent_at: on_reply(done, sent_at))
+
+    # wait for the pings in flight
+    for _ in range(commands_per_client * len(client_names)):
+        window.acquire(timeout=REPLY_TIMEOUT)
+    elapsed = time.perf_counter() - start
+    cpu_time = get_loop_cpu_time(server) - cpu_start
+
+    round_trips.sort()
+    return {
+        "clients": len(client_names),
+        "commands": len(round_trips),
+        "errors": len(errors) + sent[0] - len(round_trips),
+        "seconds": elapsed,
+        "latency_p50_ms": (percentile(round_trips, 50) or 0.0) * 1000.0,
+        "latency_p99_ms": (percentile(round_trips, 99) or 0.0) * 1000.0,
+        "commands_per_second": len(round_trips) / elapsed,
+        "host_cpu_percent": cpu_time / elapsed * 100.0,
+        "host_cpu_ms_per_client": cpu_time / elapsed / max(1, len(client_names)) * 1000.0,
+        "messages_received_per_second": (server.metrics.messages_received.value - messages_start) / elapsed,
+    }
+
+
+def main(client_counts=CLIENT_COUNTS, mode=THREAD_MODE, duration=STEP_DURATION, handler_delay=HANDLER_DELAY,
+         telemetry_rate=TELEMETRY_RATE, commands_per_client=COMMANDS_PER_CLIENT, latency_limit_ms=LATENCY_LIMIT_MS):
+    server = HostServer(name='127.0.0.1', port=0, max_clients=max(client_counts),
+                        commands_in_flight=commands_per_client)
+    server.start_in_thread()
+    fleet = CrawlerFleet('127.0.0.1', server.port, mode, handler_delay, telemetry_rate)
+    results = []
+    try:
+        for client_count in client_counts:
+            connected = fleet.add(client_count - len(server.clients))
+            deadline = time.monotonic() + CONNECT_TIMEOUT
+            while len(server.clients) < connected and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            result = bench_clients(server, duration, commands_per_client)
+            result["expected_clients"] = client_count
+            result["saturated"] = result["clients"] < client_count or result["errors"] > 0 or \
+                result["latency_p99_ms"] > latency_limit_ms
+            results.append(result)
+            if result["saturated"]:
+                break
+    finally:
+        fleet.stop()
+        server.stop_thread()
+
+    print("{:>8} {:>9} {:>9} {:>12} {:>8} {:>14} {:>10}".format(
+        "clients", "p50 ms", "p99 ms", "commands/s", "cpu %", "cpu ms/client", "saturated"))
+    for result in results:
+        print("{clients:>8} {latency_p50_ms:>9.3f} {latency_p99_ms:>9.3f} {commands_per_second:>12,.0f} "
+              "{host_cpu_percent:>8.1f} {host_cpu_ms_per_client:>14.3f} {saturated!s:>10}".format(**result))
+
+    unsaturated = [result["clients"] for result in results if not result["saturated"]]
+    print("Max clients before saturation: {}".format(max(unsaturated) if unsaturated else 0))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HostServer scaling benchmark with virtual crawlers")
+    parser.add_argument('--clients', type=int, nargs='+', default=CLIENT_COUNTS)
+    parser.add_argument('--mode', choices=(THREAD_MODE, PROCESS_MODE), default=THREAD_MODE)
+    parser.add_argument('--duration', type=float, default=STEP_DURATION)
+    parser.add_argument('--handler-delay', type=float, default=HANDLER_DELAY)
+    parser.add_argument('--telemetry-rate', type=float, default=TELEMETRY_RATE)
+    parser.add_argument('--commands-per-client', type=int, default=COMMANDS_PER_CLIENT)
+    parser.add_argument('--latency-limit', type=float, default=LATENCY_LIMIT_MS)
+    parser.add_argument('--output', help="write results to this JSON file")
+    arguments = parser.parse_args()
+
+    scaling_results = main(arguments.clients, arguments.mode, arguments.duration, arguments.handler_delay,
+                           arguments.telemetry_rate, arguments.commands_per_client, arguments.latency_limit)
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(scaling_results, output, indent=2)
@@ -0,0 +1,77 @@
+"""
+    Cold start benchmark: package import time in a fresh interpreter and Host/Client construction time.
+Run from repository root: python -m benchmark.bench_startup
+"""
+import subprocess
+import sys
+import time
+
+# ===================================================== CONSTANTS =====================================================
+# Fresh interpreters started to time imports
+NUMBER_OF_IMPORTS = 10
+
+# Host and Client objects constructed to time construction
+NUMBER_OF_CONSTRUCTIONS = 50
+
+# Code timed in a fresh interpreter, prints seconds spent importing
+IMPORT_CODE = "import time; start = time.perf_counter(); import {}; print(time.perf_counter() - start)"
+# ===================================================== CONSTANTS =====================================================
+
+
+def bench_import(module, number_of_imports):
+    """
+        Time a module's import in fresh interpreters.
+    :param module: module to import
+    :param number_of_imports: number of interpreters started
+    :return: median seconds
+    """
+    durations = []
+    for _ in range(number_of_imports):
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_CODE.format(module)])
+        durations.append(float(output.split()[-1]))
+    durations.sort()
+    return durations[len(durations) // 2]
+
+
+def bench_construction(number_of_constructions):
+    """
+        Time Host and Client construction, the first ones pay for the shared command registry.
+    :param number_of_constructions: number of objects constructed
+    :return: (first host seconds, average host seconds, first client seconds, average client seconds)
+    """
+    from crawler_ipx.host import Host
+    from crawler_ipx.client import Client
+
+    def construct(factory):
+        durations = []
+        for _ in range(number_of_constructions):
+            start = time.perf_counter()
+            instance = factory()
+            durations.append(time.perf_counter() - start)
+            instance.socket.close()
+        return durations[0], sum(durations[1:]) / max(1, len(durations) - 1)
+
+    first_host, average_host = construct(lambda: Host(port=0))
+    first_client, average_client = construct(lambda: Client('localhost'))
+    return first_host, average_host, first_client, average_client
+
+
+def main(number_of_imports=NUMBER_OF_IMPORTS, number_of_constructions=NUMBER_OF_CONSTRUCTIONS):
+    results = {
+        "import_crawler_ipx_ms": bench_import('crawler_ipx', number_of_imports) * 1000.0,
+        "import_host_ms": bench_import('crawler_ipx.host', number_of_imports) * 1000.0,
+        "import_client_ms": bench_import('crawler_ipx.client', number_of_imports) * 1000.0,
+    }
+    first_host, average_host, first_client, average_client = bench_construction(number_of_constructions)
+    results["first_host_ms"] = first_host * 1000.0
+    results["host_ms"] = average_host * 1000.0
+    results["first_client_ms"] = first_client * 1000.0
+    results["client_ms"] = average_client * 1000.0
+
+    for name, value in results.items():
+        print("{:<24} {:>10.3f}".format(name, value))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+    Run every benchmark and write their results to benchmark-reports/results.json.
+With --baseline, loopback results are compared with a previous results.json and the run fails when commands/s dropped or
+p99 latency grew by more than --tolerance.
+Run from repository root: python -m benchmark.run_all [--baseline previous.json]
+"""
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import sys
+
+# ===================================================== CONSTANTS =====================================================
+# Directory results are written to
+OUTPUT_DIRECTORY = 'benchmark-reports'
+
+# Allowed relative degradation before a result is reported as regression
+TOLERANCE = 0.2
+# ===================================================== CONSTANTS =====================================================
+
+
+def run_benchmarks():
+    """
+        Run main() of every bench_* module of this package.
+    :return: dictionary module name: results
+    """
+    results = {}
+    package_directory = os.path.dirname(os.path.abspath(__file__))
+    for module_info in sorted(pkgutil.iter_modules([package_directory]), key=lambda info: info.name):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmark.' + module_info.name)
+        print("Running {}...".format(module_info.name))
+        results[module_info.name] = module.main()
+    return results
+
+
+def find_regressions(results, baseline, tolerance=TOLERANCE):
+    """
+        Compare loopback results with a baseline.
+    :param results: results returned by run_benchmarks
+    :param baseline: results of a previous run
+    :param tolerance: allowed relative degradation
+    :return: list of regressions as strings
+    """
+    previous_results = {
+        (result["payload_size"], result["concurrency"]): result for result in baseline.get('bench_loopback', [])
+    }
+
+    regressions = []
+    for result in results.get('bench_loopback', []):
+        key = (result["payload_size"], result["concurrency"])
+        previous = previous_results.get(key)
+        if previous is None:
+            continue
+
+        if result["commands_per_second"] < previous["commands_per_second"] * (1 - tolerance):
+            regressions.append("payload={} concurrency={}: {:.0f} commands/s, was {:.0f}".format(
+                key[0], key[1], result["commands_per_second"], previous["commands_per_second"]))
+
+        if result["latency_p99_ms"] > previous["latency_p99_ms"] * (1 + tolerance):
+            regressions.append("payload={} concurrency={}: p99 {:.3f} ms, was {:.3f} ms".format(
+                key[0], key[1], result["latency_p99_ms"], previous["latency_p99_ms"]))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every benchmark")
+    parser.add_argument('--baseline', help="results.json of a previous run to compare with")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    arguments = parser.parse_args()
+
+    results = run_benchmarks()
+
+    os.makedirs(OUTPUT_DIRECTORY, exist_ok=True)
+    with open(os.path.join(OUTPUT_DIRECTORY, 'results.json'), 'w') as output:
+        json.dump(results, output, indent=2)
+
+    if arguments.baseline is None:
+        return 0
+
+    with open(arguments.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    regressions = find_regressions(results, baseline, arguments.tolerance)
+    for regression in regressions:
+        print("Regression: " + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,15 @@
 import logging
+from crawler_ipx.log_utils import configure_logging, get_log_file_path
 from crawler_ipx.client import Client
 
 test_host = '192.168.100.15'
 
+configure_logging(logging.DEBUG, log_file=get_log_file_path())
 logger = logging.getLogger('ipx_logger')
 
 logger.info("Running client from bat script\n\n")
 
-ipx_client = Client(test_host)
+ipx_client = Client(test_host, auto_reconnect=True)
 ipx_client.connect_to_host()
 ipx_client.run_in_slave_mode()
 
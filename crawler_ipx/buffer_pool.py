@@ -0,0 +1,99 @@
+import logging
+import threading
+
+from collections import deque
+
+logger = logging.getLogger('ipx_logger.buffer_pool')
+
+
+class FrameBuffer:
+    """
+        Class used to hold a frame in a reusable bytearray.
+    Only the first length bytes are meaningful, the rest of the buffer is left over from previous frames.
+    """
+    __slots__ = ('data', 'view', 'length', 'frame_number', 'captured_at')
+
+    def __init__(self, size):
+        """
+            Constructor
+        :param size: buffer's size in bytes
+                     example: 524288
+        """
+        self.data = bytearray(size)
+        self.view = memoryview(self.data)
+        self.length = 0
+        self.frame_number = 0
+        self.captured_at = 0.0
+
+    def ensure_size(self, size):
+        """
+            Grow the buffer if it cannot hold size bytes, content is not preserved.
+        :param size: required size in bytes
+        :return: True if the buffer had to be reallocated, False otherwise
+        """
+        if len(self.data) >= size:
+            return False
+        self.data = bytearray(size)
+        self.view = memoryview(self.data)
+        return True
+
+    def get_frame(self):
+        """
+            Get frame's content, valid until the buffer is released back to its pool.
+        :return: memoryview
+        """
+        return self.view[:self.length]
+
+
+class BufferPool:
+    """
+        Class used to recycle frame buffers, so streaming does not allocate memory for every frame.
+    """
+    def __init__(self, buffer_size, count):
+        """
+            Constructor
+        :param buffer_size: size of each buffer in bytes
+                            example: 524288
+        :param count: number of buffers allocated up front
+                      example: 4
+        """
+        self.buffer_size = buffer_size
+        self.buffers = deque(FrameBuffer(buffer_size) for _ in range(count))
+        self.lock = threading.Lock()
+
+        # number of buffers allocated after construction: pool was empty or buffer was too small
+        self.allocations = 0
+
+    def acquire(self, size=0):
+        """
+            Get a free buffer able to hold size bytes.
+        :param size: minimum required size in bytes
+        :return: FrameBuffer
+        """
+        with self.lock:
+            buffer = self.buffers.popleft() if self.buffers else None
+
+        if buffer is None:
+            self.allocations += 1
+            buffer = FrameBuffer(max(size, self.buffer_size))
+        elif buffer.ensure_size(size):
+            self.allocations += 1
+
+        buffer.length = 0
+        return buffer
+
+    def release(self, buffer):
+        """
+            Give a buffer back to the pool.
+        :param buffer: FrameBuffer obtained with acquire
+        :return: None
+        """
+        with self.lock:
+            self.buffers.append(buffer)
+
+    def get_available(self):
+        """
+            Get number of free buffers.
+        :return: integer
+        """
+        return len(self.buffers)
@@ -1,24 +1,79 @@
 import logging
+import random
 import socket as py_socket
+import threading
+import time
+
+from collections import OrderedDict
 
 from .generic_utils import DEFAULT_PORT as GU_DP
-from .generic_utils import BUFFER_SIZE
+from .generic_utils import VIDEO_PORT_OFFSET as GU_VPO
+from .generic_utils import TELEMETRY_BATCH_SIZE as GU_TBS
+from .generic_utils import TELEMETRY_FLUSH_INTERVAL as GU_TFI
+from .generic_utils import AUTHENTICATION_TIMEOUT as GU_AT
+from .generic_utils import HEARTBEAT_INTERVAL as GU_HI
+from .generic_utils import DEAD_PEER_TIMEOUT as GU_DPT
+from .generic_utils import RECONNECT_INITIAL_DELAY as GU_RID
+from .generic_utils import RECONNECT_MAX_DELAY as GU_RMD
+from .generic_utils import SESSION_REPLIES as GU_SR
 from .generic_utils import COMMAND_HEADER, DATA_HEADER
 from .generic_utils import CLIENT_USERNAME as GU_USR
 from .generic_utils import CLIENT_PASSWORD as GU_PWD
 
-from .host_utils import HostCommands
-from .client_utils import ClientCommands
-from .generic_data import DataIPX
-
-logger = logging.getLogger('ipx_logger')
+from .frame_utils import FRAME_HEADER, MessageReader
+from .frame_utils import COMPRESSED_FLAG, NO_REQUEST_ID
+from .frame_utils import decode_batch, decode_message, encode_batch, encode_typed_value, encode_value
+
+from .command_registry import get_registry
+from .dispatch_utils import CommandDispatcher
+from .metrics import Metrics
+from .control_channel import ControlChannelReceiver
+from .heartbeat import Heartbeat
+from .scheduler import OutboundScheduler
+from .scheduler import get_priority
+from .recorder import RECEIVED, SENT
+from .recorder import FrameRecorder
+from .recorder import get_recording_path
+from .compression import ZLIB_COMPRESSION
+from .compression import PayloadCompressor
+from .handshake import HEARTBEAT_CHANNEL
+from .handshake import CAPABILITIES_FIELD, PASSWORD_FIELD, TOKEN_FIELD, USERNAME_FIELD
+from .handshake import Capabilities
+from .handshake import decode_handshake, encode_handshake, read_capabilities
+from .telemetry import TELEMETRY_SAMPLE
+from .telemetry import TelemetryBatcher
+from .video_streaming import VideoStreamer
+from .video_streaming import create_default_frame_source
+
+
+from .host_commands_constants import ASK_CLIENT_FOR_CREDENTIALS_CMD_ID
+from .host_commands_constants import START_VIDEO_STREAMING_CMD_ID
+from .host_commands_constants import STOP_VIDEO_STREAMING_CMD_ID
+from .host_commands_constants import OPEN_CONTROL_CHANNEL_CMD_ID
+from .host_commands_constants import SET_SPEED_CMD_ID
+from .host_commands_constants import SET_STEERING_CMD_ID
+from .host_commands_constants import PING_CMD_ID
+from .host_commands_constants import HEARTBEAT_CMD_ID
+from .host_commands_constants import SESSION_CMD_ID
+from .host_commands_constants import BATCH_CMD_ID
+
+logger = logging.getLogger('ipx_logger.client')
 
 
 class Client:
     """
         Class used to control client.
+    Host's commands are run by the handlers registered in Client.handlers, new capabilities are added with:
+        @Client.handlers.register(COMMAND_ID)
+        def handler(client, host_command, value, request_id):
+            ...
     """
-    def __init__(self, host, port=GU_DP, username=GU_USR, password=GU_PWD):
+    # default handlers of host's commands, copied by each instance
+    handlers = CommandDispatcher()
+
+    def __init__(self, host, port=GU_DP, username=GU_USR, password=GU_PWD, frame_source=None, auto_reconnect=False,
+                 heartbeat_interval=GU_HI, dead_peer_timeout=GU_DPT, capabilities=None, compression=None,
+                 coalesce_commands=False):
         """
             Constructor
         :param host: remote host's name or ip to connect to as string
@@ -29,6 +84,17 @@ class Client:
                          example: 'RaspberryPIScorpionIPX'
         :param password: client's password required for authentication as string
                          example: 'Qwerty123'
+        :param frame_source: video frames source as FrameSource type from video_streaming.py
+                             None uses RaspberryPi's camera if available, synthetic frames otherwise
+        :param auto_reconnect: reconnect to host when connection is lost while in slave mode
+        :param heartbeat_interval: seconds between heartbeats sent to host
+                                   example: 0.25
+        :param dead_peer_timeout: seconds without receiving anything from host before connection is dropped
+                                  example: 1.0
+        :param capabilities: Capabilities offered to host, see handshake.py; None for every default capability
+        :param compression: PayloadCompressor used once zlib compression is negotiated, None for default settings
+        :param coalesce_commands: run only the latest value of value_required commands already received,
+                                  last value wins
         """
         try:
             logger.debug("Initiating client...")
@@ -44,17 +110,87 @@ class Client:
             self.username = username
             self.password = password
 
-            # initiate commands that can be sent by client
-            self.commands = ClientCommands()
+            # constant time look up of commands and data
+            self.registry = get_registry()
+
+            # commands that can be sent by client, shared read only catalog
+            self.commands = self.registry.client_commands
+
+            # commands that can be sent by host, shared read only catalog
+            self.host_commands = self.registry.host_commands
+
+            # counters and histograms, see get_metrics
+            self.metrics = Metrics('client')
+
+            # handlers of host's commands, may be customized per instance
+            self.handlers = Client.handlers.copy()
+            self.handlers.execution_time = self.metrics.handler_time
+
+            # video streaming, see start_video_streaming
+            self.frame_source = frame_source
+            self.video_streamer = None
+
+            # value commands received over UDP, see open_control_channel
+            self.control_channel = None
+
+            # latest values set by host
+            self.speed = None
+            self.steering = None
+
+            # connection supervision, see connect_to_host
+            self.auto_reconnect = auto_reconnect
+            self.heartbeat_interval = heartbeat_interval
+            self.dead_peer_timeout = dead_peer_timeout
+            self.heartbeat = None
+            self.connection_lost_at = None
+            self.terminated = threading.Event()
+
+            # session given by host, resumed on reconnection instead of sending credentials
+            self.session_token = None
+            self.session_resumed = False
 
-            # initiate commands that can be sent by host
-            self.host_commands = HostCommands()
+            # request id: (data, payload) of the latest replies, sent again if host resends their command
+            self.session_replies = OrderedDict()
 
-            # initiate data that can be send or received
-            self.data = DataIPX()
+            # replies of the batch being run, collected instead of being sent, see run_batch
+            self.batch_request_id = None
+            self.batch_replies = None
+
+            # capabilities offered to host and the ones negotiated with it, see connect_to_host
+            self.capabilities = Capabilities() if capabilities is None else capabilities
+            self.negotiated = self.capabilities
+
+            # values of commands and data declaring a value type sent in binary, if negotiated with host
+            self.typed_values = False
+
+            # payload compression, used only if negotiated with host
+            self.compression = PayloadCompressor() if compression is None else compression
+            self.compressor = None
+
+            # records every frame sent and received, see start_recording
+            self.recorder = None
+
+            # batched telemetry, see start_telemetry
+            self.telemetry = None
+
+            # frames are sent by slave mode, heartbeat and telemetry threads, highest priority class first
+            self.scheduler = OutboundScheduler()
+            self.scheduler.wait_time = self.metrics.send_wait
+
+            # ids of value commands skipped when a newer value is already received, see __serve_host__
+            self.coalesced_command_ids = frozenset()
+            if coalesce_commands:
+                self.coalesced_command_ids = frozenset(
+                    command.id for command in self.host_commands if command.value_required)
+
+            # data that can be send or received, shared read only catalog
+            self.data = self.registry.data
 
             self.encoding = 'utf-8'
 
+            # rebuilds frames received from host
+            self.receiver = MessageReader()
+
             logger.debug("Client initiated!")
 
         except Exception as err:
@@ -73,87 +209,170 @@ class Client:
             encoding = self.encoding
         return bytes(_string, encoding)
 
-    def decode_server_response(self, server_response):
+    def receive_frame(self):
         """
-            Method decodes client's response.
-        :param server_response: bytes received from client
-        :return:
-        """
-        response = {"Type": None, "ID": None, "Content": None, "Valid": True, "Error": None}
-
-        server_response = server_response.decode(self.encoding)
-        server_response = server_response.split()
-        response["Type"] = server_response[0]
-        response["ID"] = server_response[1]
-
-        # extract content - needed if content contains new line character
-        content = ''
-        for index, item in enumerate(server_response):
-            if index > 1:
-                content += '\n'
-                content += str(item)
-
-        response["Content"] = content
-
-        # validate content
-        if response["Valid"]:
-            if (response["Type"]) == str(COMMAND_HEADER) or str(response["Type"]) == str(DATA_HEADER):
-                response["Valid"] = True
-            else:
-                response["Valid"] = False
-                if response["Error"] is None:
-                    response["Error"] = "Invalid header ID!"
-                else:
-                    response["Error"] += '\n'
-                    response["Error"] += "Invalid header ID!"
-
-        if response["Valid"]:
-            id_is_valid = False
-            for command in self.host_commands.all_commands:
-                if str(command.id) == str(response["ID"]):
-                    id_is_valid = True
-                    break
-
-            if id_is_valid:
-                response["Valid"] = True
-            else:
-                response["Valid"] = False
-                if response["Error"] is None:
-                    response["Error"] = "Invalid data/command ID!"
-                else:
-                    response["Error"] += '\n'
-                    response["Error"] += "Invalid data/command ID!"
-
-        # test_print("\nType: " + str(response["Type"]) + "\nID: " + str(response["ID"]) + "\nContent:" +
-        #            str(response["Content"]) + "\nValid: " + str(response["Valid"]) + "\nErrors: " +
-        #            str(response["Error"]))
+            Block until a complete frame is received from host.
+        :return: frame - Frame type from frame_utils.py
+        """
+        message = self.receiver.read_message(self.socket)
+        self.metrics.count_received(len(message.payload))
+        if message.header & COMPRESSED_FLAG:
+            if self.compressor is None:
+                raise ConnectionError("Compressed frame received while compression is not negotiated!")
+            message = self.compressor.decompress(message)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(RECEIVED, message.header, message.message_id, message.request_id, message.payload)
+        return message
 
+    def decode_server_response(self, server_response):
+        """
+            Method decodes host's response.
+        :param server_response: message received from host - Frame type from frame_utils.py
+        :return: decoded response as dictionary
+        """
+        if self.typed_values:
+            response = decode_message(server_response, self.registry.host_commands.ids, self.registry.data.ids,
+                                      self.encoding, self.registry.host_commands.value_types)
+        else:
+            response = decode_message(server_response, self.registry.host_commands.ids, self.registry.data.ids,
+                                      self.encoding)
+        if not response["Valid"]:
+            self.metrics.count_invalid(response)
         return response
 
-    def connect_to_host(self):
+    def connect_to_host(self, attempts=None):
         """
-            Method establishes connection to the host.
-        :return: None
+            Method establishes connection to the host, retrying with exponential backoff until connected.
+        :param attempts: maximum number of connection attempts, None to retry until connected or terminated
+        :return: True if connected, False if host refused credentials
+        """
+        delay = GU_RID
+        attempt = 1
+        while True:
+            if self.terminated.is_set():
+                raise ConnectionError("Client terminated!")
+            try:
+                return self.__connect__()
+            except (ConnectionError, OSError) as err:
+                if attempts is not None and attempt >= attempts:
+                    raise
+
+                # randomized so that many clients losing the same host do not reconnect all at once
+                wait = random.uniform(delay / 2, delay)
+                logger.warning("Unable to connect to host (attempt %s): %s. Retrying in %.3fs...", attempt, err, wait)
+                self.terminated.wait(wait)
+                delay = min(delay * 2, GU_RMD)
+                attempt += 1
+
+    def __connect__(self):
+        """
+            Connect a new socket to the host and authenticate: previous session's token is sent if any, credentials
+        otherwise, then host's session command is awaited.
+        :return: True if connected, False if host refused credentials
         """
-        self.socket.connect((self.host, self.port))
+        self.socket.close()
+        self.socket = py_socket.socket(py_socket.AF_INET, py_socket.SOCK_STREAM)
 
-        server_response = self.socket.recv(BUFFER_SIZE)
+        # do not wait for an unreachable host longer than host waits for credentials
+        self.socket.settimeout(GU_AT)
+        try:
+            self.socket.connect((self.host, self.port))
+            self.receiver.reset()
+            self.compressor = None
+            session = self.__authenticate__()
+        except (ConnectionError, OSError):
+            self.socket.close()
+            raise
+        self.socket.settimeout(None)
+
+        token = session.get(TOKEN_FIELD)
+        if not token:
+            logger.warning("Host refused credentials!")
+            self.socket.close()
+            return False
+
+        self.session_token = token
+        self.negotiated = read_capabilities(session)
+        self.receiver.max_frame_size = self.negotiated.max_frame_size
+        self.typed_values = self.negotiated.supports_typed_values()
+        self.compressor = self.compression if self.negotiated.get_compression() == ZLIB_COMPRESSION else None
+        if self.session_resumed:
+            logger.info("Session resumed! Capabilities: %s", self.negotiated)
+        else:
+            logger.info("New session started! Capabilities: %s", self.negotiated)
+        self.__restore_session__()
+
+        self.metrics.count_connection(self.connection_lost_at)
+        self.connection_lost_at = None
+        self.heartbeat = None
+        if self.negotiated.supports(HEARTBEAT_CHANNEL):
+            self.heartbeat = Heartbeat(self.send_heartbeat, self.heartbeat_interval, self.dead_peer_timeout,
+                                       self.__drop_connection__)
+        return True
+
+    def __authenticate__(self):
+        """
+            Hello: send session token or credentials with client's capabilities without waiting to be asked, then wait
+        for host's session command carrying session token and negotiated capabilities. One round trip.
+        :return: session command's fields as dictionary, without token if host refused credentials
+        """
+        self.session_resumed = self.session_token is not None
+        if self.session_resumed:
+            hello = encode_handshake({TOKEN_FIELD: self.session_token, CAPABILITIES_FIELD: self.capabilities.encode()})
+            self.send_data(self.data.resume_session, hello)
+        else:
+            self.send_credentials()
 
-        logger.info("Server's response: " + str(server_response))
+        while True:
+            message = self.receive_frame()
+            if message.header != COMMAND_HEADER:
+                continue
 
-        self.send_credentials()
+            if message.message_id == SESSION_CMD_ID:
+                return decode_handshake(str(message.payload, self.encoding))
 
-    def send_data(self, data, value):
+            if message.message_id == ASK_CLIENT_FOR_CREDENTIALS_CMD_ID:
+                # session could not be resumed, for instance host was restarted
+                self.session_resumed = False
+                self.send_credentials(message.request_id)
+
+    def __restore_session__(self):
+        """
+            Bring client's state in line with the session: a resumed session gets its video stream back, a new one
+        starts without the previous session's state.
+        :return: None
+        """
+        if not self.session_resumed:
+            self.session_replies.clear()
+            self.stop_video_streaming()
+            return
+
+        video_streamer = self.video_streamer
+        if video_streamer is not None and not video_streamer.streaming:
+            logger.info("Restoring video streaming...")
+            try:
+                self.start_video_streaming(video_streamer.port)
+            except OSError as err:
+                logger.warning("Unable to restore video streaming! %s", err)
+
+    def send_data(self, data, value, request_id=NO_REQUEST_ID):
         """
             Method sends a data to the host.
         :param data: IPX data type
         :param value: data's content
+        :param request_id: request id of the host's command this data replies to
         :return: boolean True if ok, error occurred as string if not ok.
         """
         try:
-            package = str(DATA_HEADER) + '\n' + str(data.id) + '\n' + str(value)
-            package = self.string_to_bytes(package)
-            self.socket.send(package)
+            payload = encode_typed_value(data, value, self.encoding, self.typed_values)
+            if request_id == self.batch_request_id:
+                # reply to a command of the batch being run, sent with the batch reply
+                self.batch_replies.append((data.id, payload))
+                return True
+            if request_id != NO_REQUEST_ID:
+                self.__keep_reply__(request_id, data, payload)
+            self.__send_frame__(DATA_HEADER, data.id, payload, request_id)
             return True
         except Exception as err:
             error = "Error occurred while sending data to client:\ndata: " + str(data) + '\nvalue: ' + str(value)\
@@ -161,85 +380,539 @@ class Client:
             logger.warning(error)
             return error
 
-    def send_credentials(self):
+    def send_frame(self, header, message_id, payload=b'', request_id=NO_REQUEST_ID):
+        """
+            Method sends a raw frame to the host, used to replay recorded frames.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes-like object
+        :param request_id: request id of the host's command this frame replies to
+        :return: boolean True if ok, error occurred as string if not ok.
+        """
+        try:
+            self.__send_frame__(header, message_id, bytes(payload), request_id)
+            return True
+        except Exception as err:
+            error = "Error occurred while sending frame to host: " + str(err)
+            logger.warning(error)
+            return error
+
+    def __send_frame__(self, header, message_id, payload, request_id):
+        """
+            Record and send a frame, its payload compressed if compression was negotiated.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes
+        :param request_id: request id of the host's command this frame replies to
+        :return: None
+        """
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(SENT, header, message_id, request_id, payload)
+        priority = get_priority(header, message_id)
+        if self.compressor is not None:
+            header, payload = self.compressor.compress(header, message_id, payload)
+        self.scheduler.send(self.socket, header, message_id, payload, request_id, priority)
+        self.metrics.count_sent(len(payload))
+
+    def __keep_reply__(self, request_id, data, payload):
+        """
+            Keep a reply to host's command, sent again instead of running the command twice if host resends it.
+        :param request_id: request id of the host's command
+        :param data: reply's IPX data type
+        :param payload: reply's content as bytes
+        :return: None
+        """
+        session_replies = self.session_replies
+        session_replies[request_id] = (data, payload)
+        if len(session_replies) > GU_SR:
+            session_replies.popitem(last=False)
+
+    def send_credentials(self, request_id=NO_REQUEST_ID):
         """
             Method sends credentials required to connect to the server.
+        :param request_id: request id of the host's command asking for credentials
         :return: None
         """
         logger.info("Sending credentials...")
-        value = 'u:' + str(self.username) + '\np:' + str(self.password)
-        self.send_data(self.data.credentials, value)
+        value = encode_handshake({
+            USERNAME_FIELD: self.username,
+            PASSWORD_FIELD: self.password,
+            CAPABILITIES_FIELD: self.capabilities.encode(),
+        })
+        self.send_data(self.data.credentials, value, request_id)
 
     def __get_host_command_by_id__(self, command_id):
         """
             Get host's Command type matching command_id.
         :param command_id: host's command id as integer
         """
-        logger.debug("Client.__get_host_command_by_id__ called.")
+        return self.registry.host_commands.get_by_id(command_id)
 
-        host_command = None
-        for command in self.host_commands.all_commands:
-            if command.id == command_id:
-                host_command = command
-                break
+    def __decode_value__(self, host_command, payload):
+        """
+            Get the value of a host's command received outside a frame (batch entry, control channel packet).
+        :param host_command: host's Command type the value was sent with
+        :param payload: value as bytes-like object
+        :return: value decoded by command's value type if typed values are negotiated, string otherwise
+        """
+        if self.typed_values and host_command.value_type is not None:
+            return host_command.value_type.decode(payload)
+        return str(payload, self.encoding)
 
-        logger.debug("Provided command_id {} matched command: {}".format(command_id, command))
-        return host_command
+    def send_heartbeat(self, payload):
+        """
+            Method sends a heartbeat to the host.
+        :param payload: heartbeat built by Heartbeat.create_heartbeat as bytes
+        :return: boolean True if ok, error occurred as string if not ok.
+        """
+        return self.send_data(self.data.heartbeat, payload)
+
+    def __drop_connection__(self):
+        """
+            Called by heartbeat thread when host stopped responding: wake up slave mode blocked in recv.
+        :return: None
+        """
+        self.metrics.dead_peers.value += 1
+        logger.warning("Host stopped responding! Dropping connection...")
+        try:
+            self.socket.shutdown(py_socket.SHUT_RDWR)
+        except OSError:
+            pass
 
     def run_in_slave_mode(self):
         """
-            Client continuously listens to host's command.
+            Client continuously listens to host's command, reconnecting if auto_reconnect is set.
         :return: None
         """
         logger.info("Slave mode enabled! Waiting for host's commands...")
+        while True:
+            self.__serve_host__()
+
+            # control channel's token and heartbeat belong to the lost session
+            self.close_control_channel()
+            if self.heartbeat is not None:
+                self.heartbeat.stop()
+            self.connection_lost_at = time.monotonic()
+
+            if not self.auto_reconnect or self.terminated.is_set():
+                break
+
+            try:
+                self.connect_to_host()
+            except (ConnectionError, OSError) as err:
+                logger.warning("Unable to reconnect to host: %s", err)
+                break
+
+    def __serve_host__(self):
+        """
+            Run host's commands until connection is lost.
+        :return: None
+        """
+        heartbeat = self.heartbeat
+        if heartbeat is not None:
+            heartbeat.start()
+
         slave_mode = True
         while slave_mode:
-            server_command = self.socket.recv(BUFFER_SIZE)
+            try:
+                server_command = self.receive_frame()
+            except (ConnectionError, OSError) as err:
+                logger.warning("Connection with host lost: %s", err)
+                break
+
+            if heartbeat is not None:
+                heartbeat.packet_received()
+            if server_command.header == COMMAND_HEADER and server_command.message_id == HEARTBEAT_CMD_ID:
+                if heartbeat is not None:
+                    heartbeat.handle_heartbeat(server_command.payload)
+                continue
+            if server_command.header == COMMAND_HEADER and server_command.message_id == BATCH_CMD_ID:
+                # binary content, not decoded as text
+                self.run_batch(server_command.payload, server_command.request_id)
+                continue
+            if server_command.message_id in self.coalesced_command_ids and server_command.header == COMMAND_HEADER \
+                    and server_command.request_id == NO_REQUEST_ID \
+                    and self.receiver.has_buffered_message(COMMAND_HEADER, server_command.message_id):
+                # newer value of the same command already received: only the latest one is run
+                self.metrics.coalesced_commands.value += 1
+                continue
+
             server_command = self.decode_server_response(server_command)
 
-            logger.debug("Received package from host: {}".format(server_command))
+            logger.debug("Received package from host: %s", server_command)
 
-            if server_command["Type"] == str(COMMAND_HEADER):
-                host_command = self.__get_host_command_by_id__(int(server_command["ID"]))
+            if server_command["Type"] == COMMAND_HEADER:
+                request_id = server_command["RequestID"]
+                if request_id != NO_REQUEST_ID and request_id in self.session_replies:
+                    # command resent after session resumption was already run: only its reply was lost
+                    self.send_data(*self.session_replies[request_id], request_id)
+                    continue
+
+                host_command = self.__get_host_command_by_id__(server_command["ID"])
                 if host_command is not None:
-                    logger.debug("Execute command {}".format(host_command))
-                    self.run_slave_command(host_command)
+                    logger.debug("Execute command %s", host_command)
+                    self.run_slave_command(host_command, server_command["RequestID"], server_command["Content"])
                 else:
                     logger.warning("Invalid command provided!")
 
-    def start_video_streaming(self):
+    def start_video_streaming(self, port=None):
         """
-            TO DO
-        :return:
+            Start streaming video frames to the host over a dedicated connection.
+        :param port: host's video port, None for host's port + VIDEO_PORT_OFFSET
+        :return: None
         """
-        pass
+        if self.video_streamer is not None:
+            if self.video_streamer.streaming:
+                logger.info("Video streaming already running!")
+                return
+            # video connection was lost: release the previous streamer
+            self.stop_video_streaming()
+
+        if port is None:
+            port = self.port + GU_VPO
+
+        # client's frame_source is reused by every streamer, only a default source is closed with its streamer
+        frame_source = self.frame_source
+        if frame_source is None:
+            frame_source = create_default_frame_source()
+
+        self.video_streamer = VideoStreamer(frame_source, self.host, port, self.username, self.password,
+                                            owns_source=self.frame_source is None)
+        self.video_streamer.start()
 
     def stop_video_streaming(self):
         """
-            TO DO
-        :return:
+            Stop streaming video frames.
+        :return: None
+        """
+        if self.video_streamer is None:
+            return
+
+        self.video_streamer.stop()
+        self.video_streamer = None
+
+    def start_telemetry(self, batch_size=GU_TBS, flush_interval=GU_TFI):
+        """
+            Start sending telemetry samples recorded with record_telemetry to the host in batches.
+        :param batch_size: maximum number of samples sent in one batch
+        :param flush_interval: seconds a sample may wait before its batch is sent
+        :return: TelemetryBatcher
+        """
+        if self.telemetry is not None:
+            return self.telemetry
+
+        # a batch must fit in a frame host accepts
+        batch_size = min(batch_size, (self.negotiated.max_frame_size - FRAME_HEADER.size) // TELEMETRY_SAMPLE.size)
+        self.telemetry = TelemetryBatcher(self.send_telemetry, batch_size, flush_interval)
+        self.telemetry.start()
+        return self.telemetry
+
+    def stop_telemetry(self):
+        """
+            Send buffered telemetry samples and stop telemetry.
+        :return: None
+        """
+        if self.telemetry is None:
+            return
+
+        self.telemetry.stop()
+        logger.info("Telemetry stopped. %s", self.telemetry.get_statistics())
+        self.telemetry = None
+
+    def record_telemetry(self, channel, value, timestamp=None):
+        """
+            Buffer a telemetry sample, sent to the host with the next batch.
+        :param channel: channel id as integer, see telemetry.py
+                        example: SPEED_CHANNEL
+        :param value: sample's value as number
+        :param timestamp: capture time.time() value, now if None
+        :return: None
+        """
+        if self.telemetry is None:
+            self.start_telemetry()
+        self.telemetry.record(channel, value, timestamp)
+
+    def send_telemetry(self, payload):
+        """
+            Method sends a batch of packed telemetry samples to the host.
+        :param payload: packed samples as bytes
+        :return: boolean True if ok, error occurred as string if not ok.
+        """
+        return self.send_data(self.data.telemetry, payload)
+
+    def open_control_channel(self, token):
+        """
+            Start receiving host's value commands over UDP.
+        :param token: session token received from host over TCP - bytes
+        :return: control channel's UDP port - integer
         """
-        pass
+        self.close_control_channel()
+        self.control_channel = ControlChannelReceiver(token, self.__run_control_command__)
+        self.control_channel.start()
+        logger.info("Control channel listening on port %s", self.control_channel.port)
+        return self.control_channel.port
 
-    def run_slave_command(self, host_command):
+    def close_control_channel(self):
+        """
+            Stop receiving host's value commands over UDP.
+        :return: None
+        """
+        control_channel, self.control_channel = self.control_channel, None
+        if control_channel is None:
+            return
+
+        control_channel.stop()
+        logger.info("Control channel closed. %s", control_channel.get_statistics())
+
+    def __run_control_command__(self, command_id, payload):
+        """
+            Run a command received over the control channel, no reply is sent.
+        :param command_id: host's command id as integer
+        :param payload: command's value as bytes-like object
+        :return: None
+        """
+        host_command = self.__get_host_command_by_id__(command_id)
+        if host_command is None:
+            logger.warning("Invalid command provided over control channel!")
+            return
+
+        try:
+            value = self.__decode_value__(host_command, payload)
+        except (NameError, UnicodeDecodeError) as err:
+            logger.warning("Invalid value provided over control channel! %s", err)
+            return
+        self.run_slave_command(host_command, NO_REQUEST_ID, value)
+
+    def run_slave_command(self, host_command, request_id=NO_REQUEST_ID, value=None):
         """
             Run command received from host.
         :param host_command: command type object
+        :param request_id: request id received with the command, sent back with the reply
+        :param value: value received with the command
         :return: None
         """
-        if host_command.id == self.host_commands.ask_client_for_credentials.id:
-            self.send_credentials()
+        try:
+            handled = self.handlers.dispatch(self, host_command, value, request_id)
+        except Exception as err:
+            # a failing handler must not stop slave mode or the control channel: command is refused instead
+            self.metrics.handler_errors.value += 1
+            logger.warning("Command %s failed! %s", host_command, err)
+            if request_id != NO_REQUEST_ID:
+                self.send_data(self.data.command_accepted, False, request_id)
+            return
 
-        elif host_command.id == self.host_commands.start_video_streaming.id:
-            self.start_video_streaming()
-            self.send_data(self.data.command_accepted, True)
+        if not handled:
+            logger.warning("Unknown command provided! %s", host_command)
 
-        elif host_command.id == self.host_commands.stop_video_streaming.id:
-            self.stop_video_streaming()
-            self.send_data(self.data.command_accepted, True)
+    def run_batch(self, payload, request_id=NO_REQUEST_ID):
+        """
+            Run the commands of a batch in order and send their replies at once in a batch reply.
+        Each command is answered by its handler's reply, True if its handler sent none, False if it failed.
+        :param payload: batch command's content as bytes-like object, see frame_utils.encode_batch
+        :param request_id: request id received with the batch, NO_REQUEST_ID runs the commands without reply
+        :return: None
+        """
+        if request_id != NO_REQUEST_ID and request_id in self.session_replies:
+            # batch resent after session resumption was already run: only its reply was lost
+            self.send_data(*self.session_replies[request_id], request_id)
+            return
 
-        else:
-            logger.warning("Unknown command provided! {}".format(host_command))
+        try:
+            entries = decode_batch(payload)
+        except NameError as err:
+            logger.warning(str(err))
+            entries = []
+
+        results = []
+        for command_id, value in entries:
+            self.metrics.batched_commands.value += 1
+            host_command = self.__get_host_command_by_id__(command_id)
+            if host_command is None or command_id == BATCH_CMD_ID:
+                logger.warning("Invalid command provided in batch: %s!", command_id)
+                results.append((self.data.command_accepted.id, encode_value(False)))
+                continue
+
+            if request_id != NO_REQUEST_ID:
+                self.batch_request_id = request_id
+                self.batch_replies = []
+            try:
+                self.run_slave_command(host_command, request_id, self.__decode_value__(host_command, value))
+                replies = self.batch_replies
+                results.append(replies[0] if replies else (self.data.command_accepted.id, encode_value(True)))
+            except Exception as err:
+                logger.warning("Batch command %s failed! %s", host_command, err)
+                results.append((self.data.command_accepted.id, encode_value(False)))
+            finally:
+                self.batch_request_id = None
+                self.batch_replies = None
+
+        if request_id != NO_REQUEST_ID:
+            self.send_data(self.data.batch_reply, encode_batch(results), request_id)
+
+    def terminate(self):
+        """
+            Stop reconnecting and close connection with host, slave mode returns.
+        :return: None
+        """
+        self.terminated.set()
+        self.auto_reconnect = False
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+        try:
+            self.socket.shutdown(py_socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
+        self.stop_recording()
+
+    def start_recording(self, path=None):
+        """
+            Start recording every frame sent to and received from host, see recorder.py.
+        :param path: path of the recording file, None for a new file in recordings directory
+        :return: FrameRecorder
+        """
+        self.stop_recording()
+        self.recorder = FrameRecorder(get_recording_path() if path is None else path)
+        logger.info("Recording frames in %s", self.recorder.path)
+        return self.recorder
+
+    def stop_recording(self):
+        """
+            Stop recording frames.
+        :return: None
+        """
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def get_metrics(self):
+        """
+            Get client's metrics in plain text exposition format.
+        :return: metrics - string
+        """
+        return self.metrics.render()
+
+    def get_outbound_statistics(self):
+        """
+            Get queue depths and wait times of frames sent to host, by priority class.
+        :return: outbound_statistics - string
+        """
+        outbound_statistics = "Outbound queues\n"
+        for name, statistics in self.scheduler.get_statistics().items():
+            outbound_statistics += "{}: depth={Depth} max_depth={MaxDepth} sent={FramesSent} " \
+                                   "coalesced={FramesCoalesced} avg_wait={AverageWait:.6f}s " \
+                                   "max_wait={MaxWait:.6f}s".format(name, **statistics) + "\n"
+
+        return outbound_statistics
 
+    def get_handlers_statistics(self):
+        """
+            Get execution statistics of host's command handlers.
+        :return: handlers_statistics - string
+        """
+        handlers_statistics = "Handlers statistics\n"
+        for command_id, (calls, average_time, max_time) in sorted(self.handlers.get_statistics().items()):
+            handlers_statistics += "{}: calls={} avg={:.6f}s max={:.6f}s".format(
+                self.registry.host_commands.get_by_id(command_id), calls, average_time, max_time) + "\n"
+
+        return handlers_statistics
+
+    @handlers.register(ASK_CLIENT_FOR_CREDENTIALS_CMD_ID)
+    def __run_ask_client_for_credentials__(self, host_command, value, request_id):
+        """
+            Handler of ask_client_for_credentials command.
+        """
+        self.send_credentials(request_id)
 
+    @handlers.register(START_VIDEO_STREAMING_CMD_ID)
+    def __run_start_video_streaming__(self, host_command, value, request_id):
+        """
+            Handler of start_video_streaming command.
+        """
+        try:
+            self.start_video_streaming(int(value) if value else None)
+            accepted = True
+        except Exception as err:
+            logger.warning("Unable to start video streaming! %s", err)
+            accepted = False
+        self.send_data(self.data.command_accepted, accepted, request_id)
 
+    @handlers.register(STOP_VIDEO_STREAMING_CMD_ID)
+    def __run_stop_video_streaming__(self, host_command, value, request_id):
+        """
+            Handler of stop_video_streaming command.
+        """
+        self.stop_video_streaming()
+        self.send_data(self.data.command_accepted, True, request_id)
+
+    @handlers.register(OPEN_CONTROL_CHANNEL_CMD_ID)
+    def __run_open_control_channel__(self, host_command, value, request_id):
+        """
+            Handler of open_control_channel command, replies with control channel's UDP port.
+        """
+        try:
+            port = self.open_control_channel(bytes.fromhex(value))
+        except Exception as err:
+            logger.warning("Unable to open control channel! %s", err)
+            port = False
+        self.send_data(self.data.command_accepted, port, request_id)
+
+    @handlers.register(SET_SPEED_CMD_ID)
+    def __run_set_speed__(self, host_command, value, request_id):
+        """
+            Handler of set_speed command, replies only to commands received over TCP.
+        """
+        try:
+            self.speed = float(value)
+            accepted = True
+        except (TypeError, ValueError) as err:
+            logger.warning("Invalid speed provided! %s", err)
+            accepted = False
+        if request_id != NO_REQUEST_ID:
+            self.send_data(self.data.command_accepted, accepted, request_id)
+
+    @handlers.register(SET_STEERING_CMD_ID)
+    def __run_set_steering__(self, host_command, value, request_id):
+        """
+            Handler of set_steering command, replies only to commands received over TCP.
+        """
+        try:
+            self.steering = float(value)
+            accepted = True
+        except (TypeError, ValueError) as err:
+            logger.warning("Invalid steering provided! %s", err)
+            accepted = False
+        if request_id != NO_REQUEST_ID:
+            self.send_data(self.data.command_accepted, accepted, request_id)
+
+    @handlers.register(PING_CMD_ID)
+    def __run_ping__(self, host_command, value, request_id):
+        """
+            Handler of ping command, sends back the received value.
+        """
+        self.send_data(self.data.command_accepted, value, request_id)
+
+    @handlers.register(HEARTBEAT_CMD_ID)
+    def __run_heartbeat__(self, host_command, value, request_id):
+        """
+            Handler of heartbeat command, heartbeats are handled by slave mode before decoding: only proves host alive.
+        """
+        if self.heartbeat is not None:
+            self.heartbeat.packet_received()
+
+    @handlers.register(BATCH_CMD_ID)
+    def __run_batch__(self, host_command, value, request_id):
+        """
+            Handler of batch command, batches received from host are run by slave mode before decoding.
+        """
+        self.run_batch(encode_value(value, self.encoding), request_id)
+
+    @handlers.register(SESSION_CMD_ID)
+    def __run_session__(self, host_command, value, request_id):
+        """
+            Handler of session command, keeps the new token given by host.
+        """
+        token = decode_handshake(value).get(TOKEN_FIELD)
+        if token:
+            self.session_token = token
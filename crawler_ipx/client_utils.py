@@ -3,7 +3,7 @@ import logging
 from .generic_utils import Command
 from .client_commands_constants import *
 
-logger = logging.getLogger('ipx_logger')
+logger = logging.getLogger('ipx_logger.client_utils')
 
 
 class ClientCommands:
@@ -0,0 +1,132 @@
+import logging
+import threading
+
+from types import MappingProxyType
+
+from .host_utils import HostCommands
+from .client_utils import ClientCommands
+from .generic_data import DataIPX
+
+logger = logging.getLogger('ipx_logger.command_registry')
+
+
+class Catalog:
+    """
+        Class used to look up commands or data by id or in_code in constant time.
+    Catalog is read only: it is built once from a list of Command/Data and never changes afterwards, so a single catalog
+    is shared by every Host and Client.
+    """
+    __slots__ = ('name', 'items', 'by_id', 'by_in_code', 'ids', 'value_types')
+
+    def __init__(self, name, items):
+        """
+            Constructor
+        :param name: catalog's name used in error messages as string
+                     example: host commands
+        :param items: list of Command or Data type objects
+        """
+        by_id = {}
+        by_in_code = {}
+        for item in items:
+            if item.id in by_id:
+                error = "Duplicated {} id: {}!".format(name, item.id) + \
+                        "\nUsed by {} and {}!".format(by_id[item.id].in_code, item.in_code)
+                raise NameError(error)
+            if item.in_code in by_in_code:
+                error = "Duplicated {} in_code: {}!".format(name, item.in_code)
+                raise NameError(error)
+            by_id[item.id] = item
+            by_in_code[item.in_code] = item
+
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'items', tuple(items))
+        object.__setattr__(self, 'by_id', MappingProxyType(by_id))
+        object.__setattr__(self, 'by_in_code', MappingProxyType(by_in_code))
+        object.__setattr__(self, 'ids', frozenset(by_id))
+        object.__setattr__(self, 'value_types', MappingProxyType(
+            {item.id: item.value_type for item in items if item.value_type is not None}))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Catalog {} is read only!".format(self.name))
+
+    def __getattr__(self, in_code):
+        """
+            Get command/data by in_code as attribute, same as HostCommands, ClientCommands and DataIPX.
+        :param in_code: in code usage as string
+                        example: registry.host_commands.start_video_streaming
+        :return: Command/Data
+        """
+        try:
+            return self.by_in_code[in_code]
+        except KeyError:
+            raise AttributeError("Unknown {}: {}!".format(self.name, in_code)) from None
+
+    def get_by_id(self, item_id):
+        """
+            Get command/data matching id.
+        :param item_id: id as integer
+        :return: Command/Data, None if id is unknown
+        """
+        return self.by_id.get(item_id)
+
+    def get_by_in_code(self, in_code):
+        """
+            Get command/data matching in_code.
+        :param in_code: in code usage as string
+        :return: Command/Data, None if in_code is unknown
+        """
+        return self.by_in_code.get(in_code)
+
+    def __contains__(self, item_id):
+        """
+            Check if id is known.
+        :param item_id: id as integer
+        :return: bool
+        """
+        return item_id in self.by_id
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class CommandRegistry:
+    """
+        Class holding host commands, client commands and data catalogs shared by Host and Client.
+    Use get_registry() instead of creating instances: the registry is built once per process.
+    """
+    __slots__ = ('host_commands', 'client_commands', 'data')
+
+    def __init__(self):
+        """
+            Constructor
+        """
+        logger.debug("Initiating command registry...")
+
+        object.__setattr__(self, 'host_commands', Catalog('host commands', HostCommands().all_commands))
+        object.__setattr__(self, 'client_commands', Catalog('client commands', ClientCommands().all_commands))
+        object.__setattr__(self, 'data', Catalog('data', DataIPX().all_data))
+
+        logger.debug("Command registry initiated!")
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Command registry is read only!")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+        Get the command registry, building it on first call.
+    :return: CommandRegistry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = CommandRegistry()
+    return _registry
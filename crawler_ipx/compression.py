@@ -0,0 +1,177 @@
+import logging
+import time
+import zlib
+
+from .generic_utils import COMPRESSION_THRESHOLD as GU_CTH
+from .generic_utils import COMPRESSION_LEVEL as GU_CL
+from .generic_utils import MAX_FRAME_SIZE
+from .generic_utils import DATA_HEADER
+
+from .frame_utils import COMPRESSED_FLAG
+from .frame_utils import Frame
+
+# ===================================================== CONSTANTS =====================================================
+# Compression algorithms supported, by order of preference, offered in the handshake's capabilities
+ZLIB_COMPRESSION = 'zlib'
+COMPRESSION_ALGORITHMS = (ZLIB_COMPRESSION, )
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.compression')
+
+
+class PayloadCompressor:
+    """
+        Class used to compress frame payloads with zlib once both peers negotiated it.
+    Payloads below threshold, or not getting smaller, are sent as they are. Each payload is compressed on its own, so
+    frames stay independent; a data type may use its own level and a preset dictionary, which must then be configured
+    with the same dictionary on both peers:
+        compressor = PayloadCompressor()
+        compressor.set_profile(TELEMETRY_DATA_ID, level=1, dictionary=sample_batch)
+    """
+    def __init__(self, threshold=GU_CTH, level=GU_CL, max_payload_size=MAX_FRAME_SIZE):
+        """
+            Constructor
+        :param threshold: payloads smaller than threshold are not compressed, in bytes
+                          example: 256
+        :param level: zlib compression level, 1 (fastest) to 9 (smallest)
+                      example: 3
+        :param max_payload_size: biggest decompressed payload accepted, in bytes
+                                 example: 16777216
+        """
+        if type(threshold) is not int or threshold < 0:
+            error = "Invalid compression threshold: {}!".format(threshold) + "\nExpected positive integer type!"
+            raise NameError(error)
+
+        self.threshold = threshold
+        self.level = level
+        self.max_payload_size = max_payload_size
+
+        # compressors are copied from these primed templates, so dictionaries are loaded only once
+        self.default_compressor = self.__create_compressor__(level)
+
+        # data id: (level, dictionary), compressor template, decompressor template
+        self.profiles = {}
+        self.compressors = {}
+        self.decompressors = {}
+
+        # compression statistics, times in seconds
+        self.messages_compressed = 0
+        self.messages_skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_time = 0.0
+        self.messages_decompressed = 0
+        self.bytes_decompressed = 0
+        self.decompress_time = 0.0
+
+    @staticmethod
+    def __create_compressor__(level, dictionary=None):
+        """
+            Create a zlib compressor template.
+        :param level: zlib compression level
+        :param dictionary: preset dictionary as bytes, None for no dictionary
+        :return: zlib compressor
+        """
+        try:
+            if dictionary is None:
+                return zlib.compressobj(level)
+            return zlib.compressobj(level, zdict=dictionary)
+        except (ValueError, zlib.error) as err:
+            error = "Invalid compression level: {}! ".format(level) + str(err)
+            raise NameError(error)
+
+    def set_profile(self, data_id, level=None, dictionary=None):
+        """
+            Use a specific level and/or preset dictionary for one data type.
+        :param data_id: id of the data type as integer
+                        example: TELEMETRY_DATA_ID
+        :param level: zlib compression level, None for default level
+        :param dictionary: preset dictionary as bytes, typical content of this data type; None for no dictionary
+        :return: None
+        """
+        if level is None:
+            level = self.level
+        self.compressors[data_id] = self.__create_compressor__(level, dictionary)
+        if dictionary is None:
+            self.decompressors.pop(data_id, None)
+        else:
+            self.decompressors[data_id] = zlib.decompressobj(zdict=dictionary)
+        self.profiles[data_id] = (level, dictionary)
+
+    def compress(self, header, message_id, payload):
+        """
+            Compress a frame's payload if worth it.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes
+        :return: (header, payload) - header carries COMPRESSED_FLAG if payload was compressed
+        """
+        size = len(payload)
+        if size < self.threshold:
+            return header, payload
+
+        start = time.perf_counter()
+        template = self.default_compressor
+        if header == DATA_HEADER:
+            template = self.compressors.get(message_id, template)
+        compressor = template.copy()
+        compressed = compressor.compress(payload) + compressor.flush()
+        self.compress_time += time.perf_counter() - start
+
+        if len(compressed) >= size:
+            self.messages_skipped += 1
+            return header, payload
+
+        self.messages_compressed += 1
+        self.bytes_in += size
+        self.bytes_out += len(compressed)
+        return header | COMPRESSED_FLAG, compressed
+
+    def decompress(self, message):
+        """
+            Rebuild a frame whose payload was compressed by peer.
+        :param message: Frame type with COMPRESSED_FLAG set in its header
+        :return: Frame type with original header and payload
+        """
+        header = message.header & ~COMPRESSED_FLAG
+        start = time.perf_counter()
+        template = self.decompressors.get(message.message_id) if header == DATA_HEADER else None
+        decompressor = zlib.decompressobj() if template is None else template.copy()
+        try:
+            payload = decompressor.decompress(message.payload, self.max_payload_size)
+        except zlib.error as err:
+            raise ConnectionError("Corrupted compressed payload! " + str(err))
+        if decompressor.unconsumed_tail or not decompressor.eof:
+            error = "Corrupted compressed payload: truncated or bigger than {} bytes!".format(self.max_payload_size)
+            raise ConnectionError(error)
+        self.decompress_time += time.perf_counter() - start
+
+        self.messages_decompressed += 1
+        self.bytes_decompressed += len(payload)
+        return Frame(header, message.message_id, message.request_id, payload)
+
+    def get_ratio(self):
+        """
+            Get compressed size over original size of the compressed payloads.
+        :return: ratio - float, 1.0 if nothing was compressed
+        """
+        if not self.bytes_in:
+            return 1.0
+        return self.bytes_out / self.bytes_in
+
+    def get_statistics(self):
+        """
+            Get compression statistics, times in seconds.
+        :return: dictionary
+        """
+        return {
+            "MessagesCompressed": self.messages_compressed,
+            "MessagesSkipped": self.messages_skipped,
+            "BytesIn": self.bytes_in,
+            "BytesOut": self.bytes_out,
+            "Ratio": self.get_ratio(),
+            "CompressTime": self.compress_time,
+            "MessagesDecompressed": self.messages_decompressed,
+            "BytesDecompressed": self.bytes_decompressed,
+            "DecompressTime": self.decompress_time,
+        }
@@ -0,0 +1,205 @@
+import hmac
+import logging
+import os
+import socket as py_socket
+import struct
+import threading
+
+from .generic_utils import MAX_DATAGRAM_SIZE
+from .generic_utils import RECEIVER_POLL_INTERVAL as GU_RPI
+
+# ===================================================== CONSTANTS =====================================================
+# Size of the token authenticating control datagrams, handed to client over the TCP session
+CONTROL_TOKEN_SIZE = 16
+
+# Control datagram starts with: session token (16 bytes), sequence number (8 bytes), command id (2 bytes)
+# followed by command's value
+CONTROL_DATAGRAM_HEADER = struct.Struct('>{}sQH'.format(CONTROL_TOKEN_SIZE))
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.control_channel')
+
+
+def create_control_token():
+    """
+        Create a random token authenticating control datagrams of a session.
+    :return: token - bytes
+    """
+    return os.urandom(CONTROL_TOKEN_SIZE)
+
+
+class ControlChannelSender:
+    """
+        Class used by host to send value commands to the client over UDP.
+    Every datagram carries the session token and a sequence number increased with every datagram, so the client can drop
+    datagrams that arrive after a newer value of the same command.
+    """
+    def __init__(self, address, token):
+        """
+            Constructor
+        :param address: client's control channel (ip, port)
+        :param token: session token sent to client over TCP - bytes
+        """
+        if len(token) != CONTROL_TOKEN_SIZE:
+            error = "Invalid control token: {} bytes!".format(len(token))
+            error += "\nExpected {} bytes!".format(CONTROL_TOKEN_SIZE)
+            raise NameError(error)
+
+        self.address = address
+        self.token = token
+        self.socket = py_socket.socket(py_socket.AF_INET, py_socket.SOCK_DGRAM)
+        self.sequence_number = 0
+        self.lock = threading.Lock()
+
+        # sending statistics
+        self.datagrams_sent = 0
+
+    def send(self, command_id, payload=b''):
+        """
+            Send a command in a single datagram.
+        :param command_id: command's id as integer
+        :param payload: command's value as bytes
+        :return: None
+        """
+        if CONTROL_DATAGRAM_HEADER.size + len(payload) > MAX_DATAGRAM_SIZE:
+            error = "Value too big for a control datagram: {} bytes!".format(len(payload))
+            raise NameError(error)
+
+        with self.lock:
+            self.sequence_number += 1
+            datagram = CONTROL_DATAGRAM_HEADER.pack(self.token, self.sequence_number, command_id) + payload
+            self.socket.sendto(datagram, self.address)
+            self.datagrams_sent += 1
+
+    def close(self):
+        """
+            Close the UDP socket.
+        :return: None
+        """
+        self.socket.close()
+
+    def get_statistics(self):
+        """
+            Get sending statistics.
+        :return: dictionary
+        """
+        return {
+            "Address": self.address,
+            "DatagramsSent": self.datagrams_sent,
+        }
+
+
+class ControlChannelReceiver:
+    """
+        Class used by client to receive value commands sent by host over UDP.
+    Datagrams with a wrong token are ignored; datagrams older than the last one received for the same command are
+    dropped as stale.
+    """
+    def __init__(self, token, on_command, name=''):
+        """
+            Constructor
+        :param token: session token received from host over TCP - bytes
+        :param on_command: function called as on_command(command_id, payload) for each accepted datagram,
+                           payload is a memoryview valid until the function returns
+        :param name: interface to listen on, '' for all interfaces
+        """
+        if len(token) != CONTROL_TOKEN_SIZE:
+            error = "Invalid control token: {} bytes!".format(len(token))
+            error += "\nExpected {} bytes!".format(CONTROL_TOKEN_SIZE)
+            raise NameError(error)
+
+        self.token = token
+        self.on_command = on_command
+
+        self.socket = py_socket.socket(py_socket.AF_INET, py_socket.SOCK_DGRAM)
+        self.socket.bind((name, 0))
+        self.socket.settimeout(GU_RPI)
+        self.port = self.socket.getsockname()[1]
+
+        self.buffer = bytearray(MAX_DATAGRAM_SIZE)
+        self.receiving = False
+        self.thread = None
+
+        # command id: last accepted sequence number
+        self.last_sequence_numbers = {}
+
+        # receiving statistics
+        self.datagrams_received = 0
+        self.datagrams_stale = 0
+        self.datagrams_refused = 0
+
+    def start(self):
+        """
+            Start receiving datagrams on a background thread.
+        :return: None
+        """
+        if self.receiving:
+            return
+        self.receiving = True
+        self.thread = threading.Thread(target=self.__receive__, name='ControlReceiver', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+            Stop receiving and close the UDP socket.
+        :return: None
+        """
+        self.receiving = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+        self.socket.close()
+
+    def __receive__(self):
+        """
+            Receiver thread's loop.
+        :return: None
+        """
+        view = memoryview(self.buffer)
+        while self.receiving:
+            try:
+                size, _ = self.socket.recvfrom_into(self.buffer)
+            except py_socket.timeout:
+                continue
+            except OSError as err:
+                if self.receiving:
+                    logger.warning("Control channel closed: %s", err)
+                return
+
+            self.handle_datagram(view[:size])
+
+    def handle_datagram(self, datagram):
+        """
+            Check datagram's token and sequence number and pass its command on.
+        :param datagram: received datagram as bytes-like object
+        :return: True if accepted, False otherwise
+        """
+        if len(datagram) < CONTROL_DATAGRAM_HEADER.size:
+            self.datagrams_refused += 1
+            return False
+
+        token, sequence_number, command_id = CONTROL_DATAGRAM_HEADER.unpack_from(datagram)
+        if not hmac.compare_digest(token, self.token):
+            self.datagrams_refused += 1
+            return False
+
+        if sequence_number <= self.last_sequence_numbers.get(command_id, 0):
+            self.datagrams_stale += 1
+            return False
+
+        self.last_sequence_numbers[command_id] = sequence_number
+        self.datagrams_received += 1
+        self.on_command(command_id, datagram[CONTROL_DATAGRAM_HEADER.size:])
+        return True
+
+    def get_statistics(self):
+        """
+            Get receiving statistics.
+        :return: dictionary
+        """
+        return {
+            "Port": self.port,
+            "DatagramsReceived": self.datagrams_received,
+            "DatagramsStale": self.datagrams_stale,
+            "DatagramsRefused": self.datagrams_refused,
+        }
@@ -0,0 +1,136 @@
+import logging
+import time
+
+logger = logging.getLogger('ipx_logger.dispatch_utils')
+
+
+class Handler:
+    """
+        Class used to keep a command handler together with its execution statistics.
+    """
+    __slots__ = ('function', 'calls', 'total_time', 'max_time')
+
+    def __init__(self, function):
+        """
+            Constructor
+        :param function: handler called as function(owner, command, value, request_id)
+        """
+        self.function = function
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def get_average_time(self):
+        """
+            Get handler's average execution time.
+        :return: seconds - float
+        """
+        if not self.calls:
+            return 0.0
+        return self.total_time / self.calls
+
+
+class CommandDispatcher:
+    """
+        Class used to map command ids to handlers.
+    Handlers are registered with the register decorator and looked up with a single dictionary access:
+        dispatcher = CommandDispatcher()
+
+        @dispatcher.register(START_VIDEO_STREAMING_CMD_ID)
+        def start_video_streaming(client, command, value, request_id):
+            ...
+    """
+    def __init__(self):
+        """
+            Constructor
+        """
+        # command id: Handler
+        self.handlers = {}
+
+        # optional metrics.Histogram recording every handler's execution time
+        self.execution_time = None
+
+    def register(self, command_id):
+        """
+            Decorator registering a function as handler of command_id.
+        :param command_id: id of the handled command as integer
+        :return: decorator returning the function unchanged
+        """
+        def decorator(function):
+            self.add_handler(command_id, function)
+            return function
+        return decorator
+
+    def add_handler(self, command_id, function):
+        """
+            Register a function as handler of command_id, replacing the previous handler if any.
+        :param command_id: id of the handled command as integer
+        :param function: handler called as function(owner, command, value, request_id)
+        :return: None
+        """
+        if type(command_id) is not int or command_id < 0:
+            error = "Invalid command id: {}!".format(command_id) + "\nExpected positive integer type!"
+            raise NameError(error)
+
+        if not callable(function):
+            error = "Invalid handler: {}!".format(function) + "\nExpected callable type!"
+            raise NameError(error)
+
+        self.handlers[command_id] = Handler(function)
+
+    def remove_handler(self, command_id):
+        """
+            Unregister command_id's handler.
+        :param command_id: id of the handled command as integer
+        :return: None
+        """
+        self.handlers.pop(command_id, None)
+
+    def copy(self):
+        """
+            Get a dispatcher with the same handlers and fresh statistics, used to customize handlers per instance.
+        :return: CommandDispatcher
+        """
+        dispatcher = CommandDispatcher()
+        for command_id, handler in self.handlers.items():
+            dispatcher.handlers[command_id] = Handler(handler.function)
+        return dispatcher
+
+    def dispatch(self, owner, command, value=None, request_id=0):
+        """
+            Run command's handler.
+        :param owner: object passed as handler's first argument, for instance the Client
+        :param command: Command type object
+        :param value: value received with the command
+        :param request_id: request id received with the command
+        :return: True if a handler was found, False otherwise
+        """
+        handler = self.handlers.get(command.id)
+        if handler is None:
+            return False
+
+        start = time.perf_counter()
+        try:
+            handler.function(owner, command, value, request_id)
+        finally:
+            elapsed = time.perf_counter() - start
+            handler.calls += 1
+            handler.total_time += elapsed
+            if elapsed > handler.max_time:
+                handler.max_time = elapsed
+            if self.execution_time is not None:
+                self.execution_time.observe(elapsed)
+        return True
+
+    def get_statistics(self):
+        """
+            Get execution statistics of every handler.
+        :return: dictionary command id: (calls, average seconds, max seconds)
+        """
+        return {
+            command_id: (handler.calls, handler.get_average_time(), handler.max_time)
+            for command_id, handler in self.handlers.items()
+        }
+
+    def __contains__(self, command_id):
+        return command_id in self.handlers
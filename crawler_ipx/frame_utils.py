@@ -0,0 +1,509 @@
+import logging
+import select
+import struct
+
+from collections import namedtuple
+
+from .generic_utils import COMMAND_HEADER, DATA_HEADER
+from .generic_utils import MAX_FRAME_SIZE
+
+# ===================================================== CONSTANTS =====================================================
+# Frame layout on the wire:
+#   length     - 4 bytes, unsigned, big endian: size of everything following the length field
+#   header     - 1 byte: COMMAND_HEADER or DATA_HEADER, with COMPRESSED_FLAG set if payload is compressed
+#   message id - 2 bytes, unsigned, big endian: command/data id
+#   request id - 4 bytes, unsigned, big endian: correlates a reply with its command, 0 if not tracked
+#   payload    - (length - 7) bytes
+FRAME_LENGTH = struct.Struct('>I')
+FRAME_HEADER = struct.Struct('>BHI')
+
+# Length, header, message id and request id unpacked at once
+FRAME_PREFIX = struct.Struct('>IBHI')
+
+# Request id used by frames not waiting for a reply
+NO_REQUEST_ID = 0
+
+# Headers allowed inside a frame
+VALID_HEADERS = (COMMAND_HEADER, DATA_HEADER)
+
+# Bit set in a frame's header byte when its payload is compressed, only sent once compression was negotiated
+COMPRESSED_FLAG = 0x80
+
+# Errors set by decode_message on invalid messages
+INVALID_ID_ERROR = "Invalid data/command ID!"
+INVALID_HEADER_ERROR = "Invalid header ID!"
+INVALID_CONTENT_ERROR = "Invalid content encoding!"
+
+# Entry of a batch command or batch reply payload, followed by its value:
+#   id           - 2 bytes, unsigned, big endian: command id in a batch, data id in a batch reply
+#   value length - 4 bytes, unsigned, big endian
+BATCH_ENTRY = struct.Struct('>HI')
+
+# Size of the reusable receive buffer used by MessageReader, grown only if a bigger frame arrives
+READER_BUFFER_SIZE = 64 * 1024
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.frame_utils')
+
+# Frame decoded from the stream: header, message id, request id and payload (bytes or memoryview)
+Frame = namedtuple('Frame', ['header', 'message_id', 'request_id', 'payload'])
+
+
+def encode_frame(header, message_id, payload=b'', request_id=NO_REQUEST_ID):
+    """
+        Build a frame ready to be sent over the socket.
+    :param header: COMMAND_HEADER or DATA_HEADER
+    :param message_id: command/data id as integer
+    :param payload: frame's content as bytes
+    :param request_id: id correlating a reply with its command as integer
+    :return: frame - bytes
+    """
+    return encode_frame_prefix(header, message_id, len(payload), request_id) + bytes(payload)
+
+
+def encode_frame_prefix(header, message_id, payload_size, request_id=NO_REQUEST_ID):
+    """
+        Build the prefix of a frame, sent followed by its payload; used to send one payload to many peers.
+    :param header: COMMAND_HEADER or DATA_HEADER
+    :param message_id: command/data id as integer
+    :param payload_size: size of frame's content in bytes
+    :param request_id: id correlating a reply with its command as integer
+    :return: prefix - bytes
+    """
+    if header & ~COMPRESSED_FLAG not in VALID_HEADERS:
+        error = "Invalid frame header: {}!".format(header) + "\nExpected one of {}!".format(VALID_HEADERS)
+        raise NameError(error)
+
+    length = FRAME_HEADER.size + payload_size
+    if length > MAX_FRAME_SIZE:
+        error = "Frame too big: {} bytes!".format(length) + "\nMaximum allowed: {} bytes!".format(MAX_FRAME_SIZE)
+        raise NameError(error)
+
+    return FRAME_PREFIX.pack(length, header, message_id, request_id)
+
+
+def encode_value(value, encoding='utf-8'):
+    """
+        Convert a command/data value to frame payload.
+    :param value: value to be converted, None means no value
+    :param encoding: character encoding key
+    :return: payload - bytes
+    """
+    if value is None:
+        return b''
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes(str(value), encoding)
+
+
+def encode_typed_value(item, value, encoding='utf-8', typed=False):
+    """
+        Convert a command/data value to frame payload, in binary with item's value type when peer negotiated typed
+    values, as text otherwise.
+    :param item: Command/Data type the value is sent with
+    :param value: value to be converted, None means no value
+    :param encoding: character encoding key
+    :param typed: peer negotiated typed values, see Capabilities.supports_typed_values
+    :return: payload - bytes
+    """
+    if typed and item.value_type is not None:
+        return item.value_type.encode(value)
+    return encode_value(value, encoding)
+
+
+def send_frame(socket, header, message_id, payload=b'', request_id=NO_REQUEST_ID):
+    """
+        Send a whole frame over the socket.
+    :param socket: connected socket
+    :param header: COMMAND_HEADER or DATA_HEADER
+    :param message_id: command/data id as integer
+    :param payload: frame's content as bytes
+    :param request_id: id correlating a reply with its command as integer
+    :return: None
+    """
+    socket.sendall(encode_frame(header, message_id, payload, request_id))
+
+
+class MessageReader:
+    """
+        Class used to parse frames straight from socket into a reusable buffer.
+    Data is received with recv_into and messages are returned as views into the buffer, so no intermediate copies are
+    made. A message's payload is only valid until the next read: decode or copy it before reading again.
+    """
+    def __init__(self, buffer_size=READER_BUFFER_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        """
+            Constructor
+        :param buffer_size: initial size of the receive buffer in bytes
+                            example: 65536
+        :param max_frame_size: maximum accepted frame size in bytes
+                               example: 16777216
+        """
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.max_frame_size = max_frame_size
+
+        # unparsed data lies between start and end
+        self.start = 0
+        self.end = 0
+
+    def __parse__(self):
+        """
+            Parse next complete frame from the buffer.
+        :return: Frame if a complete one is available, None otherwise
+        """
+        start = self.start
+        if self.end - start < FRAME_PREFIX.size:
+            return None
+
+        length, header, message_id, request_id = FRAME_PREFIX.unpack_from(self.buffer, start)
+        if length < FRAME_HEADER.size or length > self.max_frame_size:
+            error = "Corrupted stream: invalid frame length {}!".format(length)
+            raise ConnectionError(error)
+
+        end = start + FRAME_LENGTH.size + length
+        if end > self.end:
+            return None
+
+        self.start = end
+        return Frame(header, message_id, request_id, self.view[start + FRAME_PREFIX.size:end])
+
+    def __required_size__(self):
+        """
+            Number of bytes needed to hold the frame currently being received.
+        :return: size - integer
+        """
+        if self.end - self.start < FRAME_LENGTH.size:
+            return FRAME_LENGTH.size
+        length, = FRAME_LENGTH.unpack_from(self.buffer, self.start)
+        return FRAME_LENGTH.size + length
+
+    def __fill__(self, socket):
+        """
+            Receive more data from socket, making room in the buffer if required.
+        :param socket: connected socket
+        :return: None
+        """
+        pending = self.end - self.start
+        if pending == 0:
+            self.start = self.end = 0
+
+        required = self.__required_size__()
+        room = len(self.buffer) - self.end
+        if room < required - pending or (self.start and room < len(self.buffer) // 4):
+            if required > len(self.buffer):
+                # frame bigger than the whole buffer: grow it
+                buffer = bytearray(required)
+                buffer[:pending] = self.view[self.start:self.end]
+                self.buffer = buffer
+                self.view = memoryview(buffer)
+            else:
+                # move incomplete frame at the beginning of the buffer
+                self.buffer[:pending] = bytes(self.view[self.start:self.end])
+            self.start = 0
+            self.end = pending
+
+        received = socket.recv_into(self.view[self.end:])
+        if not received:
+            raise ConnectionError("Connection closed by peer!")
+        self.end += received
+
+    def read_message(self, socket):
+        """
+            Block until a complete message is received from socket.
+        :param socket: connected socket
+        :return: message - Frame type, payload as memoryview valid until next read
+        """
+        message = self.__parse__()
+        while message is None:
+            self.__fill__(socket)
+            message = self.__parse__()
+        return message
+
+    def has_buffered_message(self, header, message_id):
+        """
+            Check if a complete frame of message_id not waiting for a reply is already buffered, without consuming it.
+        :param header: COMMAND_HEADER or DATA_HEADER, compressed frames match too
+        :param message_id: command/data id as integer
+        :return: bool
+        """
+        start = self.start
+        while self.end - start >= FRAME_PREFIX.size:
+            length, frame_header, frame_message_id, request_id = FRAME_PREFIX.unpack_from(self.buffer, start)
+            start += FRAME_LENGTH.size + length
+            if length < FRAME_HEADER.size or start > self.end:
+                return False
+            if frame_message_id == message_id and frame_header & ~COMPRESSED_FLAG == header and \
+                    request_id == NO_REQUEST_ID:
+                return True
+        return False
+
+    def poll_message(self, socket, timeout):
+        """
+            Get next message if one is received within timeout.
+        :param socket: connected socket
+        :param timeout: seconds to wait for data
+        :return: message - Frame type, None if no complete message is available yet
+        """
+        message = self.__parse__()
+        if message is None:
+            readable, _, _ = select.select([socket], [], [], timeout)
+            if readable:
+                self.__fill__(socket)
+                message = self.__parse__()
+        return message
+
+    def read_messages(self, socket):
+        """
+            Generator yielding messages received from socket until connection is closed.
+        :param socket: connected socket
+        :return: messages - Frame type, payload as memoryview valid until next message is requested
+        """
+        unpack_from = FRAME_PREFIX.unpack_from
+        prefix_size = FRAME_PREFIX.size
+        length_size = FRAME_LENGTH.size
+        min_length = FRAME_HEADER.size
+        max_length = self.max_frame_size
+
+        while True:
+            # parse every complete frame already in the buffer
+            buffer = self.buffer
+            view = self.view
+            start = self.start
+            available = self.end
+            while available - start >= prefix_size:
+                length, header, message_id, request_id = unpack_from(buffer, start)
+                if length < min_length or length > max_length:
+                    self.start = start
+                    error = "Corrupted stream: invalid frame length {}!".format(length)
+                    raise ConnectionError(error)
+                end = start + length_size + length
+                if end > available:
+                    break
+                self.start = end
+                yield Frame(header, message_id, request_id, view[start + prefix_size:end])
+                start = end
+
+            try:
+                self.__fill__(socket)
+            except ConnectionError:
+                if self.end == self.start:
+                    return
+                raise
+
+    def reset(self):
+        """
+            Drop any partially received data, used when a new connection is established.
+        :return: None
+        """
+        self.start = 0
+        self.end = 0
+
+
+def decode_message(message, command_ids, data_ids=None, encoding='utf-8', command_types=None, data_types=None):
+    """
+        Decode a received message into the response dictionary used by Host and Client.
+    :param message: Frame type
+    :param command_ids: ids of the commands accepted from peer, set-like for constant time lookup
+    :param data_ids: ids of the data accepted from peer, None to accept any data id
+    :param encoding: character encoding key
+    :param command_types: value types of the commands accepted from peer by id, None if values are sent as text
+    :param data_types: value types of the data accepted from peer by id, None if values are sent as text
+    :return: {"Type": header, "ID": id, "RequestID": id, "Content": string, "Valid": bool, "Error": string or None}
+             Content is decoded by its value type if any, left as bytes when it cannot be decoded
+    """
+    header = message.header
+    response = {
+        "Type": header,
+        "ID": message.message_id,
+        "RequestID": message.request_id,
+        "Content": None,
+        "Valid": True,
+        "Error": None,
+    }
+
+    value_type = None
+    if header == COMMAND_HEADER and command_types:
+        value_type = command_types.get(message.message_id)
+    elif header == DATA_HEADER and data_types:
+        value_type = data_types.get(message.message_id)
+
+    try:
+        if value_type is not None:
+            response["Content"] = value_type.decode(message.payload)
+        else:
+            response["Content"] = str(message.payload, encoding)
+    except (UnicodeDecodeError, NameError):
+        response["Content"] = bytes(message.payload)
+        response["Valid"] = False
+        response["Error"] = INVALID_CONTENT_ERROR
+        return response
+
+    if header == COMMAND_HEADER:
+        if message.message_id not in command_ids:
+            response["Valid"] = False
+            response["Error"] = INVALID_ID_ERROR
+    elif header == DATA_HEADER:
+        if data_ids is not None and message.message_id not in data_ids:
+            response["Valid"] = False
+            response["Error"] = INVALID_ID_ERROR
+    else:
+        response["Valid"] = False
+        response["Error"] = INVALID_HEADER_ERROR
+
+    return response
+
+
+def encode_batch(entries):
+    """
+        Pack several commands or replies into one batch payload.
+    :param entries: list of (command/data id, value as bytes-like object)
+    :return: payload - bytes
+    """
+    parts = []
+    for entry_id, value in entries:
+        parts.append(BATCH_ENTRY.pack(entry_id, len(value)))
+        parts.append(value)
+    return b''.join(parts)
+
+
+def encode_commands(commands, encoding='utf-8', max_frame_size=MAX_FRAME_SIZE, typed=False):
+    """
+        Build a batch command's content from several commands and their values.
+    :param commands: list of (command as Command type from generic_utils.py, value or None)
+    :param encoding: character encoding key
+    :param max_frame_size: maximum frame size accepted by peer in bytes
+    :param typed: peer negotiated typed values, see Capabilities.supports_typed_values
+    :return: payload - bytes
+    """
+    if not commands:
+        raise ValueError("Unable to send an empty batch of commands!")
+
+    entries = []
+    for command, value in commands:
+        if command.value_required and value is None:
+            error = "Unable to send command {}! Value required, but {} provided!".format(command, value)
+            raise ValueError(error)
+        entries.append((command.id, encode_typed_value(command, value, encoding, typed)))
+    payload = encode_batch(entries)
+
+    length = FRAME_HEADER.size + len(payload)
+    if length > max_frame_size:
+        error = "Batch too big: {} bytes!".format(length) + "\nMaximum allowed: {} bytes!".format(max_frame_size)
+        raise ValueError(error)
+    return payload
+
+
+def decode_batch(payload):
+    """
+        Unpack a batch payload built by encode_batch.
+    :param payload: batch content as bytes-like object
+    :return: list of (command/data id, value as memoryview)
+    """
+    view = memoryview(payload)
+    entries = []
+    offset = 0
+    while offset < len(view):
+        if offset + BATCH_ENTRY.size > len(view):
+            error = "Corrupted batch: truncated entry at byte {}!".format(offset)
+            raise NameError(error)
+        entry_id, length = BATCH_ENTRY.unpack_from(view, offset)
+        offset += BATCH_ENTRY.size
+        if offset + length > len(view):
+            error = "Corrupted batch: value of {} bytes at byte {} exceeds batch!".format(length, offset)
+            raise NameError(error)
+        entries.append((entry_id, view[offset:offset + length]))
+        offset += length
+    return entries
+
+
+def decode_batch_reply(message, data_ids=None, encoding='utf-8', data_types=None):
+    """
+        Decode a batch reply into one response dictionary per command of the batch.
+    :param message: batch reply Frame type
+    :param data_ids: ids of the data accepted from peer, None to accept any data id
+    :param encoding: character encoding key
+    :param data_types: value types of the data accepted from peer by id, None if values are sent as text
+    :return: list of responses, see decode_message
+    """
+    return [
+        decode_message(Frame(DATA_HEADER, data_id, message.request_id, value), (), data_ids, encoding, None,
+                       data_types)
+        for data_id, value in decode_batch(message.payload)
+    ]
+
+
+async def read_frame(reader, max_frame_size=MAX_FRAME_SIZE):
+    """
+        Read a complete frame from an asyncio stream.
+    :param reader: asyncio.StreamReader
+    :param max_frame_size: maximum accepted frame size in bytes
+    :return: frame - Frame type, payload as bytes
+    """
+    try:
+        prefix = await reader.readexactly(FRAME_PREFIX.size)
+        length, header, message_id, request_id = FRAME_PREFIX.unpack(prefix)
+        if length < FRAME_HEADER.size or length > max_frame_size:
+            error = "Corrupted stream: invalid frame length {}!".format(length)
+            raise ConnectionError(error)
+        payload = await reader.readexactly(length - FRAME_HEADER.size)
+    except EOFError:
+        raise ConnectionError("Connection closed by peer!")
+
+    return Frame(header, message_id, request_id, payload)
+
+
+def pack_frame_prefix_into(buffer, offset, header, message_id, payload_length, request_id=NO_REQUEST_ID):
+    """
+        Write a frame's length, header, message id and request id into a preallocated buffer.
+    Used with send_buffers to send header and payload without concatenating them.
+    :param buffer: writable buffer of at least FRAME_PREFIX.size bytes after offset
+    :param offset: position in buffer
+    :param header: COMMAND_HEADER or DATA_HEADER
+    :param message_id: command/data id as integer
+    :param payload_length: size of the payload following the prefix in bytes
+    :param request_id: id correlating a reply with its command as integer
+    :return: None
+    """
+    length = FRAME_HEADER.size + payload_length
+    if length > MAX_FRAME_SIZE:
+        error = "Frame too big: {} bytes!".format(length) + "\nMaximum allowed: {} bytes!".format(MAX_FRAME_SIZE)
+        raise NameError(error)
+
+    FRAME_PREFIX.pack_into(buffer, offset, length, header, message_id, request_id)
+
+
+def send_buffers(socket, buffers):
+    """
+        Send several buffers as one contiguous stream, with a single scatter-gather sendmsg when supported.
+    Platforms without sendmsg (Windows) fall back to one sendall per buffer.
+    :param socket: connected socket
+    :param buffers: list of bytes-like objects
+    :return: None
+    """
+    if not hasattr(socket, 'sendmsg'):
+        for buffer in buffers:
+            socket.sendall(buffer)
+        return
+
+    views = [memoryview(buffer) for buffer in buffers]
+    while views:
+        sent = socket.sendmsg(views)
+        while views and sent >= views[0].nbytes:
+            sent -= views[0].nbytes
+            views.pop(0)
+        if sent:
+            views[0] = views[0][sent:]
+
+
+def recv_exactly_into(socket, view):
+    """
+        Fill a buffer with data received from socket.
+    :param socket: connected socket
+    :param view: writable memoryview to be filled entirely
+    :return: None
+    """
+    while view:
+        received = socket.recv_into(view)
+        if not received:
+            raise ConnectionError("Connection closed by peer!")
+        view = view[received:]
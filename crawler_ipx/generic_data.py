@@ -3,7 +3,7 @@ import logging
 from .generic_utils import Data
 from .generic_data_constants import *
 
-logger = logging.getLogger('ipx_logger')
+logger = logging.getLogger('ipx_logger.generic_data')
 
 
 class DataIPX:
@@ -30,6 +30,53 @@ class DataIPX:
             CREDENTIALS_DATA_IN_CODE,
         )
 
+        self.video_frame = Data(
+            VIDEO_FRAME_DATA_ID,
+            VIDEO_FRAME_DATA_NAME,
+            VIDEO_FRAME_DATA_DESCRIPTION,
+            VIDEO_FRAME_DATA_IN_CODE,
+        )
+
+        self.telemetry = Data(
+            TELEMETRY_DATA_ID,
+            TELEMETRY_DATA_NAME,
+            TELEMETRY_DATA_DESCRIPTION,
+            TELEMETRY_DATA_IN_CODE,
+        )
+
+        self.heartbeat = Data(
+            HEARTBEAT_DATA_ID,
+            HEARTBEAT_DATA_NAME,
+            HEARTBEAT_DATA_DESCRIPTION,
+            HEARTBEAT_DATA_IN_CODE,
+        )
+
+        self.resume_session = Data(
+            RESUME_SESSION_DATA_ID,
+            RESUME_SESSION_DATA_NAME,
+            RESUME_SESSION_DATA_DESCRIPTION,
+            RESUME_SESSION_DATA_IN_CODE,
+        )
+
+        self.batch_reply = Data(
+            BATCH_REPLY_DATA_ID,
+            BATCH_REPLY_DATA_NAME,
+            BATCH_REPLY_DATA_DESCRIPTION,
+            BATCH_REPLY_DATA_IN_CODE,
+        )
+
+        self.all_data = sorted(
+            [
+                self.command_accepted,
+                self.credentials,
+                self.video_frame,
+                self.telemetry,
+                self.heartbeat,
+                self.resume_session,
+                self.batch_reply,
+            ]
+        )
+
         logger.debug("IPX data initiated!")
 
 
@@ -3,10 +3,7 @@
 CREDENTIALS_DATA_ID = 1
 CREDENTIALS_DATA_NAME = "Credentials"
 CREDENTIALS_DATA_IN_CODE = "credentials"
-CREDENTIALS_DATA_DESCRIPTION = CREDENTIALS_DATA_NAME
-CREDENTIALS_DATA_DESCRIPTION += " data tells client or host the client's credentials" + "\n"
-CREDENTIALS_DATA_DESCRIPTION += "ID: " + str(CREDENTIALS_DATA_ID) + "\n"
-CREDENTIALS_DATA_DESCRIPTION += "In code usage: " + str(CREDENTIALS_DATA_IN_CODE) + "\n"
+CREDENTIALS_DATA_DESCRIPTION = "Credentials data tells client or host the client's credentials"
 # =====================================================================================================================
 
 # COMMAND ACCEPTED DATA
@@ -14,8 +11,47 @@ CREDENTIALS_DATA_DESCRIPTION += "In code usage: " + str(CREDENTIALS_DATA_IN_CODE
 COMMAND_ACCEPTED_DATA_ID = 2
 COMMAND_ACCEPTED_DATA_NAME = "Command accepted"
 COMMAND_ACCEPTED_DATA_IN_CODE = "command_accepted"
-COMMAND_ACCEPTED_DATA_DESCRIPTION = COMMAND_ACCEPTED_DATA_NAME
-COMMAND_ACCEPTED_DATA_DESCRIPTION += " data tells client or host if previous received command is accepted or not" + "\n"
-COMMAND_ACCEPTED_DATA_DESCRIPTION += "ID: " + str(COMMAND_ACCEPTED_DATA_ID) + "\n"
-COMMAND_ACCEPTED_DATA_DESCRIPTION += "In code usage: " + str(COMMAND_ACCEPTED_DATA_IN_CODE) + "\n"
+COMMAND_ACCEPTED_DATA_DESCRIPTION = ("Command accepted data tells client or host if previous received command is accepted "
+                                     "or not")
+# =====================================================================================================================
+
+# VIDEO FRAME DATA
+# =====================================================================================================================
+VIDEO_FRAME_DATA_ID = 3
+VIDEO_FRAME_DATA_NAME = "Video frame"
+VIDEO_FRAME_DATA_IN_CODE = "video_frame"
+VIDEO_FRAME_DATA_DESCRIPTION = "Video frame data carries an encoded camera frame from client to host"
+# =====================================================================================================================
+
+# TELEMETRY DATA
+# =====================================================================================================================
+TELEMETRY_DATA_ID = 4
+TELEMETRY_DATA_NAME = "Telemetry"
+TELEMETRY_DATA_IN_CODE = "telemetry"
+TELEMETRY_DATA_DESCRIPTION = "Telemetry data carries a batch of binary sensor samples from client to host"
+# =====================================================================================================================
+
+# HEARTBEAT DATA
+# =====================================================================================================================
+HEARTBEAT_DATA_ID = 5
+HEARTBEAT_DATA_NAME = "Heartbeat"
+HEARTBEAT_DATA_IN_CODE = "heartbeat"
+HEARTBEAT_DATA_DESCRIPTION = "Heartbeat data tells host that client is alive and carries round trip timestamps"
+# =====================================================================================================================
+
+# RESUME SESSION DATA
+# =====================================================================================================================
+RESUME_SESSION_DATA_ID = 6
+RESUME_SESSION_DATA_NAME = "Resume session"
+RESUME_SESSION_DATA_IN_CODE = "resume_session"
+RESUME_SESSION_DATA_DESCRIPTION = ("Resume session data carries the token of client's previous session instead of "
+                                   "credentials")
+# =====================================================================================================================
+
+# BATCH REPLY DATA
+# =====================================================================================================================
+BATCH_REPLY_DATA_ID = 7
+BATCH_REPLY_DATA_NAME = "Batch reply"
+BATCH_REPLY_DATA_IN_CODE = "batch_reply"
+BATCH_REPLY_DATA_DESCRIPTION = "Batch reply data carries the replies to every command of a batch, in batch's order"
 # =====================================================================================================================
@@ -1,14 +1,80 @@
 import logging
 
+from .value_types import ValueType, BytesType
+
 # ===================================================== CONSTANTS =====================================================
 # Maximum number of connections to host allowed at once (maximum number of clients)
 ALLOWED_NUMBER_OF_CONNECTIONS = 1
 
+# Maximum number of clients served at once by host's asyncio server mode
+MAX_NUMBER_OF_CLIENTS = 64
+
+# Seconds a connected client has to send valid credentials
+AUTHENTICATION_TIMEOUT = 5.0
+
 # Default connection port
 DEFAULT_PORT = 1369
 
-# Data income buffer size
-BUFFER_SIZE = 64
+# Data income buffer size (bytes read from socket at once, frames may be split across several reads)
+BUFFER_SIZE = 4096
+
+# Maximum size of a single frame (header byte + message id + payload), bigger frames are considered corrupted
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+# Maximum number of commands sent and waiting for client's reply at once
+COMMANDS_IN_FLIGHT = 32
+
+# Seconds to wait for a command's reply before failing it
+COMMAND_TIMEOUT = 2.0
+
+# Seconds receiver threads wait for data before checking timeouts and stop requests
+RECEIVER_POLL_INTERVAL = 0.05
+
+# Seconds server waits before checking again whether a backlogged connection accepts the latest command values
+WRITABLE_POLL_INTERVAL = 0.005
+
+# Video frames use a dedicated connection on host's port + VIDEO_PORT_OFFSET
+VIDEO_PORT_OFFSET = 1
+
+# Video streaming frame rate
+VIDEO_FRAMES_PER_SECOND = 20
+
+# Frames waiting to be sent, the oldest one is dropped when the link is too slow
+VIDEO_QUEUE_SIZE = 2
+
+# Size of pooled video frame buffers, grown only if a bigger frame is captured or received
+VIDEO_BUFFER_SIZE = 256 * 1024
+
+# Telemetry samples buffered by client before a batch is sent to host
+TELEMETRY_BATCH_SIZE = 512
+
+# Seconds a telemetry sample may wait in client's buffer before its batch is sent
+TELEMETRY_FLUSH_INTERVAL = 0.1
+
+# Maximum size of a control channel datagram, kept below usual MTU to avoid IP fragmentation
+MAX_DATAGRAM_SIZE = 1400
+
+# Seconds between heartbeats sent to a connected peer
+HEARTBEAT_INTERVAL = 0.25
+
+# Seconds without receiving anything from a peer sending heartbeats before its connection is dropped
+DEAD_PEER_TIMEOUT = 1.0
+
+# Seconds client waits before its first reconnection attempt, doubled after each failed attempt up to the maximum
+RECONNECT_INITIAL_DELAY = 0.05
+RECONNECT_MAX_DELAY = 2.0
+
+# Seconds host keeps the session of a disconnected client, so it can be resumed without credentials
+SESSION_TIMEOUT = 60.0
+
+# Replies kept by client to send them again instead of running twice a command resent on session resumption
+SESSION_REPLIES = 64
+
+# Payloads smaller than this are sent uncompressed even when compression is negotiated, in bytes
+COMPRESSION_THRESHOLD = 256
+
+# Default zlib compression level, low levels keep client's CPU cost small
+COMPRESSION_LEVEL = 3
 
 # Headers used to send and receive data/commands
 COMMAND_HEADER = 0
@@ -20,14 +86,40 @@ CLIENT_PASSWORD = 'Qwerty123'
 # ===================================================== CONSTANTS =====================================================
 
 
-logger = logging.getLogger('ipx_logger')
+logger = logging.getLogger('ipx_logger.generic_utils')
+
+
+def decode_credentials(content):
+    """
+        Extract username and password from credentials data content.
+    :param content: credentials data content as string
+                    example: 'u:RaspberryPIScorpionIPX\np:Qwerty123'
+    :return: (username, password), (None, None) if content is malformed
+    """
+    fields = str(content).split()
+    if len(fields) < 2 or not fields[0].startswith('u:') or not fields[1].startswith('p:'):
+        return None, None
+    return fields[0][2:], fields[1][2:]
+
+
+def credentials_are_valid(username, password):
+    """
+        Check if the credentials received from client are the expected ones.
+    :param username: client's username as string
+    :param password: client's password as string
+    :return: True if valid, False otherwise
+    """
+    return username == CLIENT_USERNAME and password == CLIENT_PASSWORD
 
 
 class Command:
     """
         Class used to handle commands sent and received by IPX client and host.
+    Commands are shared by every Host and Client through the command registry and must not be modified.
     """
-    def __init__(self, cmd_id, name, description, in_code, value_required=False):
+    __slots__ = ('id', 'name', 'in_code', 'description', 'value_required', 'value_type')
+
+    def __init__(self, cmd_id, name, description, in_code, value_required=False, value_type=None):
         """
             Constructor
         :param cmd_id: unique id of the command as positive integer
@@ -36,13 +128,12 @@ class Command:
                      example: Ask client for it's name
         :param in_code: code used to call command as string
                         example: ask_client_name
-        :param description: command's description as string
+        :param description: command's description as string, id, value_required and in_code are appended on demand
                             example: Get client's name command asks client to send it's name
-                                     id: 13
-                                     value_required: False
-                                     in_code usage: ask_client_name
         :param value_required: specifies if additional info (for instance a value) is required when sending the command.
                                example: set_speed_command(speed_value) would require the speed_value additional info
+        :param value_type: value_types' ValueType the value is sent as in binary, None to send the value as text
+                           example: FLOAT32_VALUE
         """
         if type(cmd_id) is not int or cmd_id < 0:
             error = "Invalid command id: {}!".format(cmd_id) + "\nExpected positive integer type!"
@@ -64,13 +155,16 @@ class Command:
             error = "Invalid command value required attribute: {}".format(value_required) + "\nExpected bool type!"
             raise NameError(error)
 
+        if value_type is not None and not isinstance(value_type, (ValueType, BytesType)):
+            error = "Invalid command value type: {}".format(value_type) + "\nExpected ValueType type!"
+            raise NameError(error)
+
         self.id = cmd_id
         self.name = name
         self.in_code = in_code
         self.description = description
         self.value_required = value_required
-
-        logger.debug("Command " + str(self.in_code) + " initiated!")
+        self.value_type = value_type
 
     def get_id(self):
         """
@@ -95,10 +189,15 @@ class Command:
 
     def get_description(self):
         """
-            Get command's description.
+            Get command's description, including id, value required attribute and in code usage.
         :return: description - string
         """
-        return self.description
+        description = self.description + "\n"
+        description += "ID: " + str(self.id) + "\n"
+        description += "Value required: " + str(self.value_required) + "\n"
+        description += "Value type: " + str(self.value_type or 'text') + "\n"
+        description += "In code usage: " + str(self.in_code) + "\n"
+        return description
 
     def get_value_required(self):
         """
@@ -107,6 +206,13 @@ class Command:
         """
         return self.value_required
 
+    def get_value_type(self):
+        """
+            Get command's value type.
+        :return: ValueType, None if value is sent as text
+        """
+        return self.value_type
+
     def __str__(self):
         """
             Informal” or nicely printable string representation of the object.
@@ -133,8 +239,11 @@ class Command:
 class Data:
     """
         Class used to handle data sent and received by IPX client and host.
+    Data are shared by every Host and Client through the command registry and must not be modified.
     """
-    def __init__(self, data_id, name, description, in_code):
+    __slots__ = ('id', 'name', 'in_code', 'description', 'value_type')
+
+    def __init__(self, data_id, name, description, in_code, value_type=None):
         """
             Constructor
         :param data_id: unique id of the data as positive integer
@@ -143,10 +252,10 @@ class Data:
                      example: Headlights status
         :param in_code: code used to call data as string
                         example: headlights_status
-        :param description: data's description as string
+        :param description: data's description as string, id and in_code are appended on demand
                             example: Headlights status data indicates status of headlights
-                                     id: 13
-                                     in_code usage: headlights_status
+        :param value_type: value_types' ValueType the value is sent as in binary, None to send the value as text
+                           example: BOOL_VALUE
         """
 
         if type(data_id) is not int or data_id < 0:
@@ -165,12 +274,15 @@ class Data:
             error = "Invalid data description: {}".format(description) + "\nExpected str type!"
             raise NameError(error)
 
+        if value_type is not None and not isinstance(value_type, (ValueType, BytesType)):
+            error = "Invalid data value type: {}".format(value_type) + "\nExpected ValueType type!"
+            raise NameError(error)
+
         self.id = data_id
         self.name = name
         self.in_code = in_code
         self.description = description
-
-        logger.debug("IPX data " + str(self.in_code) + " initiated!")
+        self.value_type = value_type
 
     def get_id(self):
         """
@@ -195,10 +307,13 @@ class Data:
 
     def get_description(self):
         """
-            Get data's description.
+            Get data's description, including id and in code usage.
         :return: description - string
         """
-        return self.description
+        description = self.description + "\n"
+        description += "ID: " + str(self.id) + "\n"
+        description += "In code usage: " + str(self.in_code) + "\n"
+        return description
 
     def __str__(self):
         """
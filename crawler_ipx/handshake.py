@@ -0,0 +1,196 @@
+import logging
+
+from .generic_utils import MAX_FRAME_SIZE
+
+from .compression import COMPRESSION_ALGORITHMS
+
+# ===================================================== CONSTANTS =====================================================
+# Version of the framing and handshake protocol, peers use the lowest version both support
+PROTOCOL_VERSION = 2
+
+# First protocol version sending values of commands and data declaring a value type in binary instead of text
+TYPED_VALUES_VERSION = 2
+
+# Optional channels a peer may support
+VIDEO_CHANNEL = 'video'
+TELEMETRY_CHANNEL = 'telemetry'
+CONTROL_CHANNEL = 'control'
+HEARTBEAT_CHANNEL = 'heartbeat'
+ALL_CHANNELS = (CONTROL_CHANNEL, HEARTBEAT_CHANNEL, TELEMETRY_CHANNEL, VIDEO_CHANNEL)
+
+# Channels of peers authenticating with plain credentials, which existed before capabilities were negotiated
+LEGACY_CHANNELS = (CONTROL_CHANNEL, TELEMETRY_CHANNEL, VIDEO_CHANNEL)
+
+# Keys of hello and session messages' lines, written as key:value
+USERNAME_FIELD = 'u'
+PASSWORD_FIELD = 'p'
+TOKEN_FIELD = 't'
+CAPABILITIES_FIELD = 'c'
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.handshake')
+
+
+class Capabilities:
+    """
+        Class used to describe what a peer supports, exchanged in the hello/session handshake.
+    Each side offers its capabilities, negotiate() keeps what both support; the result is stored on the connection.
+    Capabilities are written as 'version=1;max_frame_size=16777216;compression=zlib;channels=control,video'.
+    """
+    __slots__ = ('version', 'max_frame_size', 'compression', 'channels')
+
+    def __init__(self, version=PROTOCOL_VERSION, max_frame_size=MAX_FRAME_SIZE, compression=COMPRESSION_ALGORITHMS,
+                 channels=ALL_CHANNELS):
+        """
+            Constructor
+        :param version: protocol version as integer
+                        example: 1
+        :param max_frame_size: biggest frame accepted, in bytes
+                               example: 16777216
+        :param compression: supported compression algorithms by order of preference
+                            example: ('zlib', )
+        :param channels: supported optional channels
+                         example: ('control', 'video')
+        """
+        if type(version) is not int or version < 0:
+            error = "Invalid protocol version: {}!".format(version) + "\nExpected positive integer type!"
+            raise NameError(error)
+
+        if type(max_frame_size) is not int or max_frame_size < 1:
+            error = "Invalid max frame size: {}!".format(max_frame_size) + "\nExpected positive integer type!"
+            raise NameError(error)
+
+        self.version = version
+        self.max_frame_size = max_frame_size
+        self.compression = tuple(compression)
+        self.channels = frozenset(channels)
+
+    def supports(self, channel):
+        """
+            Check if a channel is supported.
+        :param channel: channel's name
+                        example: VIDEO_CHANNEL
+        :return: bool
+        """
+        return channel in self.channels
+
+    def supports_typed_values(self):
+        """
+            Check if values of commands and data declaring a value type are sent in binary.
+        :return: bool
+        """
+        return self.version >= TYPED_VALUES_VERSION
+
+    def get_compression(self):
+        """
+            Get preferred compression algorithm.
+        :return: algorithm's name, None if no compression
+        """
+        return self.compression[0] if self.compression else None
+
+    def negotiate(self, peer):
+        """
+            Keep what both sides support: lowest version and frame size, peer's preferred common compression, common
+        channels. Same result on both sides when the host negotiates with the client's capabilities as peer.
+        :param peer: Capabilities offered by the other side
+        :return: negotiated Capabilities
+        """
+        return Capabilities(
+            min(self.version, peer.version),
+            min(self.max_frame_size, peer.max_frame_size),
+            [algorithm for algorithm in peer.compression if algorithm in self.compression],
+            self.channels & peer.channels,
+        )
+
+    def encode(self):
+        """
+            Write capabilities as text.
+        :return: capabilities - string
+        """
+        return "version={};max_frame_size={};compression={};channels={}".format(
+            self.version, self.max_frame_size, ','.join(self.compression), ','.join(sorted(self.channels)))
+
+    @classmethod
+    def decode(cls, text):
+        """
+            Read capabilities written by encode, unknown keys are ignored so newer peers may add some.
+        :param text: capabilities as string
+        :return: Capabilities
+        """
+        fields = {}
+        for item in str(text).split(';'):
+            key, _, value = item.partition('=')
+            fields[key.strip()] = value.strip()
+
+        try:
+            version = int(fields.get('version', 0))
+            max_frame_size = int(fields.get('max_frame_size', MAX_FRAME_SIZE))
+        except ValueError:
+            error = "Invalid capabilities: {}!".format(text)
+            raise NameError(error)
+
+        return cls(
+            version,
+            max_frame_size,
+            [algorithm for algorithm in fields.get('compression', '').split(',') if algorithm],
+            [channel for channel in fields.get('channels', '').split(',') if channel],
+        )
+
+    @classmethod
+    def legacy(cls):
+        """
+            Capabilities of a peer authenticating with plain credentials.
+        :return: Capabilities
+        """
+        return cls(0, MAX_FRAME_SIZE, (), LEGACY_CHANNELS)
+
+    def __eq__(self, other):
+        return isinstance(other, Capabilities) and self.encode() == other.encode()
+
+    def __str__(self):
+        """
+            Informal” or nicely printable string representation of the object.
+        :return: capabilities as text
+        """
+        return self.encode()
+
+
+def encode_handshake(fields):
+    """
+        Write hello or session message's content: one key:value line per field.
+    :param fields: dictionary key: value, None values are skipped
+                   example: {USERNAME_FIELD: 'RaspberryPIScorpionIPX', PASSWORD_FIELD: 'Qwerty123'}
+    :return: content - string
+    """
+    return '\n'.join('{}:{}'.format(key, value) for key, value in fields.items() if value is not None)
+
+
+def decode_handshake(content):
+    """
+        Read hello or session message's content written by encode_handshake.
+    :param content: content as string
+    :return: dictionary key: value
+    """
+    fields = {}
+    for line in str(content).splitlines():
+        key, separator, value = line.partition(':')
+        if separator:
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+def read_capabilities(fields):
+    """
+        Get the capabilities carried by a decoded hello or session message.
+    :param fields: dictionary returned by decode_handshake
+    :return: Capabilities, legacy ones if message carries none or invalid ones
+    """
+    text = fields.get(CAPABILITIES_FIELD)
+    if text is None:
+        return Capabilities.legacy()
+
+    try:
+        return Capabilities.decode(text)
+    except NameError as err:
+        logger.warning(str(err))
+        return Capabilities.legacy()
@@ -0,0 +1,218 @@
+import logging
+import struct
+import threading
+import time
+
+from .generic_utils import HEARTBEAT_INTERVAL as GU_HI
+from .generic_utils import DEAD_PEER_TIMEOUT as GU_DPT
+
+# ===================================================== CONSTANTS =====================================================
+# Heartbeat content: sender's time.monotonic() when sent (8 bytes, float), latest sent time received from peer echoed
+# back (8 bytes, float, 0 if none) and seconds the echoed value was held before being sent back (8 bytes, float)
+HEARTBEAT = struct.Struct('>ddd')
+
+# Gains of the smoothed round trip time and of its mean deviation (jitter), as in TCP's retransmission timer (RFC 6298)
+RTT_GAIN = 1 / 8
+JITTER_GAIN = 1 / 4
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.heartbeat')
+
+
+class Heartbeat:
+    """
+        Class used to supervise a connection: heartbeats are sent every interval in both directions, each one echoing
+    the latest sent time received from the peer, so both ends estimate round trip time without extra messages.
+    Peer is considered dead when nothing was received from it for dead_peer_timeout seconds; supervision starts with
+    peer's first heartbeat, so peers not sending heartbeats are never dropped.
+    """
+    def __init__(self, send=None, interval=GU_HI, dead_peer_timeout=GU_DPT, on_dead_peer=None, wait_for_peer=False):
+        """
+            Constructor
+        :param send: function called as send(payload) with each heartbeat as bytes by the heartbeat thread,
+                     returns True if ok, error occurred as string if not ok; None if heartbeats are sent by caller
+        :param interval: seconds between heartbeats
+                         example: 0.25
+        :param dead_peer_timeout: seconds without receiving anything before peer is considered dead
+                                  example: 1.0
+        :param on_dead_peer: function called without arguments by the heartbeat thread when peer is considered dead
+        :param wait_for_peer: send heartbeats only once peer sent its first one
+        """
+        if interval <= 0 or dead_peer_timeout <= interval:
+            error = "Invalid heartbeat interval: {}, dead peer timeout: {}!".format(interval, dead_peer_timeout)
+            error += "\nExpected 0 < interval < dead peer timeout!"
+            raise NameError(error)
+
+        self.send = send
+        self.interval = interval
+        self.dead_peer_timeout = dead_peer_timeout
+        self.on_dead_peer = on_dead_peer
+        self.wait_for_peer = wait_for_peer
+
+        # time.monotonic() of the latest message received from peer
+        self.last_received = time.monotonic()
+
+        # (peer's sent time, time.monotonic() when received) of peer's latest heartbeat, None until the first one
+        self.peer_heartbeat = None
+
+        # round trip estimation, seconds
+        self.last_rtt = None
+        self.smoothed_rtt = None
+        self.jitter = None
+
+        # thread sending heartbeats and checking peer, see start
+        self.running = False
+        self.wake_up = threading.Event()
+        self.thread = None
+
+        # heartbeat statistics
+        self.heartbeats_sent = 0
+        self.heartbeats_received = 0
+        self.corrupted_heartbeats = 0
+        self.rtt_samples = 0
+
+    def start(self):
+        """
+            Start the thread sending heartbeats every interval and checking peer is alive.
+        :return: None
+        """
+        if self.running:
+            return
+        self.running = True
+        self.wake_up.clear()
+        self.last_received = time.monotonic()
+        self.thread = threading.Thread(target=self.__run__, name='Heartbeat', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+            Stop heartbeat thread.
+        :return: None
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.wake_up.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def packet_received(self, now=None):
+        """
+            Record that something was received from peer, any message proves peer is alive.
+        :param now: time.monotonic() value, current time if None
+        :return: None
+        """
+        self.last_received = time.monotonic() if now is None else now
+
+    def create_heartbeat(self, now=None):
+        """
+            Build a heartbeat echoing peer's latest one.
+        :param now: time.monotonic() value, current time if None
+        :return: payload - bytes, None if waiting for peer's first heartbeat
+        """
+        if now is None:
+            now = time.monotonic()
+
+        peer_heartbeat = self.peer_heartbeat
+        if peer_heartbeat is None:
+            if self.wait_for_peer:
+                return None
+            return HEARTBEAT.pack(now, 0.0, 0.0)
+
+        peer_sent_at, received_at = peer_heartbeat
+        return HEARTBEAT.pack(now, peer_sent_at, now - received_at)
+
+    def handle_heartbeat(self, payload, now=None):
+        """
+            Handle a heartbeat received from peer, updating round trip estimation if it echoes one of ours.
+        :param payload: heartbeat content as bytes-like object
+        :param now: time.monotonic() value, current time if None
+        :return: round trip time sample in seconds, None if heartbeat carries no sample
+        """
+        if now is None:
+            now = time.monotonic()
+        self.last_received = now
+
+        if len(payload) != HEARTBEAT.size:
+            self.corrupted_heartbeats += 1
+            logger.warning("Corrupted heartbeat: %s bytes! Expected %s bytes!", len(payload), HEARTBEAT.size)
+            return None
+
+        sent_at, echoed_sent_at, held = HEARTBEAT.unpack(payload)
+        self.peer_heartbeat = (sent_at, now)
+        self.heartbeats_received += 1
+
+        if not echoed_sent_at:
+            return None
+
+        rtt = now - echoed_sent_at - held
+        if rtt < 0:
+            return None
+
+        self.__update_rtt__(rtt)
+        return rtt
+
+    def __update_rtt__(self, rtt):
+        """
+            Update smoothed round trip time and jitter with a new sample.
+        :param rtt: round trip time sample in seconds
+        :return: None
+        """
+        if self.smoothed_rtt is None:
+            self.smoothed_rtt = rtt
+            self.jitter = rtt / 2
+        else:
+            self.jitter += JITTER_GAIN * (abs(self.smoothed_rtt - rtt) - self.jitter)
+            self.smoothed_rtt += RTT_GAIN * (rtt - self.smoothed_rtt)
+        self.last_rtt = rtt
+        self.rtt_samples += 1
+
+    def is_peer_dead(self, now=None):
+        """
+            Check if peer, once it sent a heartbeat, stayed silent for more than dead_peer_timeout seconds.
+        :param now: time.monotonic() value, current time if None
+        :return: bool
+        """
+        if self.peer_heartbeat is None:
+            return False
+        if now is None:
+            now = time.monotonic()
+        return now - self.last_received > self.dead_peer_timeout
+
+    def __run__(self):
+        """
+            Heartbeat thread's loop: send a heartbeat every interval until peer is dead or heartbeat is stopped.
+        :return: None
+        """
+        while self.running:
+            self.wake_up.wait(self.interval)
+            if not self.running:
+                break
+
+            if self.is_peer_dead():
+                logger.warning("Nothing received from peer for %.3fs!", time.monotonic() - self.last_received)
+                self.running = False
+                if self.on_dead_peer is not None:
+                    self.on_dead_peer()
+                break
+
+            payload = self.create_heartbeat()
+            if payload is not None and self.send is not None and self.send(payload) is True:
+                self.heartbeats_sent += 1
+
+    def get_statistics(self):
+        """
+            Get heartbeat statistics, times in seconds.
+        :return: dictionary
+        """
+        return {
+            "SmoothedRTT": self.smoothed_rtt,
+            "Jitter": self.jitter,
+            "LastRTT": self.last_rtt,
+            "RTTSamples": self.rtt_samples,
+            "HeartbeatsSent": self.heartbeats_sent,
+            "HeartbeatsReceived": self.heartbeats_received,
+            "CorruptedHeartbeats": self.corrupted_heartbeats,
+            "SinceLastReceived": time.monotonic() - self.last_received,
+        }
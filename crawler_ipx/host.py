@@ -1,31 +1,82 @@
 import logging
+import select
 import socket as py_socket
+import threading
+import time
+
+from concurrent.futures import Future
 
 from .generic_utils import ALLOWED_NUMBER_OF_CONNECTIONS as GU_ANOC
 from .generic_utils import DEFAULT_PORT as GU_DP
-from .generic_utils import BUFFER_SIZE
+from .generic_utils import COMMANDS_IN_FLIGHT as GU_CIF
+from .generic_utils import COMMAND_TIMEOUT as GU_CT
+from .generic_utils import RECEIVER_POLL_INTERVAL as GU_RPI
+from .generic_utils import VIDEO_PORT_OFFSET as GU_VPO
+from .generic_utils import HEARTBEAT_INTERVAL as GU_HI
+from .generic_utils import DEAD_PEER_TIMEOUT as GU_DPT
+from .generic_utils import AUTHENTICATION_TIMEOUT as GU_AT
+from .generic_utils import MAX_FRAME_SIZE
 from .generic_utils import COMMAND_HEADER, DATA_HEADER
+from .generic_utils import MAX_NUMBER_OF_CLIENTS as GU_MNOC
 from .generic_utils import CLIENT_USERNAME as GU_USR
-from .generic_utils import CLIENT_PASSWORD as GU_PWD
-
-from .host_utils import HostCommands
-from .client_utils import ClientCommands
-from .generic_data import DataIPX
-
-logger = logging.getLogger('ipx_logger')
+from .generic_utils import credentials_are_valid, decode_credentials
+
+from .frame_utils import MessageReader
+from .frame_utils import COMPRESSED_FLAG, NO_REQUEST_ID
+from .frame_utils import decode_batch_reply, decode_message, encode_commands, encode_typed_value
+
+from .command_registry import get_registry
+from .request_utils import PendingRequests
+from .metrics import Metrics
+from .control_channel import ControlChannelSender
+from .control_channel import create_control_token
+from .heartbeat import Heartbeat
+from .scheduler import OutboundScheduler
+from .scheduler import get_priority
+from .recorder import RECEIVED, SENT
+from .recorder import FrameRecorder
+from .recorder import get_recording_path
+from .compression import ZLIB_COMPRESSION
+from .compression import PayloadCompressor
+from .handshake import CONTROL_CHANNEL, HEARTBEAT_CHANNEL, VIDEO_CHANNEL
+from .handshake import CAPABILITIES_FIELD, TOKEN_FIELD
+from .handshake import Capabilities
+from .handshake import decode_handshake, encode_handshake, read_capabilities
+from .session import SessionStore
+from .telemetry import TelemetryReceiver
+from .video_streaming import VideoReceiver
+
+from .generic_data_constants import TELEMETRY_DATA_ID
+from .generic_data_constants import HEARTBEAT_DATA_ID
+from .generic_data_constants import BATCH_REPLY_DATA_ID
+
+logger = logging.getLogger('ipx_logger.host')
 
 
 class Host:
     """
         Classed used to control host.
     """
-    def __init__(self, port=GU_DP, number_of_connections=GU_ANOC):
+    def __init__(self, port=GU_DP, number_of_connections=GU_ANOC, commands_in_flight=GU_CIF, accept_reconnects=False,
+                 heartbeat_interval=GU_HI, dead_peer_timeout=GU_DPT, capabilities=None, compression=None,
+                 coalesce_commands=False):
         """
             Constructor
         :param port: host's communication port as integer
                      example: 1369
         :param number_of_connections: host's maximum number of connection allowed at once
                                       example: 1
+        :param commands_in_flight: maximum number of commands waiting for client's reply at once
+                                   example: 32
+        :param accept_reconnects: wait for client's reconnection as soon as connection with client is lost
+        :param heartbeat_interval: seconds between heartbeats sent to clients
+                                   example: 0.25
+        :param dead_peer_timeout: seconds without receiving anything from a client before its connection is dropped
+                                  example: 1.0
+        :param capabilities: Capabilities supported by host, see handshake.py; None for every default capability
+        :param compression: PayloadCompressor used once zlib compression is negotiated, None for default settings
+        :param coalesce_commands: send only the latest value of value_required commands while the connection is busy or
+                                  backlogged, last value wins; also in server mode
         """
         try:
             logger.debug("Initiating host...")
@@ -36,29 +87,92 @@ class Host:
             # set host's name
             self.name = py_socket.gethostname()
 
-            # set host's ip address and port
-            self.ip = self.__get_host_ip_address__()
+            # set host's port, ip address is resolved on first get_ip call
+            self.ip = None
             self.port = port
 
             # bind the socket to public interface
             self.socket.bind((self.name, self.port))
+            self.port = self.socket.getsockname()[1]
 
             # allow a specific number of connections
             self.socket.listen(number_of_connections)
 
-            # initiate commands that can be sent by host
-            self.commands = HostCommands()
+            # constant time look up of commands and data
+            self.registry = get_registry()
+
+            # commands that can be sent by host, shared read only catalog
+            self.commands = self.registry.host_commands
 
-            # initiate commands that can be sent by client
-            self.client_commands = ClientCommands()
+            # commands that can be sent by client, shared read only catalog
+            self.client_commands = self.registry.client_commands
 
-            # initiate data that can be send or received
-            self.data = DataIPX()
+            # data that can be send or received, shared read only catalog
+            self.data = self.registry.data
 
             # client instance and attributes
             self.client = None
             self.client_name = None
 
+            # rebuilds frames received from client
+            self.receiver = MessageReader()
+
+            # frames are sent by user's and heartbeat threads, highest priority class first
+            self.scheduler = OutboundScheduler()
+
+            # connection supervision, see connect_with_client
+            self.accept_reconnects = accept_reconnects
+            self.heartbeat_interval = heartbeat_interval
+            self.dead_peer_timeout = dead_peer_timeout
+            self.heartbeat = None
+            self.connection_lost_at = None
+
+            # client's session, resumed by a reconnecting client instead of verifying its credentials again
+            self.sessions = SessionStore()
+            self.session = None
+
+            # capabilities supported by host and the ones negotiated with connected client, see connect_with_client
+            self.capabilities = Capabilities() if capabilities is None else capabilities
+            self.negotiated = None
+
+            # values of commands and data declaring a value type sent in binary, if negotiated with client
+            self.typed_values = False
+
+            # payload compression, used only if negotiated with client
+            self.compression = PayloadCompressor() if compression is None else compression
+            self.compressor = None
+
+            # records every frame sent and received, see start_recording
+            self.recorder = None
+
+            # commands waiting for client's reply, limited to commands_in_flight at once
+            self.pending_requests = PendingRequests()
+            self.commands_window = threading.BoundedSemaphore(commands_in_flight)
+
+            # thread reading client's replies, see start_receiver
+            self.receiver_thread = None
+            self.receiving = False
+
+            # asyncio server serving many clients, see start_server_mode
+            self.server = None
+
+            # receives client's video frames, see start_video_receiver
+            self.video_receiver = None
+
+            # sends value commands over UDP, see open_control_channel
+            self.control_channel = None
+
+            # unpacks client's telemetry batches
+            self.telemetry = TelemetryReceiver()
+
+            # counters and histograms, see host_cmd stats
+            self.metrics = Metrics('host')
+            self.scheduler.wait_time = self.metrics.send_wait
+            self.scheduler.coalesced = self.metrics.coalesced_commands
+
+            # value commands still waiting to be sent are replaced by newer values, see send_command
+            self.coalesce_commands = coalesce_commands
+
             # connection encoding
             self.encoding = 'utf-8'
 
@@ -80,9 +194,11 @@ class Host:
 
     def get_ip(self):
         """
-            Get host's ip address.
+            Get host's ip address, resolved on first call.
         :return: ip - string
         """
+        if self.ip is None:
+            self.ip = self.__get_host_ip_address__()
         return self.ip
 
     def get_port(self):
@@ -157,88 +273,344 @@ class Host:
             return error
 
         try:
-            package = str(COMMAND_HEADER) + '\n' + str(command.id) + '\n' + str(value)
-            package = self.string_to_bytes(package)
-            self.client.send(package)
+            payload = encode_typed_value(command, value, self.encoding, self.typed_values)
+            if command.value_required and self.control_channel is not None:
+                self.control_channel.send(command.id, payload)
+            else:
+                self.__send_frame__(COMMAND_HEADER, command.id, payload,
+                                    coalesce=self.coalesce_commands and command.value_required)
             return True
         except Exception as err:
             error = "Error occurred while sending command to client:\ncommand: " + str(command) + '\n' + str(err)
             logger.warning(error)
             return error
 
+    def send_frame(self, header, message_id, payload=b'', request_id=NO_REQUEST_ID):
+        """
+            Sends a raw frame to the client, used to replay recorded frames.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes-like object
+        :param request_id: id correlating client's reply with the frame as integer
+        :return: True if ok, error occurred otherwise
+        """
+        if self.client is None:
+            error = "Unable to send frame: no client connected!"
+            logger.warning(error)
+            return error
+
+        try:
+            self.__send_frame__(header, message_id, bytes(payload), request_id)
+            return True
+        except Exception as err:
+            error = "Error occurred while sending frame to client: " + str(err)
+            logger.warning(error)
+            return error
+
+    def __send_frame__(self, header, message_id, payload, request_id=NO_REQUEST_ID, coalesce=False):
+        """
+            Record and send a frame to the client, its payload compressed if compression was negotiated.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes
+        :param request_id: id correlating client's reply with the frame as integer
+        :param coalesce: replace the value of the same command still waiting to be sent
+        :return: None
+        """
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(SENT, header, message_id, request_id, payload)
+        priority = get_priority(header, message_id)
+        compressor = self.compressor
+        if compressor is not None:
+            header, payload = compressor.compress(header, message_id, payload)
+        if self.scheduler.send(self.client, header, message_id, payload, request_id, priority, coalesce):
+            self.metrics.count_sent(len(payload))
+
+    def submit_command(self, command, value=None, timeout=GU_CT):
+        """
+            Sends a command to the client without waiting for its reply.
+        Many commands can be submitted before the first reply arrives, up to commands_in_flight at once.
+        :param command: command to be sent as Command type from generic_utils.py
+        :param value: value to be used by client, optional parameter
+        :param timeout: seconds to wait for client's reply (and for a free slot in the window)
+        :return: concurrent.futures.Future resolved with client's decoded reply
+        """
+        future = Future()
+
+        if self.client is None:
+            future.set_exception(ConnectionError("Unable to send command: no client connected!"))
+            return future
+
+        if command.value_required and value is None:
+            error = "Unable to send command {}! Value required, but {} provided!".format(command, value)
+            future.set_exception(ValueError(error))
+            return future
+
+        if not self.commands_window.acquire(timeout=timeout):
+            future.set_exception(TimeoutError("Too many commands waiting for client's reply!"))
+            return future
+        future.add_done_callback(lambda _: self.commands_window.release())
+
+        self.start_receiver()
+        request_id = NO_REQUEST_ID
+        try:
+            payload = encode_typed_value(command, value, self.encoding, self.typed_values)
+            request_id = self.pending_requests.add(future, timeout, (command.id, payload))
+            self.metrics.track_command(future)
+            self.__send_frame__(COMMAND_HEADER, command.id, payload, request_id)
+        except Exception as err:
+            self.pending_requests.discard(request_id)
+            error = "Error occurred while sending command to client:\ncommand: " + str(command) + '\n' + str(err)
+            logger.warning(error)
+            future.set_exception(ConnectionError(error))
+
+        return future
+
+    def submit_commands(self, commands, timeout=GU_CT):
+        """
+            Sends several commands to the client in one batch frame, run in order by the client and answered at once.
+        :param commands: list of (command as Command type from generic_utils.py, value or None)
+                         example: [(host.commands.set_speed, 0.5), (host.commands.start_video_streaming, None)]
+        :param timeout: seconds to wait for client's reply (and for a free slot in the window)
+        :return: concurrent.futures.Future resolved with the list of client's decoded replies, in commands' order
+        """
+        max_frame_size = MAX_FRAME_SIZE if self.negotiated is None else self.negotiated.max_frame_size
+        try:
+            payload = encode_commands(commands, self.encoding, max_frame_size, self.typed_values)
+        except ValueError as err:
+            future = Future()
+            future.set_exception(err)
+            return future
+
+        future = self.submit_command(self.commands.batch, payload, timeout)
+        self.metrics.batched_commands.value += len(commands)
+        return future
+
+    def send_commands(self, commands, timeout=GU_CT):
+        """
+            Sends several commands to the client in one batch frame and waits for the aggregated reply.
+        :param commands: list of (command as Command type from generic_utils.py, value or None)
+        :param timeout: seconds to wait for client's reply
+        :return: list of client's decoded replies in commands' order if ok, error occurred otherwise
+        """
+        try:
+            return self.submit_commands(commands, timeout).result()
+        except Exception as err:
+            error = "Error occurred while sending commands to client: " + str(err)
+            logger.warning(error)
+            return error
+
+    def start_receiver(self):
+        """
+            Start the thread reading client's replies and resolving submitted commands.
+        :return: None
+        """
+        if self.receiver_thread is not None and self.receiver_thread.is_alive():
+            return
+
+        self.receiving = True
+        self.receiver_thread = threading.Thread(target=self.__receive_responses__, args=(self.client, ),
+                                                name='HostReceiver', daemon=True)
+        self.receiver_thread.start()
+
+    def stop_receiver(self):
+        """
+            Stop the thread reading client's replies.
+        :return: None
+        """
+        self.receiving = False
+        if self.receiver_thread is not None and self.receiver_thread is not threading.current_thread():
+            self.receiver_thread.join()
+        self.receiver_thread = None
+
+    def __receive_responses__(self, client):
+        """
+            Receiver thread's loop: read client's messages until connection is lost or receiver is stopped.
+        :param client: client's socket
+        :return: None
+        """
+        try:
+            while self.receiving:
+                message = self.receiver.poll_message(client, GU_RPI)
+                self.pending_requests.expire()
+                if message is not None:
+                    self.handle_response(message)
+        except (ConnectionError, OSError, ValueError) as err:
+            logger.warning("Connection with client lost: %s", err)
+            if self.session is not None:
+                self.sessions.lost(self.session)
+            if not self.accept_reconnects or self.session is None:
+                self.pending_requests.fail_all(ConnectionError("Connection with client lost: {}".format(err)))
+            self.receiving = False
+            self.__client_lost__()
+        finally:
+            self.receiving = False
+
+    def __client_lost__(self):
+        """
+            Called by receiver thread when connection with client is lost, waits for client's reconnection if
+        accept_reconnects is set.
+        :return: None
+        """
+        self.connection_lost_at = time.monotonic()
+        self.stop_heartbeat()
+
+        # commands are refused until client reconnects, the ones waiting for a reply are kept by client's session
+        client, self.client = self.client, None
+        if client is not None:
+            client.close()
+
+        if self.accept_reconnects and self.socket is not None:
+            threading.Thread(target=self.__accept_reconnection__, name='HostReconnect', daemon=True).start()
+
+    def __accept_reconnection__(self):
+        """
+            Reconnection thread: wait for the client to connect again.
+        :return: None
+        """
+        try:
+            self.connect_with_client()
+        except (OSError, AttributeError, ValueError) as err:
+            # host terminated while waiting
+            logger.info("Stopped waiting for client's reconnection: %s", err)
+
+    def start_heartbeat(self):
+        """
+            Start supervising connected client: heartbeats are sent once client sent its first one, connection is
+        dropped when client stays silent for dead_peer_timeout seconds.
+        :return: Heartbeat
+        """
+        self.stop_heartbeat()
+        self.heartbeat = Heartbeat(self.send_heartbeat, self.heartbeat_interval, self.dead_peer_timeout,
+                                   self.__drop_client__, wait_for_peer=True)
+        self.heartbeat.start()
+        return self.heartbeat
+
+    def stop_heartbeat(self):
+        """
+            Stop supervising connected client.
+        :return: None
+        """
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+
+    def send_heartbeat(self, payload):
+        """
+            Sends a heartbeat to the client.
+        :param payload: heartbeat built by Heartbeat.create_heartbeat as bytes
+        :return: True if ok, error occurred otherwise
+        """
+        return self.send_command(self.commands.heartbeat, payload)
+
+    def __drop_client__(self):
+        """
+            Called by heartbeat thread when client stopped responding: receiver thread sees the connection closed.
+        :return: None
+        """
+        self.metrics.dead_peers.value += 1
+        logger.warning("Client %s stopped responding! Dropping connection...", self.client_name)
+        client = self.client
+        if client is not None:
+            try:
+                client.shutdown(py_socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def handle_response(self, message):
+        """
+            Handle a message received from client: resolve the command waiting for it or log it.
+        :param message: Frame type from frame_utils.py
+        :return: None
+        """
+        self.metrics.count_received(len(message.payload))
+        heartbeat = self.heartbeat
+        if heartbeat is not None:
+            heartbeat.packet_received()
+        if message.header & COMPRESSED_FLAG:
+            message = self.__decompress__(message)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(RECEIVED, message.header, message.message_id, message.request_id, message.payload)
+
+        if message.header == DATA_HEADER:
+            if message.message_id == TELEMETRY_DATA_ID:
+                self.telemetry.handle_batch(message.payload)
+                return
+            if message.message_id == HEARTBEAT_DATA_ID:
+                if heartbeat is not None:
+                    heartbeat.handle_heartbeat(message.payload)
+                return
+            if message.message_id == BATCH_REPLY_DATA_ID:
+                self.handle_batch_reply(message)
+                return
+
+        response = self.decode_response(message)
+        if not self.pending_requests.resolve(message.request_id, response):
+            logger.info("Client's message: %s", response)
+
+    def handle_batch_reply(self, message):
+        """
+            Resolve the batch waiting for client's aggregated reply with one decoded reply per command.
+        :param message: batch reply Frame type from frame_utils.py
+        :return: None
+        """
+        try:
+            data_types = self.registry.data.value_types if self.typed_values else None
+            responses = decode_batch_reply(message, self.registry.data.ids, self.encoding, data_types)
+        except NameError as err:
+            self.metrics.decode_errors.value += 1
+            logger.warning(str(err))
+            return
+
+        if not self.pending_requests.resolve(message.request_id, responses):
+            logger.info("Client's batch reply: %s", responses)
+
     def get_host_command_by_id(self, command_id):
         """
             Get host's command matching id provided.
         :param command_id: id of the command as integer
         :return: host_command
         """
-        logger.debug("Called Host.get_host_command_by_id")
+        return self.registry.host_commands.get_by_id(command_id)
 
-        host_command = None
-        for _host_command in self.commands.all_commands:
-            if _host_command.id == command_id:
-                host_command = _host_command
-                break
-
-        logger.debug("Host command id {} matched: {}".format(command_id, host_command))
-        return host_command
+    def receive_frame(self):
+        """
+            Block until a complete frame is received from the connected client.
+        :return: frame - Frame type from frame_utils.py
+        """
+        message = self.receiver.read_message(self.client)
+        self.metrics.count_received(len(message.payload))
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(RECEIVED, message.header, message.message_id, message.request_id, message.payload)
+        return message
+
+    def __decompress__(self, message):
+        """
+            Rebuild a frame whose payload was compressed by the client.
+        :param message: Frame type with COMPRESSED_FLAG set in its header
+        :return: Frame type with original header and payload
+        """
+        if self.compressor is None:
+            raise ConnectionError("Compressed frame received while compression is not negotiated!")
+        return self.compressor.decompress(message)
 
     def decode_response(self, client_response):
         """
             Method decodes client's response.
-        :param client_response: bytes received from client
+        :param client_response: message received from client - Frame type from frame_utils.py
         :return: decoded response as dictionary
         """
-        response = {"Type": None, "ID": None, "Content": None, "Valid": True, "Error": None}
-
-        client_response = client_response.decode(self.encoding)
-        client_response = client_response.split()
-        response["Type"] = client_response[0]
-        response["ID"] = client_response[1]
-
-        # extract content - needed if content contains new line character
-        content = ''
-        for index, item in enumerate(client_response):
-            if index > 1:
-                content += '\n'
-                content += str(item)
-
-        response["Content"] = content
-
-        # validate content
-        if response["Valid"]:
-            if (response["Type"]) == str(COMMAND_HEADER) or str(response["Type"]) == str(DATA_HEADER):
-                response["Valid"] = True
-            else:
-                response["Valid"] = False
-                if response["Error"] is None:
-                    response["Error"] = "Invalid header ID!"
-                else:
-                    response["Error"] += '\n'
-                    response["Error"] += "Invalid header ID!"
-
-        if response["Valid"]:
-            id_is_valid = False
-            if response["Type"] == str(COMMAND_HEADER):
-                for command in self.client_commands.all_commands:
-                    if str(command) == str(response["ID"]):
-                        id_is_valid = True
-                        break
-
-                if id_is_valid:
-                    response["Valid"] = True
-                else:
-                    response["Valid"] = False
-                    if response["Error"] is None:
-                        response["Error"] = "Invalid data/command ID!"
-                    else:
-                        response["Error"] += '\n'
-                        response["Error"] += "Invalid data/command ID!"
-
-        # test_print("\nType: " + str(response["Type"]) + "\nID: " + str(response["ID"]) + "\nContent:" +
-        #            str(response["Content"]) + "\nValid: " + str(response["Valid"]) + "\nErrors: " +
-        #            str(response["Error"]))
-
+        if self.typed_values:
+            response = decode_message(client_response, self.registry.client_commands.ids, self.registry.data.ids,
+                                      self.encoding, self.registry.client_commands.value_types,
+                                      self.registry.data.value_types)
+        else:
+            response = decode_message(client_response, self.registry.client_commands.ids, self.registry.data.ids,
+                                      self.encoding)
+        if not response["Valid"]:
+            self.metrics.count_invalid(response)
         return response
 
     def ask_client_for_credentials(self):
@@ -255,46 +627,135 @@ class Host:
         :return: True if valid, false otherwise
         """
         credentials = self.decode_response(credentials)
-        username = str(credentials["Content"].split()[0])[2:]
-        password = str(credentials["Content"].split()[1])[2:]
+        username, password = decode_credentials(credentials["Content"])
 
-        if username == GU_USR and password == GU_PWD:
-            return True
-        else:
-            return False
+        return credentials_are_valid(username, password)
+
+    def __accept__(self):
+        """
+            Wait for a connection request, commands of a lost session keep timing out meanwhile.
+        :return: (client's socket, client's address)
+        """
+        while True:
+            readable, _, _ = select.select([self.socket], [], [], GU_RPI)
+            self.pending_requests.expire()
+            self.sessions.expire()
+            if readable:
+                return self.socket.accept()
+
+    def __authenticate__(self):
+        """
+            Read client's first message: a valid session token resumes client's session, valid credentials start a new
+        one. Client is asked for credentials if its token is unknown, for instance after host was restarted.
+        Client's first message also carries its capabilities.
+        :return: (Session, resumed, client's Capabilities) - Session is None if client is refused
+        """
+        message = self.receive_frame()
+        if message.header == DATA_HEADER and message.message_id == self.data.resume_session.id:
+            hello = decode_handshake(str(message.payload, self.encoding))
+            session = self.sessions.resume(hello.get(TOKEN_FIELD, ''))
+            if session is not None:
+                return session, True, read_capabilities(hello)
+
+            logger.info("Unknown session! Asking client for credentials...")
+            self.ask_client_for_credentials()
+            message = self.receive_frame()
+
+        if message.header != DATA_HEADER or message.message_id != self.data.credentials.id:
+            return None, False, None
+
+        logger.info("Credentials received! verifying...")
+        if not self.verify_credentials(message):
+            return None, False, None
+
+        hello = decode_handshake(str(message.payload, self.encoding))
+        session = self.sessions.create(GU_USR, GU_USR, self.pending_requests, self.commands_window)
+        return session, False, read_capabilities(hello)
+
+    def __resend_unanswered__(self):
+        """
+            Send again the commands of a resumed session that are still waiting for client's reply.
+        :return: number of commands sent
+        """
+        unanswered = self.pending_requests.get_unanswered()
+        for request_id, (command_id, payload) in unanswered:
+            self.__send_frame__(COMMAND_HEADER, command_id, payload, request_id)
+        return len(unanswered)
 
     def connect_with_client(self):
         """
             Connects with a connection requesting client.
+        Client sends its previous session's token or its credentials with its capabilities without being asked, and is
+        given its session's token and the negotiated capabilities in a session command: one round trip.
         :return: None
         """
+        if self.server is not None:
+            logger.warning("Host runs in server mode, clients are accepted by the server!")
+            return
+
         client_is_valid = False
 
         logger.info("Waiting for connection request...")
         while not client_is_valid:
 
             # establish a connection
-            self.client, client_address = self.socket.accept()
+            self.stop_receiver()
+            self.stop_heartbeat()
+            self.close_control_channel()
+            if self.client is not None:
+                self.client.close()
+            self.client, client_address = self.__accept__()
+            self.receiver.reset()
+            self.compressor = None
             info = "Got a connection request from " + str(client_address[0])
             logger.info(info)
 
-            info = "Asking client for credentials..."
-            logger.info(info)
-            self.ask_client_for_credentials()
-
-            client_response = self.client.recv(BUFFER_SIZE)
-            info = "Credentials received! verifying..."
-            logger.info(info)
+            # a silent client must not block the host
+            self.client.settimeout(GU_AT)
+            try:
+                session, resumed, client_capabilities = self.__authenticate__()
+            except (ConnectionError, OSError, ValueError) as err:
+                logger.info("Client failed to authenticate: %s", err)
+                session, resumed, client_capabilities = None, False, None
 
-            client_is_valid = self.verify_credentials(client_response)
-            if client_is_valid:
-                self.client_name = GU_USR
-                logger.info("Valid credentials. Client " + str(self.client_name) + " connected!")
-            else:
+            if session is None:
                 logger.info("Unknown client connection request! Connection refused!")
-                self.client.shutdown(py_socket.SHUT_RDWR)
+                self.send_command(self.commands.session)
+                try:
+                    self.client.shutdown(py_socket.SHUT_RDWR)
+                except OSError:
+                    pass
                 self.client.close()
                 self.client = None
+                continue
+
+            self.client.settimeout(None)
+            if not resumed and self.session is not None:
+                # commands of the previous session will never be answered
+                self.sessions.discard(self.session)
+            self.session = session
+            self.client_name = session.name
+            self.negotiated = self.capabilities.negotiate(client_capabilities)
+            self.receiver.max_frame_size = self.negotiated.max_frame_size
+            self.typed_values = self.negotiated.supports_typed_values()
+            reply = encode_handshake({TOKEN_FIELD: session.token, CAPABILITIES_FIELD: self.negotiated.encode()})
+            self.send_command(self.commands.session, reply)
+            if self.negotiated.get_compression() == ZLIB_COMPRESSION:
+                self.compressor = self.compression
+            client_is_valid = True
+            logger.info("Negotiated capabilities: %s", self.negotiated)
+
+            self.metrics.count_connection(self.connection_lost_at)
+            self.connection_lost_at = None
+            if self.negotiated.supports(HEARTBEAT_CHANNEL):
+                self.start_heartbeat()
+            self.start_receiver()
+            if resumed:
+                self.metrics.sessions_resumed.value += 1
+                logger.info("Client %s resumed its session! %s commands sent again.", self.client_name,
+                            self.__resend_unanswered__())
+            else:
+                logger.info("Valid credentials. Client %s connected!", self.client_name)
 
     def __host_command_name_is_valid__(self, user_command):
         """
@@ -302,15 +763,11 @@ class Host:
         :param user_command: command's name to be sent
         :return: True if command is valid, False otherwise
         """
-        command_is_valid = False
-        command_id = None
-        for command in self.commands.all_commands:
-            if str(user_command) == str(command.in_code):
-                command_is_valid = True
-                command_id = command.get_id()
-                break
+        command = self.registry.host_commands.get_by_in_code(str(user_command))
+        if command is None:
+            return False, None
 
-        return command_is_valid, command_id
+        return True, command.get_id()
 
     def decode_user_input(self, user_input):
         """
@@ -320,7 +777,7 @@ class Host:
         """
         user_input = str(user_input)
         user_input = user_input.split()
-        logger.info("Got user input: " + str(user_input))
+        logger.info("Got user input: %s", user_input)
         try:
             user_action = str(user_input[0])
         except Exception as err:
@@ -338,7 +795,7 @@ class Host:
                 logger.warning(error)
                 return
 
-            logger.debug("command to be send: " + str(user_command))
+            logger.debug("command to be send: %s", user_command)
             logger.debug("Evaluating command...")
             command_is_valid, command_id = self.__host_command_name_is_valid__(user_command)
             if command_is_valid:
@@ -352,17 +809,30 @@ class Host:
                     user_value = None
 
                 host_command = self.get_host_command_by_id(command_id)
-                self.send_command(host_command, user_value)
-                client_response = self.client.recv(BUFFER_SIZE)
-                logger.info(self.decode_response(client_response))
+                if host_command.id == self.commands.start_video_streaming.id and user_value is None:
+                    user_value = self.start_video_receiver().port
+
+                if self.server is not None:
+                    try:
+                        client_name = str(user_input[2])
+                    except IndexError:
+                        client_name = 'all'
+                    self.send_server_command(client_name, host_command, user_value)
+                    return
+
+                future = self.submit_command(host_command, user_value)
+                try:
+                    logger.info(future.result())
+                except Exception as err:
+                    logger.warning("Command %s failed: %s", host_command, err)
             else:
-                logger.warning("Invalid command to be sent: {}".format(user_command))
+                logger.warning("Invalid command to be sent: %s", user_command)
                 return
 
         elif str(user_action).upper() == 'send_data'.upper() or str(user_action).upper() == 'sd'.upper():
             logger.debug("send_data command initiated by user!")
             user_data = str(user_input[1])
-            logger.debug("data to be send: " + str(user_data))
+            logger.debug("data to be send: %s", user_data)
 
         elif str(user_action).upper() == 'host_cmd'.upper() or str(user_action).upper() == 'hc'.upper():
             logger.debug("host_cmd command initiated by user!")
@@ -375,7 +845,7 @@ class Host:
             self.execute_host_cmd(user_command)
 
         else:
-            logger.debug("Unknown user action: {}".format(user_action))
+            logger.debug("Unknown user action: %s", user_action)
 
     def execute_host_cmd(self, host_cmd):
         """
@@ -391,10 +861,207 @@ class Host:
         elif host_cmd == str('connect_with_client').upper():
             self.connect_with_client()
 
+        elif host_cmd == str('start_server').upper():
+            self.start_server_mode()
+
+        elif host_cmd == str('list_clients').upper():
+            self.host_cmd_list_clients()
+
+        elif host_cmd == str('video_stats').upper():
+            self.host_cmd_video_stats()
+
+        elif host_cmd == str('open_control_channel').upper():
+            self.open_control_channel()
+
+        elif host_cmd == str('stats').upper():
+            self.host_cmd_stats()
+
+        elif host_cmd == str('telemetry_stats').upper():
+            self.host_cmd_telemetry_stats()
+
+        elif host_cmd == str('link_stats').upper():
+            self.host_cmd_link_stats()
+
+        elif host_cmd == str('start_recording').upper():
+            self.start_recording()
+
+        elif host_cmd == str('stop_recording').upper():
+            self.stop_recording()
+
         else:
-            logger.warning("Unknown host_cmd: {}.".format(host_cmd))
+            logger.warning("Unknown host_cmd: %s.", host_cmd)
+
+    def start_server_mode(self, max_clients=GU_MNOC):
+        """
+            Switch host to asyncio server mode: many clients are accepted and authenticated at once.
+        Server reuses host's listening socket and runs on a background thread.
+        :param max_clients: maximum number of clients served at once
+        :return: HostServer
+        """
+        if self.server is not None:
+            return self.server
+
+        # asyncio is only imported when server mode is used
+        from .host_server import HostServer
+
+        self.server = HostServer(sock=self.socket, max_clients=max_clients, encoding=self.encoding,
+                                 heartbeat_interval=self.heartbeat_interval, dead_peer_timeout=self.dead_peer_timeout,
+                                 capabilities=self.capabilities, compression=self.compression,
+                                 coalesce_commands=self.coalesce_commands)
+        self.server.start_in_thread()
+        logger.info("Server mode enabled! Accepting up to %s clients...", max_clients)
+        return self.server
+
+    def start_video_receiver(self):
+        """
+            Start listening for client's video connection on host's port + VIDEO_PORT_OFFSET (any free port if busy).
+        :return: VideoReceiver
+        """
+        if self.video_receiver is not None:
+            return self.video_receiver
+
+        try:
+            self.video_receiver = VideoReceiver(port=self.port + GU_VPO, encoding=self.encoding)
+        except OSError:
+            self.video_receiver = VideoReceiver(port=0, encoding=self.encoding)
+        self.video_receiver.start()
+        logger.info("Waiting for video on port %s", self.video_receiver.port)
+        return self.video_receiver
+
+    def stop_video_receiver(self):
+        """
+            Stop receiving client's video.
+        :return: None
+        """
+        if self.video_receiver is not None:
+            self.video_receiver.stop()
+            self.video_receiver = None
+
+    def start_video_streaming(self, timeout=GU_CT):
+        """
+            Start video receiver and ask the client to stream to it.
+        :param timeout: seconds to wait for client's reply
+        :return: concurrent.futures.Future resolved with client's decoded reply
+        """
+        if self.negotiated is not None and not self.negotiated.supports(VIDEO_CHANNEL):
+            future = Future()
+            future.set_exception(ValueError("Client {} does not support video!".format(self.client_name)))
+            return future
+
+        video_receiver = self.start_video_receiver()
+        return self.submit_command(self.commands.start_video_streaming, video_receiver.port, timeout)
+
+    def stop_video_streaming(self, timeout=GU_CT):
+        """
+            Ask the client to stop streaming video.
+        :param timeout: seconds to wait for client's reply
+        :return: concurrent.futures.Future resolved with client's decoded reply
+        """
+        return self.submit_command(self.commands.stop_video_streaming, None, timeout)
+
+    def open_control_channel(self, address=None, timeout=GU_CT):
+        """
+            Ask the client to receive value commands over UDP, send_command uses it for commands requiring a value.
+        The client is given a session token over TCP, datagrams without it are ignored by the client.
+        :param address: client's ip, None for the ip of client's TCP connection
+        :param timeout: seconds to wait for client's reply
+        :return: True if ok, error occurred otherwise
+        """
+        self.close_control_channel()
+        if self.negotiated is not None and not self.negotiated.supports(CONTROL_CHANNEL):
+            error = "Client {} does not support control channel!".format(self.client_name)
+            logger.warning(error)
+            return error
+
+        if address is None and self.client is not None:
+            address = self.client.getpeername()[0]
+
+        token = create_control_token()
+        try:
+            response = self.submit_command(self.commands.open_control_channel, token.hex(), timeout).result()
+            port = int(response["Content"])
+        except Exception as err:
+            error = "Unable to open control channel! " + str(err)
+            logger.warning(error)
+            return error
+
+        self.control_channel = ControlChannelSender((address, port), token)
+        logger.info("Control channel opened to %s:%s", address, port)
+        return True
+
+    def close_control_channel(self):
+        """
+            Stop sending value commands over UDP.
+        :return: None
+        """
+        control_channel, self.control_channel = self.control_channel, None
+        if control_channel is not None:
+            control_channel.close()
+
+    def send_server_command(self, client_name, command, value=None):
+        """
+            Sends a command to a client served in server mode.
+        :param client_name: name of the client, 'all' sends the command to every connected client
+        :param command: command to be sent as Command type from generic_utils.py
+        :param value: value to be used by client, optional parameter
+        :return: True if ok, error occurred otherwise; see broadcast_command for 'all'
+        """
+        if str(client_name).upper() == 'all'.upper():
+            return self.broadcast_command(command, value)
+
+        if self.server is None:
+            error = "Unable to send command: host is not in server mode!"
+            logger.warning(error)
+            return error
+
+        result = self.server.call(self.server.send_command(client_name, command, value))
+
+        logger.info("Command %s sent to %s: %s", command, client_name, result)
+        return result
+
+    def broadcast_command(self, command, value=None, client_names=None, deadline=GU_CT):
+        """
+            Sends a command to many clients served in server mode at once and collects their replies until deadline.
+        Command is encoded once and written to every client without waiting for the others.
+        :param command: command to be sent as Command type from generic_utils.py
+        :param value: value to be used by clients, optional parameter
+        :param client_names: names of the clients to receive the command, None for every connected client
+        :param deadline: seconds to wait for clients' replies
+        :return: dictionary with the clients that confirmed and the worst latency, see HostServer.broadcast_command;
+                 error occurred as string if not ok
+        """
+        if self.server is None:
+            error = "Unable to broadcast command: host is not in server mode!"
+            logger.warning(error)
+            return error
+
+        try:
+            result = self.server.call(self.server.broadcast_command(command, value, client_names, deadline))
+        except Exception as err:
+            error = "Unable to broadcast command {}! ".format(command) + str(err)
+            logger.warning(error)
+            return error
+
+        logger.info("Command %s confirmed by %s/%s clients, worst latency: %s", command, len(result["Confirmed"]),
+                    len(result["Confirmed"]) + len(result["Failed"]), result["WorstLatency"])
+        return result
 
     def terminate(self):
+        self.accept_reconnects = False
+        self.stop_receiver()
+        self.stop_heartbeat()
+        self.sessions.clear()
+        self.close_control_channel()
+        self.stop_video_receiver()
+        self.stop_recording()
+        if self.server is not None:
+            self.server.stop_thread()
+            self.server = None
+            self.socket = None
+            self.client_name = None
+            self.client = None
+            return
+
         try:
             self.socket.shutdown(py_socket.SHUT_RDWR)
         except Exception as err:
@@ -405,6 +1072,36 @@ class Host:
         self.client_name = None
         self.client = None
 
+    def start_recording(self, path=None):
+        """
+            Start recording every frame sent to and received from the client, see recorder.py.
+        :param path: path of the recording file, None for a new file in recordings directory
+        :return: FrameRecorder
+        """
+        self.stop_recording()
+        self.recorder = FrameRecorder(get_recording_path() if path is None else path)
+        logger.info("Recording frames in %s", self.recorder.path)
+        return self.recorder
+
+    def stop_recording(self):
+        """
+            Stop recording frames.
+        :return: None
+        """
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def get_metrics(self):
+        """
+            Get host's metrics, and server's metrics in server mode, in plain text exposition format.
+        :return: metrics - string
+        """
+        metrics = self.metrics.render()
+        if self.server is not None:
+            metrics += self.server.metrics.render()
+        return metrics
+
     def host_cmd_print_info(self):
         """
             host_cmd specific command
@@ -412,6 +1109,89 @@ class Host:
         """
         print(self.get_info())
 
+    def host_cmd_list_clients(self):
+        """
+            host_cmd specific command
+        :return: None
+        """
+        if self.server is None:
+            print("Connected client: {}".format(self.client_name))
+            return
+
+        for client_name in self.server.get_client_names():
+            client = self.server.get_client(client_name)
+            if client is not None:
+                print(client.get_info())
+
+    def host_cmd_video_stats(self):
+        """
+            host_cmd specific command
+        :return: None
+        """
+        if self.video_receiver is None:
+            print("Video receiver not started!")
+            return
+
+        for key, value in self.video_receiver.get_statistics().items():
+            print("{}: {}".format(key, value))
+
+    def host_cmd_stats(self):
+        """
+            host_cmd specific command
+        :return: None
+        """
+        print(self.get_metrics(), end='')
+        compression = self.compression if self.server is None else self.server.compression
+        print("Compression")
+        for key, value in compression.get_statistics().items():
+            print("{}: {}".format(key, value))
+        if self.server is None:
+            print("Outbound queues")
+            for name, statistics in self.scheduler.get_statistics().items():
+                print("{}: depth={Depth} max_depth={MaxDepth} sent={FramesSent} coalesced={FramesCoalesced} "
+                      "avg_wait={AverageWait:.6f}s max_wait={MaxWait:.6f}s".format(name, **statistics))
+
+    def host_cmd_telemetry_stats(self):
+        """
+            host_cmd specific command
+        :return: None
+        """
+        telemetry_receivers = {self.client_name: self.telemetry}
+        if self.server is not None:
+            telemetry_receivers = {}
+            for client_name in self.server.get_client_names():
+                client = self.server.get_client(client_name)
+                if client is not None:
+                    telemetry_receivers[client_name] = client.telemetry
+
+        for client_name, telemetry in telemetry_receivers.items():
+            print("Client: {}".format(client_name))
+            for key, value in telemetry.get_statistics().items():
+                print("{}: {}".format(key, value))
+            for channel, (timestamp, value) in sorted(telemetry.latest.items()):
+                print("Channel {}: {} at {:.3f}".format(channel, value, timestamp))
+
+    def host_cmd_link_stats(self):
+        """
+            host_cmd specific command
+        :return: None
+        """
+        heartbeats = {self.client_name: self.heartbeat}
+        if self.server is not None:
+            heartbeats = {}
+            for client_name in self.server.get_client_names():
+                client = self.server.get_client(client_name)
+                if client is not None:
+                    heartbeats[client_name] = client.heartbeat
+
+        for client_name, heartbeat in heartbeats.items():
+            print("Client: {}".format(client_name))
+            if heartbeat is None:
+                print("No heartbeat!")
+                continue
+            for key, value in heartbeat.get_statistics().items():
+                print("{}: {}".format(key, value))
+
     def run_user_input_mode(self):
         """
             Host runs in user input mode.
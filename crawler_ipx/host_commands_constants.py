@@ -1,4 +1,7 @@
 # VR = VALUE_REQUIRED
+# VT = VALUE_TYPE, value sent in binary to peers negotiating typed values, None to send it as text
+
+from .value_types import FLOAT32_VALUE, UINT16_VALUE
 
 # ASK CLIENT FOR CREDENTIALS COMMAND
 # =====================================================================================================================
@@ -6,11 +9,7 @@ ASK_CLIENT_FOR_CREDENTIALS_CMD_ID = 1
 ASK_CLIENT_FOR_CREDENTIALS_CMD_NAME = "Ask client for credentials"
 ASK_CLIENT_FOR_CREDENTIALS_CMD_IN_CODE = "ask_client_for_credentials"
 ASK_CLIENT_FOR_CREDENTIALS_CMD_VR = False
-ASK_CLIENT_FOR_CREDENTIALS_CMD_DESCRIPTION = ASK_CLIENT_FOR_CREDENTIALS_CMD_NAME
-ASK_CLIENT_FOR_CREDENTIALS_CMD_DESCRIPTION += " command asks client to send it's credentials." + "\n"
-ASK_CLIENT_FOR_CREDENTIALS_CMD_DESCRIPTION += "ID: " + str(ASK_CLIENT_FOR_CREDENTIALS_CMD_ID) + "\n"
-ASK_CLIENT_FOR_CREDENTIALS_CMD_DESCRIPTION += "Value required: " + str(ASK_CLIENT_FOR_CREDENTIALS_CMD_VR) + "\n"
-ASK_CLIENT_FOR_CREDENTIALS_CMD_DESCRIPTION += "In code usage: " + str(ASK_CLIENT_FOR_CREDENTIALS_CMD_IN_CODE) + "\n"
+ASK_CLIENT_FOR_CREDENTIALS_CMD_DESCRIPTION = "Ask client for credentials command asks client to send it's credentials."
 # =====================================================================================================================
 
 # START VIDEO STREAMING COMMAND
@@ -19,11 +18,8 @@ START_VIDEO_STREAMING_CMD_ID = 2
 START_VIDEO_STREAMING_CMD_NAME = "Start video streaming"
 START_VIDEO_STREAMING_CMD_IN_CODE = "start_video_streaming"
 START_VIDEO_STREAMING_CMD_VR = False
-START_VIDEO_STREAMING_CMD_DESCRIPTION = START_VIDEO_STREAMING_CMD_NAME
-START_VIDEO_STREAMING_CMD_DESCRIPTION += " command asks client to start video streaming." + "\n"
-START_VIDEO_STREAMING_CMD_DESCRIPTION += "ID: " + str(START_VIDEO_STREAMING_CMD_ID) + "\n"
-START_VIDEO_STREAMING_CMD_DESCRIPTION += "Value required: " + str(START_VIDEO_STREAMING_CMD_VR) + "\n"
-START_VIDEO_STREAMING_CMD_DESCRIPTION += "In code usage: " + str(START_VIDEO_STREAMING_CMD_IN_CODE) + "\n"
+START_VIDEO_STREAMING_CMD_VT = UINT16_VALUE
+START_VIDEO_STREAMING_CMD_DESCRIPTION = "Start video streaming command asks client to start video streaming."
 # =====================================================================================================================
 
 # STOP VIDEO STREAMING COMMAND
@@ -32,12 +28,70 @@ STOP_VIDEO_STREAMING_CMD_ID = 3
 STOP_VIDEO_STREAMING_CMD_NAME = "Stop video streaming"
 STOP_VIDEO_STREAMING_CMD_IN_CODE = "stop_video_streaming"
 STOP_VIDEO_STREAMING_CMD_VR = False
-STOP_VIDEO_STREAMING_CMD_DESCRIPTION = STOP_VIDEO_STREAMING_CMD_NAME
-STOP_VIDEO_STREAMING_CMD_DESCRIPTION += " command asks client to stop video streaming." + "\n"
-STOP_VIDEO_STREAMING_CMD_DESCRIPTION += "ID: " + str(STOP_VIDEO_STREAMING_CMD_ID) + "\n"
-STOP_VIDEO_STREAMING_CMD_DESCRIPTION += "Value required: " + str(STOP_VIDEO_STREAMING_CMD_VR) + "\n"
-STOP_VIDEO_STREAMING_CMD_DESCRIPTION += "In code usage: " + str(STOP_VIDEO_STREAMING_CMD_IN_CODE) + "\n"
+STOP_VIDEO_STREAMING_CMD_DESCRIPTION = "Stop video streaming command asks client to stop video streaming."
 # =====================================================================================================================
 
+# OPEN CONTROL CHANNEL COMMAND
+# =====================================================================================================================
+OPEN_CONTROL_CHANNEL_CMD_ID = 4
+OPEN_CONTROL_CHANNEL_CMD_NAME = "Open control channel"
+OPEN_CONTROL_CHANNEL_CMD_IN_CODE = "open_control_channel"
+OPEN_CONTROL_CHANNEL_CMD_VR = False
+OPEN_CONTROL_CHANNEL_CMD_DESCRIPTION = "Open control channel command asks client to receive value commands over UDP."
+# =====================================================================================================================
+
+# SET SPEED COMMAND
+# =====================================================================================================================
+SET_SPEED_CMD_ID = 5
+SET_SPEED_CMD_NAME = "Set speed"
+SET_SPEED_CMD_IN_CODE = "set_speed"
+SET_SPEED_CMD_VR = True
+SET_SPEED_CMD_VT = FLOAT32_VALUE
+SET_SPEED_CMD_DESCRIPTION = "Set speed command sets client's speed, only the latest value matters."
+# =====================================================================================================================
 
+# SET STEERING COMMAND
+# =====================================================================================================================
+SET_STEERING_CMD_ID = 6
+SET_STEERING_CMD_NAME = "Set steering"
+SET_STEERING_CMD_IN_CODE = "set_steering"
+SET_STEERING_CMD_VR = True
+SET_STEERING_CMD_VT = FLOAT32_VALUE
+SET_STEERING_CMD_DESCRIPTION = "Set steering command sets client's steering, only the latest value matters."
+# =====================================================================================================================
 
+# PING COMMAND
+# =====================================================================================================================
+PING_CMD_ID = 7
+PING_CMD_NAME = "Ping"
+PING_CMD_IN_CODE = "ping"
+PING_CMD_VR = False
+PING_CMD_DESCRIPTION = "Ping command asks client to send back the value received with it."
+# =====================================================================================================================
+
+# HEARTBEAT COMMAND
+# =====================================================================================================================
+HEARTBEAT_CMD_ID = 8
+HEARTBEAT_CMD_NAME = "Heartbeat"
+HEARTBEAT_CMD_IN_CODE = "heartbeat"
+HEARTBEAT_CMD_VR = False
+HEARTBEAT_CMD_DESCRIPTION = "Heartbeat command tells client that host is alive and carries round trip timestamps."
+# =====================================================================================================================
+
+# SESSION COMMAND
+# =====================================================================================================================
+SESSION_CMD_ID = 9
+SESSION_CMD_NAME = "Session"
+SESSION_CMD_IN_CODE = "session"
+SESSION_CMD_VR = False
+SESSION_CMD_DESCRIPTION = "Session command gives client the token resuming its session, no token if refused."
+# =====================================================================================================================
+
+# BATCH COMMAND
+# =====================================================================================================================
+BATCH_CMD_ID = 10
+BATCH_CMD_NAME = "Batch"
+BATCH_CMD_IN_CODE = "batch"
+BATCH_CMD_VR = True
+BATCH_CMD_DESCRIPTION = "Batch command carries several commands run in order by client, answered by one batch reply."
+# =====================================================================================================================
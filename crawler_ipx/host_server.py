@@ -0,0 +1,829 @@
+import asyncio
+import logging
+import threading
+import time
+
+from .generic_utils import DEFAULT_PORT as GU_DP
+from .generic_utils import MAX_FRAME_SIZE
+from .generic_utils import MAX_NUMBER_OF_CLIENTS as GU_MNOC
+from .generic_utils import AUTHENTICATION_TIMEOUT as GU_AT
+from .generic_utils import COMMANDS_IN_FLIGHT as GU_CIF
+from .generic_utils import COMMAND_TIMEOUT as GU_CT
+from .generic_utils import RECEIVER_POLL_INTERVAL as GU_RPI
+from .generic_utils import WRITABLE_POLL_INTERVAL as GU_WPI
+from .generic_utils import HEARTBEAT_INTERVAL as GU_HI
+from .generic_utils import DEAD_PEER_TIMEOUT as GU_DPT
+from .generic_utils import COMMAND_HEADER, DATA_HEADER
+from .generic_utils import credentials_are_valid, decode_credentials
+
+from .frame_utils import COMPRESSED_FLAG, FRAME_HEADER, FRAME_PREFIX, NO_REQUEST_ID
+from .frame_utils import decode_batch_reply, decode_message, encode_commands, encode_frame, encode_frame_prefix
+from .frame_utils import encode_typed_value, encode_value, read_frame
+
+from .request_utils import PendingRequests
+from .metrics import Metrics
+from .command_registry import get_registry
+from .telemetry import TelemetryReceiver
+from .heartbeat import Heartbeat
+from .compression import ZLIB_COMPRESSION
+from .compression import PayloadCompressor
+from .handshake import HEARTBEAT_CHANNEL
+from .handshake import CAPABILITIES_FIELD, TOKEN_FIELD
+from .handshake import Capabilities
+from .handshake import decode_handshake, encode_handshake, read_capabilities
+from .session import SessionStore
+
+from .generic_data_constants import TELEMETRY_DATA_ID
+from .generic_data_constants import HEARTBEAT_DATA_ID
+from .generic_data_constants import BATCH_REPLY_DATA_ID
+from .host_commands_constants import HEARTBEAT_CMD_ID
+
+logger = logging.getLogger('ipx_logger.host_server')
+
+
+class ClientConnection:
+    """
+        Class used to keep the state of a client connected to the host server.
+    """
+    def __init__(self, reader, writer, address, commands_in_flight=GU_CIF, metrics=None, heartbeat_interval=GU_HI,
+                 dead_peer_timeout=GU_DPT):
+        """
+            Constructor
+        :param reader: asyncio.StreamReader of the connection
+        :param writer: asyncio.StreamWriter of the connection
+        :param address: client's (ip, port)
+        :param commands_in_flight: maximum number of commands waiting for client's reply at once
+        :param metrics: server's Metrics updated with client's traffic, None to keep no metrics
+        :param heartbeat_interval: seconds between heartbeats sent to the client
+        :param dead_peer_timeout: seconds without receiving anything from the client before its connection is dropped
+        """
+        self.reader = reader
+        self.writer = writer
+        self.address = address
+
+        self.metrics = metrics
+
+        # commands waiting for client's reply
+        self.pending_requests = PendingRequests()
+        self.commands_window = asyncio.Semaphore(commands_in_flight)
+
+        # set after authentication
+        self.username = None
+        self.name = None
+        self.authenticated = False
+        self.session = None
+
+        # capabilities negotiated with the client, see HostServer.__handle_client__
+        self.negotiated = None
+
+        # values of commands and data declaring a value type sent in binary, if negotiated with the client
+        self.typed_values = False
+
+        # server's PayloadCompressor once compression is negotiated, None otherwise
+        self.compressor = None
+
+        # command id: (header, payload) of the latest value waiting for the backlogged connection, see send_latest_value
+        self.latest_values = {}
+        self.latest_writer = None
+
+        # connection statistics
+        self.connected_at = time.time()
+        self.messages_received = 0
+        self.messages_sent = 0
+        self.last_response = None
+
+        # unpacks client's telemetry batches
+        self.telemetry = TelemetryReceiver()
+
+        # connection supervision, heartbeats are sent by the server's task once client sent its first one
+        self.heartbeat = Heartbeat(interval=heartbeat_interval, dead_peer_timeout=dead_peer_timeout, wait_for_peer=True)
+
+    async def send_frame(self, header, message_id, payload=b'', request_id=NO_REQUEST_ID):
+        """
+            Send a frame to the client.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes
+        :param request_id: id correlating a reply with its command as integer
+        :return: None
+        """
+        await self.send_encoded_frame(self.__encode_frame__(header, message_id, payload, request_id))
+
+    async def send_encoded_frame(self, frame):
+        """
+            Send an already encoded frame to the client.
+        :param frame: bytes built with encode_frame
+        :return: None
+        """
+        if self.latest_values:
+            self.__write_latest_values__()
+        self.__write_encoded_frame__(frame)
+        await self.writer.drain()
+
+    def send_latest_value(self, header, message_id, payload):
+        """
+            Send a command's value without waiting behind a backlogged connection: while the client does not read fast
+        enough, the value waits in the command's slot and newer values replace it, only the latest one is sent.
+        :param header: COMMAND_HEADER
+        :param message_id: command id as integer
+        :param payload: frame's content as bytes
+        :return: True if value was sent or is waiting to be sent, False if it replaced a waiting value
+        """
+        if message_id in self.latest_values:
+            self.latest_values[message_id] = (header, payload)
+            if self.metrics is not None:
+                self.metrics.coalesced_commands.value += 1
+            return False
+
+        if self.latest_writer is None and not self.writer.transport.get_write_buffer_size():
+            # connection writable
+            self.__write_encoded_frame__(self.__encode_frame__(header, message_id, payload))
+            return True
+
+        self.latest_values[message_id] = (header, payload)
+        if self.latest_writer is None:
+            self.latest_writer = asyncio.ensure_future(self.__send_latest_values__())
+        return True
+
+    async def __send_latest_values__(self):
+        """
+            Send the values waiting in their command's slot once the connection is writable again.
+        :return: None
+        """
+        try:
+            while self.latest_values and not self.writer.is_closing():
+                if self.writer.transport.get_write_buffer_size():
+                    await asyncio.sleep(GU_WPI)
+                else:
+                    self.__write_latest_values__()
+        finally:
+            self.latest_values.clear()
+            self.latest_writer = None
+
+    def __write_latest_values__(self):
+        """
+            Write every value waiting in its command's slot, also before any other frame so commands keep their order.
+        :return: None
+        """
+        latest_values, self.latest_values = self.latest_values, {}
+        for message_id, (header, payload) in latest_values.items():
+            self.__write_encoded_frame__(self.__encode_frame__(header, message_id, payload))
+
+    def __encode_frame__(self, header, message_id, payload, request_id=NO_REQUEST_ID):
+        """
+            Build a frame for the client, its payload compressed if compression was negotiated.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes
+        :param request_id: id correlating a reply with its command as integer
+        :return: frame - bytes
+        """
+        if self.compressor is not None:
+            header, payload = self.compressor.compress(header, message_id, payload)
+        return encode_frame(header, message_id, payload, request_id)
+
+    def __write_encoded_frame__(self, frame):
+        """
+            Write an encoded frame to the connection without waiting for it to be sent.
+        :param frame: bytes built with encode_frame
+        :return: None
+        """
+        self.writer.write(frame)
+        self.messages_sent += 1
+        if self.metrics is not None:
+            self.metrics.count_sent(len(frame) - FRAME_PREFIX.size)
+
+    async def send_shared_frame(self, header, message_id, payload, request_id=NO_REQUEST_ID):
+        """
+            Send a frame whose payload, already compressed if needed, is shared with other clients: only the frame's
+        prefix is built for this client, the payload is written without being copied.
+        :param header: COMMAND_HEADER or DATA_HEADER, with COMPRESSED_FLAG set if payload is compressed
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes
+        :param request_id: id correlating a reply with its command as integer
+        :return: None
+        """
+        if self.latest_values:
+            self.__write_latest_values__()
+        self.writer.writelines((encode_frame_prefix(header, message_id, len(payload), request_id), payload))
+        self.messages_sent += 1
+        if self.metrics is not None:
+            self.metrics.count_sent(len(payload) + FRAME_HEADER.size)
+        await self.writer.drain()
+
+    def attach(self, session):
+        """
+            Bind the connection to client's session: commands waiting for a reply belong to the session.
+        :param session: Session from session.py
+        :return: None
+        """
+        self.session = session
+        self.username = session.username
+        self.name = session.name
+        self.pending_requests = session.pending_requests
+        self.commands_window = session.commands_window
+        self.authenticated = True
+
+    def close(self):
+        """
+            Close client's connection, commands waiting for a reply are failed unless they belong to a session.
+        :return: None
+        """
+        self.authenticated = False
+        self.writer.close()
+        if self.session is None:
+            self.pending_requests.fail_all(ConnectionError("Connection with client {} closed!".format(self.name)))
+
+    def get_info(self):
+        """
+            Get client's info: name, address, connection time, etc...
+        :return: client_info - string
+        """
+        client_info = "Client info\n"
+        client_info += "Name: " + str(self.name) + "\n"
+        client_info += "Address: " + str(self.address) + "\n"
+        client_info += "Connected for: {:.1f}s".format(time.time() - self.connected_at) + "\n"
+        client_info += "Messages received: " + str(self.messages_received) + "\n"
+        client_info += "Messages sent: " + str(self.messages_sent) + "\n"
+        client_info += "Smoothed RTT: " + str(self.heartbeat.smoothed_rtt) + "\n"
+        client_info += "Jitter: " + str(self.heartbeat.jitter) + "\n"
+        client_info += "Capabilities: " + str(self.negotiated) + "\n"
+
+        return client_info
+
+    def __str__(self):
+        """
+            Informal” or nicely printable string representation of the object.
+        :return: name
+        """
+        return str(self.name)
+
+
+class HostServer:
+    """
+        Class used to serve many clients at once using asyncio.
+    Each client is authenticated on its own task and kept in clients dictionary by name.
+    """
+    def __init__(self, name=None, port=GU_DP, max_clients=GU_MNOC, sock=None, encoding='utf-8',
+                 commands_in_flight=GU_CIF, heartbeat_interval=GU_HI, dead_peer_timeout=GU_DPT, capabilities=None,
+                 compression=None, coalesce_commands=False):
+        """
+            Constructor
+        :param name: interface to listen on, None for all interfaces
+                     example: '192.168.100.15'
+        :param port: host's communication port as integer
+                     example: 1369
+        :param max_clients: maximum number of clients served at once
+                            example: 64
+        :param sock: already bound and listening socket to be used instead of name and port
+        :param encoding: connection encoding
+        :param commands_in_flight: maximum number of commands waiting for each client's reply at once
+                                   example: 32
+        :param heartbeat_interval: seconds between heartbeats sent to each client
+                                   example: 0.25
+        :param dead_peer_timeout: seconds without receiving anything from a client before its connection is dropped
+                                  example: 1.0
+        :param capabilities: Capabilities supported by the server, see handshake.py; None for every default capability
+        :param compression: PayloadCompressor shared by clients negotiating zlib compression, None for default settings
+        :param coalesce_commands: send only the latest value of value_required commands while a client's connection is
+                                  backlogged, last value wins
+        """
+        self.name = name
+        self.port = port
+        self.max_clients = max_clients
+        self.sock = sock
+        self.encoding = encoding
+        self.commands_in_flight = commands_in_flight
+        self.heartbeat_interval = heartbeat_interval
+        self.dead_peer_timeout = dead_peer_timeout
+        self.capabilities = Capabilities() if capabilities is None else capabilities
+        self.compression = PayloadCompressor() if compression is None else compression
+        self.coalesce_commands = coalesce_commands
+
+        # constant time look up of commands and data
+        self.registry = get_registry()
+
+        # commands that can be sent by host, shared read only catalog
+        self.commands = self.registry.host_commands
+
+        # commands that can be sent by client, shared read only catalog
+        self.client_commands = self.registry.client_commands
+
+        # data that can be send or received, shared read only catalog
+        self.data = self.registry.data
+
+        # counters and histograms of every client's traffic
+        self.metrics = Metrics('server')
+
+        # authenticated clients by name
+        self.clients = {}
+
+        # sessions of authenticated clients, resumed by reconnecting clients instead of verifying credentials
+        self.sessions = SessionStore()
+        self.__next_client_index__ = 1
+
+        self.server = None
+        self.loop = None
+        self.thread = None
+        self.expire_task = None
+
+    async def start(self):
+        """
+            Start accepting clients.
+        :return: None
+        """
+        if self.sock is not None:
+            self.server = await asyncio.start_server(self.__handle_client__, sock=self.sock)
+        else:
+            self.server = await asyncio.start_server(self.__handle_client__, self.name, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.expire_task = asyncio.ensure_future(self.__expire_requests__())
+        logger.info("Host server listening on port %s, up to %s clients.", self.port, self.max_clients)
+
+    async def close(self):
+        """
+            Stop accepting clients and disconnect the connected ones.
+        :return: None
+        """
+        if self.expire_task is not None:
+            self.expire_task.cancel()
+            self.expire_task = None
+
+        server = self.server
+        self.server = None
+        if server is not None:
+            server.close()
+
+        for client in list(self.clients.values()):
+            client.close()
+        self.clients.clear()
+        self.sessions.clear()
+
+        if server is not None:
+            await server.wait_closed()
+
+    async def __expire_requests__(self):
+        """
+            Periodically fail commands not answered in time.
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(GU_RPI)
+            for client in list(self.clients.values()):
+                client.pending_requests.expire()
+            self.sessions.expire()
+
+    async def __supervise__(self, client):
+        """
+            Send heartbeats to a client and drop its connection when it stops responding.
+        :param client: ClientConnection
+        :return: None
+        """
+        heartbeat = client.heartbeat
+        while True:
+            await asyncio.sleep(heartbeat.interval)
+            if heartbeat.is_peer_dead():
+                self.metrics.dead_peers.value += 1
+                logger.warning("Client %s stopped responding! Dropping connection...", client.name)
+                client.close()
+                return
+
+            payload = heartbeat.create_heartbeat()
+            if payload is None:
+                continue
+            try:
+                await client.send_frame(COMMAND_HEADER, HEARTBEAT_CMD_ID, payload)
+            except (ConnectionError, OSError):
+                # connection lost, reading task handles it
+                return
+            heartbeat.heartbeats_sent += 1
+
+    async def __authenticate__(self, client):
+        """
+            Read client's first message: a valid session token resumes client's session, valid credentials start a new
+        one. Client is asked for credentials if its token is unknown, for instance after host was restarted.
+        Client's first message also carries its capabilities.
+        :param client: ClientConnection
+        :return: (Session, resumed, client's Capabilities) - Session is None if client is refused
+        """
+        message = await asyncio.wait_for(read_frame(client.reader, self.capabilities.max_frame_size), GU_AT)
+        if message.header == DATA_HEADER and message.message_id == self.data.resume_session.id:
+            hello = decode_handshake(str(message.payload, self.encoding))
+            session = self.sessions.resume(hello.get(TOKEN_FIELD, ''))
+            if session is not None:
+                return session, True, read_capabilities(hello)
+
+            await client.send_frame(COMMAND_HEADER, self.commands.ask_client_for_credentials.id)
+            message = await asyncio.wait_for(read_frame(client.reader, self.capabilities.max_frame_size), GU_AT)
+
+        if message.header != DATA_HEADER or message.message_id != self.data.credentials.id:
+            return None, False, None
+
+        content = str(message.payload, self.encoding)
+        username, password = decode_credentials(content)
+        if not credentials_are_valid(username, password):
+            return None, False, None
+
+        name = "{}_{}".format(username, self.__next_client_index__)
+        self.__next_client_index__ += 1
+        session = self.sessions.create(username, name, client.pending_requests, client.commands_window)
+        return session, False, read_capabilities(decode_handshake(content))
+
+    async def __handle_client__(self, reader, writer):
+        """
+            Serve a client for its whole connection.
+        :param reader: asyncio.StreamReader
+        :param writer: asyncio.StreamWriter
+        :return: None
+        """
+        client = ClientConnection(reader, writer, writer.get_extra_info('peername'), self.commands_in_flight,
+                                  self.metrics, self.heartbeat_interval, self.dead_peer_timeout)
+        logger.info("Got a connection request from %s", client.address)
+
+        if len(self.clients) >= self.max_clients:
+            logger.warning("Maximum number of clients reached! Connection from %s refused!", client.address)
+            client.close()
+            return
+
+        try:
+            session, resumed, client_capabilities = await self.__authenticate__(client)
+        except (ConnectionError, ValueError, asyncio.TimeoutError) as err:
+            logger.info("Client %s failed to authenticate: %s", client.address, err)
+            session, resumed, client_capabilities = None, False, None
+
+        if session is None:
+            logger.info("Unknown client connection request! Connection refused!")
+            try:
+                await client.send_frame(COMMAND_HEADER, self.commands.session.id)
+            except (ConnectionError, OSError):
+                pass
+            client.close()
+            return
+
+        client.attach(session)
+        client.negotiated = self.capabilities.negotiate(client_capabilities)
+        client.typed_values = client.negotiated.supports_typed_values()
+        previous = self.clients.get(client.name)
+        if previous is not None:
+            # session resumed before its lost connection was noticed
+            previous.close()
+        self.clients[client.name] = client
+        self.metrics.count_connection()
+
+        supervisor = None
+        if client.negotiated.supports(HEARTBEAT_CHANNEL):
+            supervisor = asyncio.ensure_future(self.__supervise__(client))
+        max_frame_size = client.negotiated.max_frame_size
+        try:
+            reply = encode_handshake({TOKEN_FIELD: session.token, CAPABILITIES_FIELD: client.negotiated.encode()})
+            await client.send_frame(COMMAND_HEADER, self.commands.session.id, encode_value(reply))
+            if client.negotiated.get_compression() == ZLIB_COMPRESSION:
+                client.compressor = self.compression
+            if resumed:
+                self.metrics.sessions_resumed.value += 1
+                unanswered = client.pending_requests.get_unanswered()
+                for request_id, (command_id, payload) in unanswered:
+                    await client.send_frame(COMMAND_HEADER, command_id, payload, request_id)
+                logger.info("Client %s resumed its session! %s commands sent again.", client.name, len(unanswered))
+            else:
+                logger.info("Valid credentials. Client %s connected!", client.name)
+
+            while True:
+                message = await read_frame(client.reader, max_frame_size)
+                client.messages_received += 1
+                self.handle_message(client, message)
+        except ConnectionError as err:
+            logger.info("Client %s disconnected: %s", client.name, err)
+        finally:
+            if supervisor is not None:
+                supervisor.cancel()
+            if self.clients.get(client.name) is client:
+                del self.clients[client.name]
+                # kept until client resumes it or it expires
+                self.sessions.lost(session)
+            client.close()
+
+    def handle_message(self, client, message):
+        """
+            Handle a message received from an authenticated client.
+        :param client: ClientConnection that sent the message
+        :param message: Frame type
+        :return: None
+        """
+        self.metrics.count_received(len(message.payload))
+        client.heartbeat.packet_received()
+        if message.header & COMPRESSED_FLAG:
+            if client.compressor is None:
+                raise ConnectionError("Compressed frame received while compression is not negotiated!")
+            message = client.compressor.decompress(message)
+        if message.header == DATA_HEADER:
+            if message.message_id == TELEMETRY_DATA_ID:
+                client.telemetry.handle_batch(message.payload)
+                return
+            if message.message_id == HEARTBEAT_DATA_ID:
+                client.heartbeat.handle_heartbeat(message.payload)
+                return
+            if message.message_id == BATCH_REPLY_DATA_ID:
+                self.handle_batch_reply(client, message)
+                return
+
+        if client.typed_values:
+            response = decode_message(message, self.registry.client_commands.ids, self.registry.data.ids,
+                                      self.encoding, self.registry.client_commands.value_types,
+                                      self.registry.data.value_types)
+        else:
+            response = decode_message(message, self.registry.client_commands.ids, self.registry.data.ids,
+                                      self.encoding)
+        if not response["Valid"]:
+            self.metrics.count_invalid(response)
+        client.last_response = response
+        if not client.pending_requests.resolve(message.request_id, response):
+            logger.info("Client %s: %s", client.name, response)
+
+    def handle_batch_reply(self, client, message):
+        """
+            Resolve the batch waiting for client's aggregated reply with one decoded reply per command.
+        :param client: ClientConnection that sent the reply
+        :param message: batch reply Frame type
+        :return: None
+        """
+        try:
+            data_types = self.registry.data.value_types if client.typed_values else None
+            responses = decode_batch_reply(message, self.registry.data.ids, self.encoding, data_types)
+        except NameError as err:
+            self.metrics.decode_errors.value += 1
+            logger.warning("Client %s: %s", client.name, err)
+            return
+
+        client.last_response = responses
+        if not client.pending_requests.resolve(message.request_id, responses):
+            logger.info("Client %s: %s", client.name, responses)
+
+    def get_client(self, client_name):
+        """
+            Get connected client by name.
+        :param client_name: client's name
+        :return: ClientConnection, None if no such client is connected
+        """
+        return self.clients.get(client_name)
+
+    def get_client_names(self):
+        """
+            Get names of connected clients.
+        :return: list of names
+        """
+        return sorted(self.clients)
+
+    async def send_command(self, client_name, command, value=None):
+        """
+            Sends a command to a connected client.
+        :param client_name: name of the client to receive the command
+        :param command: command to be sent as Command type from generic_utils.py
+        :param value: value to be used by client, optional parameter
+        :return: True if ok, error occurred otherwise
+        """
+        client = self.clients.get(client_name)
+        if client is None:
+            error = "Unable to send command: no client named {} connected!".format(client_name)
+            logger.warning(error)
+            return error
+
+        if command.value_required and value is None:
+            error = "Unable to send command {}! Value required, but {} provided!".format(command, value)
+            logger.warning(error)
+            return error
+
+        try:
+            payload = encode_typed_value(command, value, self.encoding, client.typed_values)
+            if self.coalesce_commands and command.value_required:
+                client.send_latest_value(COMMAND_HEADER, command.id, payload)
+            else:
+                await client.send_frame(COMMAND_HEADER, command.id, payload)
+            return True
+        except Exception as err:
+            error = "Error occurred while sending command to client {}:\ncommand: ".format(client_name) + \
+                    str(command) + '\n' + str(err)
+            logger.warning(error)
+            return error
+
+    async def submit_command(self, client_name, command, value=None, timeout=GU_CT):
+        """
+            Sends a command to a connected client without waiting for its reply.
+        Many commands can be submitted before the first reply arrives, up to commands_in_flight per client.
+        :param client_name: name of the client to receive the command
+        :param command: command to be sent as Command type from generic_utils.py
+        :param value: value to be used by client, optional parameter
+        :param timeout: seconds to wait for client's reply (and for a free slot in the window)
+        :return: asyncio.Future resolved with client's decoded reply
+        """
+        future = asyncio.get_event_loop().create_future()
+
+        client = self.clients.get(client_name)
+        if client is None:
+            future.set_exception(ConnectionError("Unable to send command: no client named {} connected!".format(
+                client_name)))
+            return future
+
+        if command.value_required and value is None:
+            error = "Unable to send command {}! Value required, but {} provided!".format(command, value)
+            future.set_exception(ValueError(error))
+            return future
+
+        try:
+            await asyncio.wait_for(client.commands_window.acquire(), timeout)
+        except asyncio.TimeoutError:
+            future.set_exception(TimeoutError("Too many commands waiting for client {}'s reply!".format(client_name)))
+            return future
+        future.add_done_callback(lambda _: client.commands_window.release())
+
+        try:
+            payload = encode_typed_value(command, value, self.encoding, client.typed_values)
+        except ValueError as err:
+            future.set_exception(err)
+            return future
+        request_id = client.pending_requests.add(future, timeout, (command.id, payload))
+        self.metrics.track_command(future)
+        try:
+            await client.send_frame(COMMAND_HEADER, command.id, payload, request_id)
+        except Exception as err:
+            client.pending_requests.discard(request_id)
+            error = "Error occurred while sending command to client {}:\ncommand: ".format(client_name) + \
+                    str(command) + '\n' + str(err)
+            logger.warning(error)
+            future.set_exception(ConnectionError(error))
+
+        return future
+
+    async def submit_commands(self, client_name, commands, timeout=GU_CT):
+        """
+            Sends several commands to a connected client in one batch frame, run in order and answered at once.
+        :param client_name: name of the client to receive the commands
+        :param commands: list of (command as Command type from generic_utils.py, value or None)
+        :param timeout: seconds to wait for client's reply (and for a free slot in the window)
+        :return: asyncio.Future resolved with the list of client's decoded replies, in commands' order
+        """
+        client = self.clients.get(client_name)
+        max_frame_size = MAX_FRAME_SIZE if client is None else client.negotiated.max_frame_size
+        typed = client is not None and client.typed_values
+        try:
+            payload = encode_commands(commands, self.encoding, max_frame_size, typed)
+        except ValueError as err:
+            future = asyncio.get_event_loop().create_future()
+            future.set_exception(err)
+            return future
+
+        future = await self.submit_command(client_name, self.commands.batch, payload, timeout)
+        self.metrics.batched_commands.value += len(commands)
+        return future
+
+    async def broadcast_command(self, command, value=None, client_names=None, deadline=GU_CT):
+        """
+            Sends a command to many clients at once and collects their replies until deadline.
+        Command's payload is encoded (and compressed) once per negotiated encoding and written to every client without
+        waiting for the others, so a slow or dead client delays only itself.
+        :param command: command to be sent as Command type from generic_utils.py
+        :param value: value to be used by clients, optional parameter
+        :param client_names: names of the clients to receive the command, None for every connected client
+        :param deadline: seconds to wait for clients' replies
+        :return: dictionary
+                 "Confirmed": names of the clients that replied, sorted
+                 "Failed": client name: error occurred, for the clients that did not reply
+                 "Responses": client name: decoded reply
+                 "Latencies": client name: seconds between sending the command and receiving the reply
+                 "WorstLatency": highest latency in seconds, None if no client replied
+        """
+        if command.value_required and value is None:
+            error = "Unable to send command {}! Value required, but {} provided!".format(command, value)
+            raise ValueError(error)
+
+        if client_names is None:
+            client_names = list(self.clients)
+
+        failed = {}
+        clients = {}
+        for client_name in client_names:
+            client = self.clients.get(client_name)
+            if client is None:
+                failed[client_name] = "No client named {} connected!".format(client_name)
+            else:
+                clients[client_name] = client
+
+        # (typed values, compressed): (header, payload as sent, uncompressed payload), for the selected clients only
+        messages = {}
+        for client in clients.values():
+            key = (client.typed_values, client.compressor is not None)
+            if key not in messages:
+                payload = encode_typed_value(command, value, self.encoding, client.typed_values)
+                if client.compressor is not None:
+                    messages[key] = self.compression.compress(COMMAND_HEADER, command.id, payload) + (payload, )
+                else:
+                    messages[key] = (COMMAND_HEADER, payload, payload)
+
+        sent_at = time.perf_counter()
+        deliveries = {}
+        for client_name, client in clients.items():
+            header, frame_payload, payload = messages[(client.typed_values, client.compressor is not None)]
+            deliveries[client_name] = asyncio.ensure_future(
+                self.__deliver__(client, command.id, header, frame_payload, payload, deadline))
+
+        if deliveries:
+            _, late = await asyncio.wait(deliveries.values(), timeout=deadline)
+            for delivery in late:
+                delivery.cancel()
+            if late:
+                await asyncio.wait(late)
+
+        responses = {}
+        latencies = {}
+        for client_name, delivery in deliveries.items():
+            if delivery.cancelled():
+                failed[client_name] = "No reply received before deadline!"
+            elif delivery.exception() is not None:
+                failed[client_name] = str(delivery.exception())
+            else:
+                responses[client_name], received_at = delivery.result()
+                latencies[client_name] = received_at - sent_at
+
+        return {
+            "Confirmed": sorted(responses),
+            "Failed": failed,
+            "Responses": responses,
+            "Latencies": latencies,
+            "WorstLatency": max(latencies.values()) if latencies else None,
+        }
+
+    async def __deliver__(self, client, command_id, header, frame_payload, payload, timeout):
+        """
+            Send a broadcast command to one client and wait for its reply.
+        :param client: ClientConnection
+        :param command_id: command's id as integer
+        :param header: frame's header, with COMPRESSED_FLAG set if frame_payload is compressed
+        :param frame_payload: payload as sent, shared by every client
+        :param payload: uncompressed payload, sent again if client's session is resumed
+        :param timeout: seconds to wait for client's reply
+        :return: (decoded reply, time.perf_counter() when received)
+        """
+        await client.commands_window.acquire()
+        future = asyncio.get_event_loop().create_future()
+        future.add_done_callback(lambda _: client.commands_window.release())
+
+        request_id = client.pending_requests.add(future, timeout, (command_id, payload))
+        self.metrics.track_command(future)
+        try:
+            await client.send_shared_frame(header, command_id, frame_payload, request_id)
+            response = await future
+        finally:
+            # no longer waited for once deadline passed, cancelling the task cancelled the future
+            if future.cancelled() or not future.done():
+                client.pending_requests.discard(request_id)
+                future.cancel()
+        return response, time.perf_counter()
+
+    def start_in_thread(self):
+        """
+            Run the server's event loop on a background thread, so blocking code can use it through call().
+        :return: None
+        """
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors = []
+
+        def run_loop():
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(self.start())
+            except Exception as err:
+                errors.append(err)
+                started.set()
+                return
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run_loop, name='HostServer', daemon=True)
+        self.thread.start()
+        started.wait()
+
+        if errors:
+            raise errors[0]
+
+    def call(self, coroutine, timeout=None):
+        """
+            Run a coroutine on the server's thread and wait for its result.
+        :param coroutine: coroutine to be run, for instance self.broadcast_command(command)
+        :param timeout: seconds to wait for the result, None to wait forever
+        :return: coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def stop_thread(self):
+        """
+            Close the server and stop the background thread started by start_in_thread.
+        :return: None
+        """
+        if self.thread is None:
+            return
+        self.call(self.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.thread = None
@@ -3,7 +3,7 @@ import logging
 from .generic_utils import Command
 from .host_commands_constants import *
 
-logger = logging.getLogger('ipx_logger')
+logger = logging.getLogger('ipx_logger.host_utils')
 
 
 class HostCommands:
@@ -31,6 +31,7 @@ class HostCommands:
             START_VIDEO_STREAMING_CMD_DESCRIPTION,
             START_VIDEO_STREAMING_CMD_IN_CODE,
             START_VIDEO_STREAMING_CMD_VR,
+            START_VIDEO_STREAMING_CMD_VT,
         )
 
         self.stop_video_streaming = Command(
@@ -41,11 +42,76 @@ class HostCommands:
             STOP_VIDEO_STREAMING_CMD_VR,
         )
 
+        self.open_control_channel = Command(
+            OPEN_CONTROL_CHANNEL_CMD_ID,
+            OPEN_CONTROL_CHANNEL_CMD_NAME,
+            OPEN_CONTROL_CHANNEL_CMD_DESCRIPTION,
+            OPEN_CONTROL_CHANNEL_CMD_IN_CODE,
+            OPEN_CONTROL_CHANNEL_CMD_VR,
+        )
+
+        self.set_speed = Command(
+            SET_SPEED_CMD_ID,
+            SET_SPEED_CMD_NAME,
+            SET_SPEED_CMD_DESCRIPTION,
+            SET_SPEED_CMD_IN_CODE,
+            SET_SPEED_CMD_VR,
+            SET_SPEED_CMD_VT,
+        )
+
+        self.set_steering = Command(
+            SET_STEERING_CMD_ID,
+            SET_STEERING_CMD_NAME,
+            SET_STEERING_CMD_DESCRIPTION,
+            SET_STEERING_CMD_IN_CODE,
+            SET_STEERING_CMD_VR,
+            SET_STEERING_CMD_VT,
+        )
+
+        self.ping = Command(
+            PING_CMD_ID,
+            PING_CMD_NAME,
+            PING_CMD_DESCRIPTION,
+            PING_CMD_IN_CODE,
+            PING_CMD_VR,
+        )
+
+        self.heartbeat = Command(
+            HEARTBEAT_CMD_ID,
+            HEARTBEAT_CMD_NAME,
+            HEARTBEAT_CMD_DESCRIPTION,
+            HEARTBEAT_CMD_IN_CODE,
+            HEARTBEAT_CMD_VR,
+        )
+
+        self.session = Command(
+            SESSION_CMD_ID,
+            SESSION_CMD_NAME,
+            SESSION_CMD_DESCRIPTION,
+            SESSION_CMD_IN_CODE,
+            SESSION_CMD_VR,
+        )
+
+        self.batch = Command(
+            BATCH_CMD_ID,
+            BATCH_CMD_NAME,
+            BATCH_CMD_DESCRIPTION,
+            BATCH_CMD_IN_CODE,
+            BATCH_CMD_VR,
+        )
+
         self.all_commands = sorted(
             [
                 self.ask_client_for_credentials,
                 self.start_video_streaming,
                 self.stop_video_streaming,
+                self.open_control_channel,
+                self.set_speed,
+                self.set_steering,
+                self.ping,
+                self.heartbeat,
+                self.session,
+                self.batch,
             ]
         )
 
@@ -0,0 +1,156 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import time
+
+# ===================================================== CONSTANTS =====================================================
+# Name of the logger used by the package, modules log to its children: ipx_logger.host, ipx_logger.client, ...
+LOGGER_NAME = 'ipx_logger'
+
+# Format of the logged records
+LOG_FORMAT = "%(asctime)s - %(levelname)s: %(message)s"
+LOG_DATE_FORMAT = '%d %b %Y %H:%M:%S'
+
+# Environment variables overriding configure_logging's levels
+# example: IPX_LOG_LEVEL=INFO IPX_LOG_LEVELS=host=DEBUG,video_streaming=WARNING
+LOG_LEVEL_VARIABLE = 'IPX_LOG_LEVEL'
+LOG_LEVELS_VARIABLE = 'IPX_LOG_LEVELS'
+
+# Directory of log files created by get_log_file_path
+LOG_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'logs')
+
+# Types kept as they are when a record is queued, other arguments are converted to string right away
+IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+# ===================================================== CONSTANTS =====================================================
+
+# background thread writing queued records, see configure_logging
+_listener = None
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    """
+        Handler putting records in a queue, to be formatted and written by a background thread.
+    Unlike logging.handlers.QueueHandler the message is not formatted by the logging thread: only arguments that may
+    change or be invalidated before the record is written (dictionaries, memoryviews, ...) are converted to string.
+    """
+    def prepare(self, record):
+        """
+            Make the record safe to be formatted later by another thread.
+        :param record: logging.LogRecord
+        :return: record
+        """
+        if record.args:
+            if isinstance(record.args, tuple):
+                record.args = tuple(
+                    argument if isinstance(argument, IMMUTABLE_TYPES) else str(argument) for argument in record.args
+                )
+            else:
+                record.msg = record.getMessage()
+                record.args = None
+
+        if record.exc_info:
+            # traceback objects keep frames alive, format them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+
+def parse_levels(levels):
+    """
+        Parse per module levels.
+    :param levels: comma separated module=level pairs as string
+                   example: 'host=DEBUG,video_streaming=WARNING'
+    :return: dictionary module: level
+    """
+    parsed_levels = {}
+    for item in str(levels).split(','):
+        if not item.strip():
+            continue
+        module, _, level = item.partition('=')
+        if not level:
+            error = "Invalid log level: {}!".format(item) + "\nExpected module=level!"
+            raise NameError(error)
+        parsed_levels[module.strip()] = level.strip().upper()
+    return parsed_levels
+
+
+def get_log_file_path(directory=LOG_DIRECTORY):
+    """
+        Get path of a new log file named after current time.
+    :param directory: directory of the log file
+    :return: path - string
+              example: logs/log_18Oct2026_084432.ipx
+    """
+    return os.path.join(directory, 'log_' + time.strftime("%d%h%Y_%H%M%S") + '.ipx')
+
+
+def configure_logging(level=logging.INFO, levels=None, log_file=None, console=True):
+    """
+        Send package's records through a queue to a background thread writing them to console and/or a file.
+    Logging calls then only create a record and put it in the queue, formatting and I/O are done by the writer thread.
+    Calling it again replaces the previous configuration.
+    :param level: level of every module as integer or name
+                  example: 'DEBUG'
+    :param levels: per module levels, overriding level, as dictionary module: level
+                   example: {'host': 'DEBUG', 'video_streaming': 'WARNING'}
+    :param log_file: path of the log file, its directory is created if needed; None to log to console only
+    :param console: log to standard error
+    :return: None
+    """
+    global _listener
+
+    stop_logging()
+
+    level = os.environ.get(LOG_LEVEL_VARIABLE, level)
+    if isinstance(level, str):
+        level = level.upper()
+    levels = dict(levels or {})
+    levels.update(parse_levels(os.environ.get(LOG_LEVELS_VARIABLE, '')))
+
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    handlers = []
+    if console:
+        handlers.append(logging.StreamHandler())
+    if log_file is not None:
+        log_directory = os.path.dirname(os.path.abspath(log_file))
+        os.makedirs(log_directory, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file, mode='w'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueingHandler):
+            logger.removeHandler(handler)
+    logger.addHandler(QueueingHandler(records))
+    logger.setLevel(level)
+    logger.propagate = False
+
+    for module, module_level in levels.items():
+        logging.getLogger(LOGGER_NAME + '.' + module).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """
+        Write queued records and stop the background writer thread.
+    :return: None
+    """
+    global _listener
+
+    if _listener is None:
+        return
+
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,238 @@
+import bisect
+import logging
+import time
+
+from .frame_utils import FRAME_PREFIX, INVALID_ID_ERROR
+
+# ===================================================== CONSTANTS =====================================================
+# Prefix of exported metric names
+METRICS_PREFIX = 'ipx_'
+
+# Upper bounds in seconds of latency histograms' buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Upper bounds in seconds of the buckets of the time needed to get a lost connection back
+RECOVERY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.metrics')
+
+
+class Counter:
+    """
+        Class used to count events, only ever increases.
+    Hot paths may increment value directly: counter.value += 1
+    """
+    __slots__ = ('name', 'help', 'value')
+
+    def __init__(self, name, help_text):
+        """
+            Constructor
+        :param name: metric's name as string
+                     example: messages_received_total
+        :param help_text: metric's description as string
+        """
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        """
+            Increase counter.
+        :param amount: increment
+        :return: None
+        """
+        self.value += amount
+
+    def render(self, labels):
+        """
+            Get counter in text exposition format.
+        :param labels: rendered labels as string, example: '{role="host"}'
+        :return: list of lines
+        """
+        name = METRICS_PREFIX + self.name
+        return [
+            "# HELP {} {}".format(name, self.help),
+            "# TYPE {} counter".format(name),
+            "{}{} {}".format(name, labels, self.value),
+        ]
+
+
+class Histogram:
+    """
+        Class used to record the distribution of observed values in fixed buckets.
+    Observing a value costs a bisection and two additions, no value is kept.
+    """
+    __slots__ = ('name', 'help', 'bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, name, help_text, bounds=LATENCY_BUCKETS):
+        """
+            Constructor
+        :param name: metric's name as string
+                     example: command_rtt_seconds
+        :param help_text: metric's description as string
+        :param bounds: sorted upper bounds of the buckets
+        """
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(bounds)
+        # one more bucket for values above the last bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+            Record a value.
+        :param value: observed value as number
+        :return: None
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def get_percentile(self, percent):
+        """
+            Estimate a percentile: upper bound of the bucket holding it.
+        :param percent: percentile, between 0 and 100
+        :return: value, None if nothing was observed; inf if above the last bound
+        """
+        if not self.count:
+            return None
+        rank = percent / 100.0 * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float('inf'), ), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+    def render(self, labels):
+        """
+            Get histogram in text exposition format.
+        :param labels: rendered labels as string, example: '{role="host"}'
+        :return: list of lines
+        """
+        name = METRICS_PREFIX + self.name
+        bucket_labels = labels[:-1] + ',' if labels else '{'
+        lines = [
+            "# HELP {} {}".format(name, self.help),
+            "# TYPE {} histogram".format(name),
+        ]
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append('{}_bucket{}le="{}"}} {}'.format(name, bucket_labels, bound, cumulative))
+        lines.append('{}_bucket{}le="+Inf"}} {}'.format(name, bucket_labels, self.count))
+        lines.append("{}_sum{} {}".format(name, labels, self.sum))
+        lines.append("{}_count{} {}".format(name, labels, self.count))
+        return lines
+
+
+class Metrics:
+    """
+        Class holding the counters and histograms of a Host, Client or host server.
+    Metrics are plain attributes, recording is an attribute increment so they are always on:
+        metrics.messages_received.value += 1
+        metrics.command_rtt.observe(elapsed)
+    Updates are not locked: concurrent increments from several threads may, rarely, be lost.
+    """
+    def __init__(self, role):
+        """
+            Constructor
+        :param role: label identifying the owner as string
+                     example: host
+        """
+        self.role = role
+
+        self.messages_received = Counter('messages_received_total', "Frames received.")
+        self.bytes_received = Counter('bytes_received_total', "Bytes received, frame prefixes included.")
+        self.messages_sent = Counter('messages_sent_total', "Frames sent.")
+        self.bytes_sent = Counter('bytes_sent_total', "Bytes sent, frame prefixes included.")
+        self.decode_errors = Counter('decode_errors_total', "Frames with invalid header or content encoding.")
+        self.invalid_ids = Counter('invalid_ids_total', "Frames with unknown command or data id.")
+        self.connections = Counter('connections_total', "Connections established.")
+        self.reconnects = Counter('reconnects_total', "Connections established after the first one.")
+        self.dead_peers = Counter('dead_peers_total', "Connections dropped because peer stopped sending heartbeats.")
+        self.sessions_resumed = Counter('sessions_resumed_total', "Connections resuming a session without credentials.")
+        self.batched_commands = Counter('batched_commands_total', "Commands sent or run inside batch commands.")
+        self.coalesced_commands = Counter('coalesced_commands_total', "Value commands replaced by a newer value.")
+        self.handler_errors = Counter('handler_errors_total', "Commands whose handler raised an exception.")
+        self.command_rtt = Histogram('command_rtt_seconds', "Seconds between sending a command and its reply.")
+        self.handler_time = Histogram('handler_seconds', "Seconds spent running command handlers.")
+        self.send_wait = Histogram('send_wait_seconds', "Seconds frames waited in the outbound queue.")
+        self.recovery_time = Histogram('recovery_seconds', "Seconds between losing a connection and getting it back.",
+                                       RECOVERY_BUCKETS)
+
+    def get_metrics(self):
+        """
+            Get every counter and histogram.
+        :return: list of Counter/Histogram
+        """
+        return [metric for metric in vars(self).values() if isinstance(metric, (Counter, Histogram))]
+
+    def count_received(self, payload_length):
+        """
+            Record a received frame.
+        :param payload_length: size of frame's payload in bytes
+        :return: None
+        """
+        self.messages_received.value += 1
+        self.bytes_received.value += FRAME_PREFIX.size + payload_length
+
+    def count_sent(self, payload_length):
+        """
+            Record a sent frame.
+        :param payload_length: size of frame's payload in bytes
+        :return: None
+        """
+        self.messages_sent.value += 1
+        self.bytes_sent.value += FRAME_PREFIX.size + payload_length
+
+    def count_invalid(self, response):
+        """
+            Record a decoded message flagged invalid.
+        :param response: decoded message as dictionary, see frame_utils.decode_message
+        :return: None
+        """
+        if response["Error"] == INVALID_ID_ERROR:
+            self.invalid_ids.value += 1
+        else:
+            self.decode_errors.value += 1
+
+    def track_command(self, future):
+        """
+            Record command's round trip time when its reply resolves the future.
+        :param future: concurrent.futures.Future or asyncio.Future waiting for the reply
+        :return: None
+        """
+        sent_at = time.perf_counter()
+
+        def observe_round_trip(done):
+            if not done.cancelled() and done.exception() is None:
+                self.command_rtt.observe(time.perf_counter() - sent_at)
+
+        future.add_done_callback(observe_round_trip)
+
+    def count_connection(self, lost_at=None):
+        """
+            Record an established connection.
+        :param lost_at: time.monotonic() value when the previous connection was lost, None if unknown
+        :return: None
+        """
+        if self.connections.value:
+            self.reconnects.value += 1
+        self.connections.value += 1
+        if lost_at is not None:
+            self.recovery_time.observe(time.monotonic() - lost_at)
+
+    def render(self):
+        """
+            Get every metric in plain text exposition format.
+        :return: metrics - string
+        """
+        labels = '{{role="{}"}}'.format(self.role)
+        lines = []
+        for metric in self.get_metrics():
+            lines.extend(metric.render(labels))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,316 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+from collections import namedtuple
+
+from .generic_utils import COMMAND_HEADER, DATA_HEADER
+
+from .frame_utils import COMPRESSED_FLAG
+
+from .generic_data_constants import CREDENTIALS_DATA_ID
+from .generic_data_constants import HEARTBEAT_DATA_ID
+from .generic_data_constants import RESUME_SESSION_DATA_ID
+from .host_commands_constants import ASK_CLIENT_FOR_CREDENTIALS_CMD_ID
+from .host_commands_constants import HEARTBEAT_CMD_ID
+from .host_commands_constants import OPEN_CONTROL_CHANNEL_CMD_ID
+from .host_commands_constants import SESSION_CMD_ID
+
+# ===================================================== CONSTANTS =====================================================
+# Recording file starts with RECORDING_MAGIC (6 bytes) and RECORDING_VERSION (1 byte)
+RECORDING_MAGIC = b'IPXREC'
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct('>6sB')
+
+# Record of a frame, followed by frame's payload:
+#   timestamp      - 8 bytes, float: seconds between recording's start and the frame, time.monotonic() based
+#   direction      - 1 byte: SENT or RECEIVED, 0 marks the end of the recording
+#   header         - 1 byte: COMMAND_HEADER or DATA_HEADER
+#   message id     - 2 bytes, unsigned, big endian
+#   request id     - 4 bytes, unsigned, big endian
+#   payload length - 4 bytes, unsigned, big endian
+RECORD = struct.Struct('>dBBHII')
+
+# Directions of recorded frames
+SENT = 1
+RECEIVED = 2
+
+# Recording file is memory mapped and grows by this many bytes at once
+RECORDING_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Directory of recordings created by get_recording_path
+RECORDING_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'recordings')
+
+# Frames of the handshake and connection supervision, generated by the live connection instead of being replayed
+REPLAY_SKIPPED_COMMANDS = frozenset((ASK_CLIENT_FOR_CREDENTIALS_CMD_ID, HEARTBEAT_CMD_ID, SESSION_CMD_ID,
+                                     OPEN_CONTROL_CHANNEL_CMD_ID))
+REPLAY_SKIPPED_DATA = frozenset((CREDENTIALS_DATA_ID, HEARTBEAT_DATA_ID, RESUME_SESSION_DATA_ID))
+
+# Frames carrying credentials or session/control tokens, recorded without their payload
+SECRET_COMMANDS = frozenset((SESSION_CMD_ID, OPEN_CONTROL_CHANNEL_CMD_ID))
+SECRET_DATA = frozenset((CREDENTIALS_DATA_ID, RESUME_SESSION_DATA_ID))
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.recorder')
+
+# Frame read from a recording
+Record = namedtuple('Record', ['timestamp', 'direction', 'header', 'message_id', 'request_id', 'payload'])
+
+
+def get_recording_path(directory=RECORDING_DIRECTORY):
+    """
+        Get path of a new recording named after current time.
+    :param directory: directory of the recording
+    :return: path - string
+              example: recordings/rec_18Oct2026_084432.ipxrec
+    """
+    return os.path.join(directory, 'rec_' + time.strftime("%d%h%Y_%H%M%S") + '.ipxrec')
+
+
+class FrameRecorder:
+    """
+        Class used to append every frame sent or received by a Host or Client to a compact binary recording.
+    The file is memory mapped: recording a frame is a struct pack and a copy into the map, no system call. Frames are
+    recorded uncompressed, so a recording replays whatever compression the replaying connection negotiates.
+    Credentials and tokens never reach the file: frames carrying them are recorded with an empty payload.
+    Recording is thread safe: user, receiver, heartbeat and telemetry threads may record at once.
+    """
+    def __init__(self, path, chunk_size=RECORDING_CHUNK_SIZE):
+        """
+            Constructor
+        :param path: path of the recording file, its directory is created if needed; an existing file is overwritten
+        :param chunk_size: bytes the file grows by when full
+                           example: 4194304
+        """
+        if type(chunk_size) is not int or chunk_size < RECORDING_HEADER.size:
+            error = "Invalid recording chunk size: {}!".format(chunk_size) + "\nExpected positive integer type!"
+            raise NameError(error)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+
+        self.file = open(path, 'w+b')
+        self.file.truncate(chunk_size)
+        self.map = mmap.mmap(self.file.fileno(), chunk_size)
+        RECORDING_HEADER.pack_into(self.map, 0, RECORDING_MAGIC, RECORDING_VERSION)
+        self.offset = RECORDING_HEADER.size
+        self.started_at = time.monotonic()
+
+        # recording statistics
+        self.frames_recorded = 0
+
+    def record(self, direction, header, message_id, request_id, payload):
+        """
+            Append a frame to the recording.
+        :param direction: SENT or RECEIVED
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param request_id: frame's request id as integer
+        :param payload: frame's content as bytes-like object, left out for frames carrying secrets
+        :return: None
+        """
+        timestamp = time.monotonic() - self.started_at
+        secrets = SECRET_COMMANDS if header == COMMAND_HEADER else SECRET_DATA
+        if message_id in secrets:
+            payload = b''
+        length = len(payload)
+        with self.lock:
+            if self.map is None:
+                return
+            start = self.offset + RECORD.size
+            end = start + length
+            if end > len(self.map):
+                self.__grow__(end)
+            RECORD.pack_into(self.map, self.offset, timestamp, direction, header, message_id, request_id, length)
+            self.map[start:end] = payload
+            self.offset = end
+            self.frames_recorded += 1
+
+    def __grow__(self, required_size):
+        """
+            Grow the file and map it again, called with lock held.
+        :param required_size: minimum size of the file in bytes
+        :return: None
+        """
+        size = len(self.map)
+        while size < required_size:
+            size += self.chunk_size
+        self.map.close()
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+    def get_size(self):
+        """
+            Get size of the recorded data.
+        :return: bytes - integer
+        """
+        return self.offset
+
+    def close(self):
+        """
+            Stop recording, the file is truncated to the recorded data.
+        :return: None
+        """
+        with self.lock:
+            if self.map is None:
+                return
+            self.map.flush()
+            self.map.close()
+            self.map = None
+            self.file.truncate(self.offset)
+            self.file.close()
+        logger.info("Recorded %s frames in %s", self.frames_recorded, self.path)
+
+
+def read_recording(path):
+    """
+        Read the frames of a recording, a recording not closed properly is read up to its last complete frame.
+    :param path: path of the recording file
+    :return: list of Record
+    """
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < RECORDING_HEADER.size:
+            error = "Invalid recording: {}!".format(path) + "\nFile too small!"
+            raise NameError(error)
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            magic, version = RECORDING_HEADER.unpack_from(view, 0)
+            if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+                error = "Invalid recording: {}!".format(path)
+                error += "\nExpected {} version {}!".format(RECORDING_MAGIC, RECORDING_VERSION)
+                raise NameError(error)
+
+            records = []
+            offset = RECORDING_HEADER.size
+            while offset + RECORD.size <= size:
+                timestamp, direction, header, message_id, request_id, length = RECORD.unpack_from(view, offset)
+                start = offset + RECORD.size
+                if not direction or start + length > size:
+                    break
+                records.append(Record(timestamp, direction, header, message_id, request_id, view[start:start + length]))
+                offset = start + length
+    return records
+
+
+class FrameReplayer:
+    """
+        Class used to replay a recording's frames through a live Host or Client, with the recorded timing.
+    Host's commands drive a Client, client's data drive a Host:
+        replayer = FrameReplayer(path, speed=2.0)
+        replayer.drive_client(host)
+    Handshake and heartbeat frames are not replayed: the live connection makes its own.
+    """
+    def __init__(self, path, speed=1.0):
+        """
+            Constructor
+        :param path: path of the recording file
+        :param speed: replay speed factor, 2.0 replays twice as fast; None replays as fast as possible
+        """
+        if speed is not None and speed <= 0:
+            error = "Invalid replay speed: {}!".format(speed) + "\nExpected positive number or None!"
+            raise NameError(error)
+
+        self.path = path
+        self.speed = speed
+        self.records = read_recording(path)
+        self.stopped = threading.Event()
+
+        # replay statistics, see get_statistics
+        self.frames_replayed = 0
+        self.send_errors = 0
+        self.max_lag = 0.0
+        self.duration = 0.0
+
+    def get_frames(self, header):
+        """
+            Get the recorded frames replayed for a header.
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :return: list of Record
+        """
+        skipped = REPLAY_SKIPPED_COMMANDS if header == COMMAND_HEADER else REPLAY_SKIPPED_DATA
+        return [
+            record for record in self.records
+            if record.header & ~COMPRESSED_FLAG == header and record.message_id not in skipped
+        ]
+
+    def replay(self, send, header):
+        """
+            Send the recorded frames of a header in order, each one at its recorded time divided by speed.
+        :param send: function called as send(header, message_id, payload, request_id),
+                     returns True if ok, error occurred as string if not ok
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :return: number of frames replayed
+        """
+        frames = self.get_frames(header)
+        if not frames:
+            return 0
+
+        self.stopped.clear()
+        first_timestamp = frames[0].timestamp
+        started_at = time.monotonic()
+        replayed = 0
+        for record in frames:
+            if self.speed is not None:
+                due = started_at + (record.timestamp - first_timestamp) / self.speed
+                delay = due - time.monotonic()
+                if delay > 0 and self.stopped.wait(delay):
+                    break
+                lag = time.monotonic() - due
+                if lag > self.max_lag:
+                    self.max_lag = lag
+            elif self.stopped.is_set():
+                break
+
+            if send(header, record.message_id, record.payload, record.request_id) is not True:
+                self.send_errors += 1
+            replayed += 1
+
+        self.frames_replayed += replayed
+        self.duration = time.monotonic() - started_at
+        logger.info("Replayed %s frames of %s in %.3fs", replayed, self.path, self.duration)
+        return replayed
+
+    def drive_client(self, host):
+        """
+            Replay recorded host's commands to the client connected to host.
+        :param host: Host connected with a client
+        :return: number of frames replayed
+        """
+        return self.replay(host.send_frame, COMMAND_HEADER)
+
+    def drive_host(self, client):
+        """
+            Replay recorded client's data to the host client is connected to.
+        :param client: Client connected to a host
+        :return: number of frames replayed
+        """
+        return self.replay(client.send_frame, DATA_HEADER)
+
+    def stop(self):
+        """
+            Stop a running replay.
+        :return: None
+        """
+        self.stopped.set()
+
+    def get_statistics(self):
+        """
+            Get replay statistics, times in seconds.
+        :return: dictionary
+        """
+        return {
+            "Records": len(self.records),
+            "FramesReplayed": self.frames_replayed,
+            "SendErrors": self.send_errors,
+            "MaxLag": self.max_lag,
+            "Duration": self.duration,
+        }
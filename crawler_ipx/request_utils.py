@@ -0,0 +1,151 @@
+import heapq
+import logging
+import threading
+import time
+
+from .generic_utils import COMMAND_TIMEOUT as GU_CT
+
+from .frame_utils import NO_REQUEST_ID
+
+# ===================================================== CONSTANTS =====================================================
+# Request ids are carried on 4 bytes, they wrap around after this value
+MAX_REQUEST_ID = 2 ** 32 - 1
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.request_utils')
+
+
+class PendingRequests:
+    """
+        Class used to match replies with the commands waiting for them.
+    Every command gets a request id and a future; the reply carrying the same request id resolves the future. Works with
+    both concurrent.futures.Future (blocking host) and asyncio.Future (host server), timeouts are applied by expire().
+    """
+    def __init__(self):
+        """
+            Constructor
+        """
+        self.lock = threading.Lock()
+
+        # request id: future
+        self.requests = {}
+
+        # request id: (command id, payload) of the commands to be sent again if their session is resumed
+        self.messages = {}
+
+        # (deadline, request id) heap used to fail requests not answered in time
+        self.deadlines = []
+
+        self.last_request_id = NO_REQUEST_ID
+
+    def __next_request_id__(self):
+        """
+            Get next free request id, NO_REQUEST_ID is never used.
+        :return: request id - integer
+        """
+        request_id = self.last_request_id
+        while True:
+            request_id = request_id + 1 if request_id < MAX_REQUEST_ID else NO_REQUEST_ID + 1
+            if request_id not in self.requests:
+                self.last_request_id = request_id
+                return request_id
+
+    def add(self, future, timeout=GU_CT, message=None):
+        """
+            Register a future waiting for a reply.
+        :param future: future to be resolved with the reply
+        :param timeout: seconds to wait for the reply, None to wait forever
+        :param message: (command id, payload) sent with the request id, kept until the reply arrives, see get_unanswered
+        :return: request id to be sent with the command - integer
+        """
+        with self.lock:
+            request_id = self.__next_request_id__()
+            self.requests[request_id] = future
+            if message is not None:
+                self.messages[request_id] = message
+            if timeout is not None:
+                heapq.heappush(self.deadlines, (time.monotonic() + timeout, request_id))
+        return request_id
+
+    def resolve(self, request_id, response):
+        """
+            Resolve the future waiting for request id.
+        :param request_id: request id received with the reply
+        :param response: reply to be set as future's result
+        :return: True if a future was waiting for the reply, False otherwise
+        """
+        with self.lock:
+            future = self.requests.pop(request_id, None)
+            self.messages.pop(request_id, None)
+
+        if future is None:
+            return False
+
+        if not future.done():
+            future.set_result(response)
+        return True
+
+    def discard(self, request_id):
+        """
+            Forget a request, for instance when its command could not be sent.
+        :param request_id: request id
+        :return: None
+        """
+        with self.lock:
+            self.requests.pop(request_id, None)
+            self.messages.pop(request_id, None)
+
+    def expire(self, now=None):
+        """
+            Fail requests whose timeout elapsed.
+        :param now: time.monotonic() value, current time if None
+        :return: number of expired requests
+        """
+        if now is None:
+            now = time.monotonic()
+
+        expired = []
+        with self.lock:
+            while self.deadlines and self.deadlines[0][0] <= now:
+                _, request_id = heapq.heappop(self.deadlines)
+                future = self.requests.pop(request_id, None)
+                self.messages.pop(request_id, None)
+                if future is not None:
+                    expired.append((request_id, future))
+
+        for request_id, future in expired:
+            if not future.done():
+                future.set_exception(TimeoutError("No reply received for request {}!".format(request_id)))
+
+        return len(expired)
+
+    def fail_all(self, error):
+        """
+            Fail every pending request, used when connection is lost.
+        :param error: exception set on every future
+        :return: None
+        """
+        with self.lock:
+            futures = list(self.requests.values())
+            self.requests.clear()
+            self.messages.clear()
+            self.deadlines = []
+
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def get_unanswered(self):
+        """
+            Get the commands still waiting for a reply, in the order they were sent.
+        :return: list of (request id, (command id, payload))
+        """
+        with self.lock:
+            return list(self.messages.items())
+
+    def __len__(self):
+        """
+            Number of requests waiting for reply.
+        :return: integer
+        """
+        return len(self.requests)
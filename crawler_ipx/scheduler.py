@@ -0,0 +1,277 @@
+import heapq
+import itertools
+import logging
+import select
+import threading
+import time
+
+from .generic_utils import COMMAND_HEADER
+
+from .frame_utils import COMPRESSED_FLAG, NO_REQUEST_ID
+from .frame_utils import send_frame
+
+from .generic_data_constants import HEARTBEAT_DATA_ID
+from .generic_data_constants import TELEMETRY_DATA_ID
+from .generic_data_constants import VIDEO_FRAME_DATA_ID
+
+# ===================================================== CONSTANTS =====================================================
+# Priority classes of outbound frames, lower value sent first
+CONTROL_PRIORITY = 0
+ACK_PRIORITY = 1
+TELEMETRY_PRIORITY = 2
+VIDEO_PRIORITY = 3
+
+# Names of priority classes, by priority
+PRIORITY_NAMES = ('control', 'ack', 'telemetry', 'video')
+
+# Priority of data frames by data id, other data (replies, credentials) are acks; commands are control frames
+DATA_PRIORITIES = {
+    HEARTBEAT_DATA_ID: CONTROL_PRIORITY,
+    TELEMETRY_DATA_ID: TELEMETRY_PRIORITY,
+    VIDEO_FRAME_DATA_ID: VIDEO_PRIORITY,
+}
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.scheduler')
+
+
+def get_priority(header, message_id):
+    """
+        Get the priority class of a frame from its command or data type.
+    :param header: COMMAND_HEADER or DATA_HEADER
+    :param message_id: command/data id as integer
+    :return: priority - integer, see PRIORITY_NAMES
+    """
+    if header & ~COMPRESSED_FLAG == COMMAND_HEADER:
+        return CONTROL_PRIORITY
+    return DATA_PRIORITIES.get(message_id, ACK_PRIORITY)
+
+
+def is_writable(socket):
+    """
+        Check whether a socket accepts data without blocking.
+    :param socket: connected socket
+    :return: True if writable or closed, a closed socket's error is raised by the write
+    """
+    try:
+        _, writable, _ = select.select([], [socket], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(writable)
+
+
+class OutboundFrame:
+    """
+        Class used to keep a frame waiting in the outbound queue.
+    """
+    __slots__ = ('priority', 'socket', 'header', 'message_id', 'payload', 'request_id', 'coalesce', 'queued_at', 'sent',
+                 'error')
+
+    def __init__(self, priority, socket, header, message_id, payload, request_id, coalesce=False):
+        self.priority = priority
+        self.socket = socket
+        self.header = header
+        self.message_id = message_id
+        self.payload = payload
+        self.request_id = request_id
+        self.coalesce = coalesce
+        self.queued_at = time.perf_counter()
+        self.sent = False
+        self.error = None
+
+
+class OutboundScheduler:
+    """
+        Class used to send a connection's frames by priority class: control > ack > telemetry > video.
+    Frames are queued by the threads sending them; the thread holding the connection writes queued frames one at a time,
+    highest priority first, so a control frame waits at most for the frame being written. Frames of the same class
+    keep their order. send() returns once the caller's own frame was written, whichever thread wrote it.
+    A coalesced frame replaces the value of the same command still waiting in the queue instead of being queued behind
+    it: only the latest value is sent. Its sender does not wait for a busy or backlogged connection, a drain thread
+    writes it once the socket accepts data again, so the values sent meanwhile replace it.
+    """
+    def __init__(self):
+        """
+            Constructor
+        """
+        # (priority, sequence, OutboundFrame) heap
+        self.queue = []
+        self.sequence = itertools.count()
+        self.queue_lock = threading.Lock()
+
+        # (socket, header, message id): queued OutboundFrame replaced by newer coalesced frames
+        self.coalescing = {}
+
+        # held by the thread writing queued frames
+        self.write_lock = threading.Lock()
+
+        # set while a drain thread writes the coalesced frames their senders did not wait for
+        self.draining = False
+
+        # optional metrics.Histogram recording every frame's time spent in the queue
+        self.wait_time = None
+
+        # optional metrics.Counter counting frames replaced by a newer value
+        self.coalesced = None
+
+        # statistics by priority class
+        self.depths = [0] * len(PRIORITY_NAMES)
+        self.max_depths = [0] * len(PRIORITY_NAMES)
+        self.frames_sent = [0] * len(PRIORITY_NAMES)
+        self.total_wait = [0.0] * len(PRIORITY_NAMES)
+        self.max_wait = [0.0] * len(PRIORITY_NAMES)
+        self.frames_coalesced = [0] * len(PRIORITY_NAMES)
+
+    def send(self, socket, header, message_id, payload=b'', request_id=NO_REQUEST_ID, priority=None, coalesce=False):
+        """
+            Queue a frame and return once it was written, coalesced frames are only written at once if the connection
+        is free and writable.
+        :param socket: connected socket the frame is written to
+        :param header: COMMAND_HEADER or DATA_HEADER
+        :param message_id: command/data id as integer
+        :param payload: frame's content as bytes
+        :param request_id: id correlating a reply with its command as integer
+        :param priority: frame's priority class, None for the class of its command or data type
+        :param coalesce: replace the payload of the same command still waiting in the queue, last value wins;
+                         only for frames not waiting for a reply
+        :return: True if frame was queued, False if it replaced a queued value;
+                 raises the exception occurred while writing the frame
+        """
+        if priority is None:
+            priority = get_priority(header, message_id)
+
+        key = (socket, header & ~COMPRESSED_FLAG, message_id) if coalesce and request_id == NO_REQUEST_ID else None
+        with self.queue_lock:
+            frame = self.coalescing.get(key) if key is not None else None
+            queued = frame is None
+            if not queued:
+                # older value not written yet: send the latest one in its place
+                frame.header = header
+                frame.payload = payload
+                self.frames_coalesced[priority] += 1
+                if self.coalesced is not None:
+                    self.coalesced.value += 1
+            else:
+                frame = OutboundFrame(priority, socket, header, message_id, payload, request_id, key is not None)
+                heapq.heappush(self.queue, (priority, next(self.sequence), frame))
+                self.depths[priority] += 1
+                if self.depths[priority] > self.max_depths[priority]:
+                    self.max_depths[priority] = self.depths[priority]
+                if key is not None:
+                    self.coalescing[key] = frame
+
+        if not queued:
+            return False
+
+        if frame.coalesce:
+            # waiting behind a backlogged connection would only send stale values, newer ones replace the queued one
+            if not self.write_lock.acquire(blocking=False):
+                self.__start_draining__()
+                return True
+            try:
+                if not is_writable(socket):
+                    self.__start_draining__()
+                    return True
+                self.__write_queued__(frame)
+            finally:
+                self.write_lock.release()
+
+        while not frame.sent:
+            with self.write_lock:
+                # written by the previous holder while waiting for the lock
+                if frame.sent:
+                    break
+                self.__write_queued__(frame)
+
+        if frame.error is not None:
+            raise frame.error
+        return True
+
+    def __start_draining__(self):
+        """
+            Start the drain thread writing queued frames, unless it is running.
+        :return: None
+        """
+        with self.queue_lock:
+            if self.draining:
+                return
+            self.draining = True
+        threading.Thread(target=self.__drain__, daemon=True).start()
+
+    def __drain__(self):
+        """
+            Write queued frames until the queue is empty, run by the drain thread.
+        :return: None
+        """
+        while True:
+            with self.write_lock:
+                with self.queue_lock:
+                    if not self.queue:
+                        self.draining = False
+                        return
+                self.__write_next__()
+
+    def __write_queued__(self, own_frame):
+        """
+            Write queued frames by priority until caller's own frame is written; called holding write_lock.
+        :param own_frame: OutboundFrame queued by the caller
+        :return: None
+        """
+        while not own_frame.sent:
+            self.__write_next__(own_frame)
+
+    def __write_next__(self, own_frame=None):
+        """
+            Write the queued frame of highest priority; called holding write_lock.
+        :param own_frame: OutboundFrame queued by the caller, None for the drain thread
+        :return: None
+        """
+        with self.queue_lock:
+            _, _, frame = heapq.heappop(self.queue)
+            self.depths[frame.priority] -= 1
+            key = (frame.socket, frame.header & ~COMPRESSED_FLAG, frame.message_id)
+            if self.coalescing.get(key) is frame:
+                del self.coalescing[key]
+
+        waited = time.perf_counter() - frame.queued_at
+        try:
+            send_frame(frame.socket, frame.header, frame.message_id, frame.payload, frame.request_id)
+        except Exception as err:
+            frame.error = err
+            if frame.coalesce and frame is not own_frame:
+                # its sender did not wait for the frame
+                logger.warning("Coalesced frame %s not sent! %s", frame.message_id, err)
+        frame.sent = True
+
+        priority = frame.priority
+        self.frames_sent[priority] += 1
+        self.total_wait[priority] += waited
+        if waited > self.max_wait[priority]:
+            self.max_wait[priority] = waited
+        if self.wait_time is not None:
+            self.wait_time.observe(waited)
+
+    def get_depth(self):
+        """
+            Get the number of frames waiting in the queue.
+        :return: integer
+        """
+        return len(self.queue)
+
+    def get_statistics(self):
+        """
+            Get queue depths and wait times of every priority class, times in seconds.
+        :return: dictionary class name: dictionary
+        """
+        statistics = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            frames_sent = self.frames_sent[priority]
+            statistics[name] = {
+                "Depth": self.depths[priority],
+                "MaxDepth": self.max_depths[priority],
+                "FramesSent": frames_sent,
+                "AverageWait": self.total_wait[priority] / frames_sent if frames_sent else 0.0,
+                "MaxWait": self.max_wait[priority],
+                "FramesCoalesced": self.frames_coalesced[priority],
+            }
+        return statistics
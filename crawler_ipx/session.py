@@ -0,0 +1,169 @@
+import logging
+import os
+import threading
+import time
+
+from .generic_utils import SESSION_TIMEOUT as GU_ST
+
+from .request_utils import PendingRequests
+
+# ===================================================== CONSTANTS =====================================================
+# Size of the random token given to an authenticated client to resume its session, sent as hex string
+SESSION_TOKEN_SIZE = 16
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.session')
+
+
+def create_session_token():
+    """
+        Create a random token resuming a session.
+    :return: token - hex string
+    """
+    return os.urandom(SESSION_TOKEN_SIZE).hex()
+
+
+class Session:
+    """
+        Class used by host to keep the state of an authenticated client across its connections.
+    Commands waiting for client's reply belong to the session: they survive a lost connection and are sent again when
+    the client resumes the session.
+    """
+    def __init__(self, username, name, pending_requests=None, commands_window=None):
+        """
+            Constructor
+        :param username: authenticated client's username as string
+        :param name: client's name as string
+                     example: RaspberryPIScorpionIPX_1
+        :param pending_requests: PendingRequests of the commands waiting for client's reply, None for a new one
+        :param commands_window: semaphore limiting the commands waiting for client's reply, kept across connections
+        """
+        self.token = create_session_token()
+        self.username = username
+        self.name = name
+        self.pending_requests = PendingRequests() if pending_requests is None else pending_requests
+        self.commands_window = commands_window
+
+        # time.monotonic() when session's connection was lost, None while connected
+        self.lost_at = None
+
+        # session statistics
+        self.created_at = time.time()
+        self.resumptions = 0
+
+    def __str__(self):
+        """
+            Informal” or nicely printable string representation of the object.
+        :return: name
+        """
+        return str(self.name)
+
+
+class SessionStore:
+    """
+        Class used by host to keep sessions by token, so a reconnecting client skips credentials verification.
+    Tokens are single use: resuming a session gives it a new token. A session whose connection was lost is dropped,
+    failing its pending commands, after session_timeout seconds.
+    """
+    def __init__(self, session_timeout=GU_ST):
+        """
+            Constructor
+        :param session_timeout: seconds a session may stay without connection before it is dropped
+                                example: 60.0
+        """
+        self.session_timeout = session_timeout
+        self.lock = threading.Lock()
+
+        # token: Session
+        self.sessions = {}
+
+    def create(self, username, name, pending_requests=None, commands_window=None):
+        """
+            Start a session for an authenticated client.
+        :param username: client's username as string
+        :param name: client's name as string
+        :param pending_requests: PendingRequests of the commands waiting for client's reply, None for a new one
+        :param commands_window: semaphore limiting the commands waiting for client's reply
+        :return: Session
+        """
+        session = Session(username, name, pending_requests, commands_window)
+        with self.lock:
+            self.sessions[session.token] = session
+        return session
+
+    def resume(self, token):
+        """
+            Resume the session matching token, giving it a new token.
+        :param token: token received from client as string
+        :return: Session, None if token is unknown or its session expired
+        """
+        with self.lock:
+            session = self.sessions.pop(str(token), None)
+            if session is None:
+                return None
+            session.token = create_session_token()
+            session.lost_at = None
+            session.resumptions += 1
+            self.sessions[session.token] = session
+        return session
+
+    def lost(self, session, now=None):
+        """
+            Record that session's connection was lost, session may be resumed until it expires.
+        :param session: Session
+        :param now: time.monotonic() value, current time if None
+        :return: None
+        """
+        session.lost_at = time.monotonic() if now is None else now
+
+    def discard(self, session, error=None):
+        """
+            Drop a session, failing its pending commands.
+        :param session: Session
+        :param error: exception set on pending commands, None for a ConnectionError
+        :return: None
+        """
+        with self.lock:
+            if self.sessions.get(session.token) is session:
+                del self.sessions[session.token]
+        if error is None:
+            error = ConnectionError("Session of client {} closed!".format(session.name))
+        session.pending_requests.fail_all(error)
+
+    def expire(self, now=None):
+        """
+            Fail timed out commands of sessions without connection and drop sessions lost for too long.
+        :param now: time.monotonic() value, current time if None
+        :return: number of dropped sessions
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self.lock:
+            lost_sessions = [session for session in self.sessions.values() if session.lost_at is not None]
+
+        expired = 0
+        for session in lost_sessions:
+            session.pending_requests.expire(now)
+            if now - session.lost_at > self.session_timeout:
+                logger.info("Session of client %s expired!", session.name)
+                self.discard(session, ConnectionError("Session of client {} expired!".format(session.name)))
+                expired += 1
+        return expired
+
+    def clear(self):
+        """
+            Drop every session, failing their pending commands.
+        :return: None
+        """
+        with self.lock:
+            sessions = list(self.sessions.values())
+        for session in sessions:
+            self.discard(session)
+
+    def __len__(self):
+        """
+            Number of sessions.
+        :return: integer
+        """
+        return len(self.sessions)
@@ -0,0 +1,251 @@
+import logging
+import struct
+import threading
+import time
+
+from .generic_utils import TELEMETRY_BATCH_SIZE as GU_TBS
+from .generic_utils import TELEMETRY_FLUSH_INTERVAL as GU_TFI
+
+# ===================================================== CONSTANTS =====================================================
+# Telemetry sample: capture wall clock timestamp (8 bytes, float), channel id (2 bytes), value (4 bytes, float)
+TELEMETRY_SAMPLE = struct.Struct('>dHf')
+
+# Default telemetry channels, any other channel id up to 65535 may be used
+SPEED_CHANNEL = 0
+BATTERY_CHANNEL = 1
+IMU_ACCELERATION_X_CHANNEL = 2
+IMU_ACCELERATION_Y_CHANNEL = 3
+IMU_ACCELERATION_Z_CHANNEL = 4
+IMU_ROTATION_X_CHANNEL = 5
+IMU_ROTATION_Y_CHANNEL = 6
+IMU_ROTATION_Z_CHANNEL = 7
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.telemetry')
+
+
+def unpack_telemetry(payload):
+    """
+        Unpack a telemetry batch in one call.
+    :param payload: telemetry data content as bytes-like object
+    :return: list of (timestamp, channel, value)
+    """
+    if len(payload) % TELEMETRY_SAMPLE.size:
+        error = "Corrupted telemetry batch: {} bytes!".format(len(payload))
+        error += "\nExpected multiple of {} bytes!".format(TELEMETRY_SAMPLE.size)
+        raise NameError(error)
+
+    return list(TELEMETRY_SAMPLE.iter_unpack(payload))
+
+
+class TelemetryBatcher:
+    """
+        Class used by client to buffer telemetry samples and send them to host in batches.
+    Samples are packed into a preallocated buffer as they are recorded; the batch is sent when batch_size samples are
+    buffered or when the oldest buffered sample waited flush_interval seconds, whichever comes first.
+    """
+    def __init__(self, send, batch_size=GU_TBS, flush_interval=GU_TFI):
+        """
+            Constructor
+        :param send: function called as send(payload) with each batch as bytes,
+                     returns True if ok, error occurred as string if not ok
+        :param batch_size: maximum number of samples sent in one batch
+                           example: 512
+        :param flush_interval: seconds a sample may wait before its batch is sent
+                               example: 0.1
+        """
+        if type(batch_size) is not int or batch_size < 1:
+            error = "Invalid batch size: {}!".format(batch_size) + "\nExpected positive integer type!"
+            raise NameError(error)
+
+        self.send = send
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.buffer = bytearray(batch_size * TELEMETRY_SAMPLE.size)
+        self.view = memoryview(self.buffer)
+        self.count = 0
+        self.first_sample_at = None
+        self.lock = threading.Lock()
+
+        # thread sending batches on time trigger, see start
+        self.flushing = False
+        self.wake_up = threading.Event()
+        self.thread = None
+
+        # telemetry statistics
+        self.samples_recorded = 0
+        self.samples_dropped = 0
+        self.batches_sent = 0
+        self.bytes_sent = 0
+
+    def start(self):
+        """
+            Start the thread sending batches whose oldest sample waited flush_interval seconds.
+        :return: None
+        """
+        if self.flushing:
+            return
+        self.flushing = True
+        self.wake_up.clear()
+        self.thread = threading.Thread(target=self.__flush_periodically__, name='TelemetryFlusher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+            Stop flushing thread and send buffered samples.
+        :return: None
+        """
+        if self.flushing:
+            self.flushing = False
+            self.wake_up.set()
+            if self.thread is not threading.current_thread():
+                self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def record(self, channel, value, timestamp=None):
+        """
+            Buffer a sample, sending the batch if it is full.
+        :param channel: channel id as integer
+                        example: SPEED_CHANNEL
+        :param value: sample's value as number
+        :param timestamp: capture time.time() value, now if None
+        :return: None
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self.lock:
+            TELEMETRY_SAMPLE.pack_into(self.buffer, self.count * TELEMETRY_SAMPLE.size, timestamp, channel, value)
+            if not self.count:
+                self.first_sample_at = time.monotonic()
+            self.count += 1
+            self.samples_recorded += 1
+            if self.count >= self.batch_size:
+                self.__send_batch__()
+
+    def flush(self):
+        """
+            Send buffered samples now.
+        :return: None
+        """
+        with self.lock:
+            if self.count:
+                self.__send_batch__()
+
+    def __send_batch__(self):
+        """
+            Send buffered samples and empty the buffer, lock must be held.
+        :return: None
+        """
+        payload = bytes(self.view[:self.count * TELEMETRY_SAMPLE.size])
+        result = self.send(payload)
+        if result is True:
+            self.batches_sent += 1
+            self.bytes_sent += len(payload)
+        else:
+            self.samples_dropped += self.count
+        self.count = 0
+        self.first_sample_at = None
+
+    def __flush_periodically__(self):
+        """
+            Flushing thread's loop: send the batch once its oldest sample waited flush_interval seconds.
+        :return: None
+        """
+        while self.flushing:
+            first_sample_at = self.first_sample_at
+            if first_sample_at is None:
+                delay = self.flush_interval
+            else:
+                delay = first_sample_at + self.flush_interval - time.monotonic()
+
+            if delay > 0:
+                self.wake_up.wait(delay)
+                continue
+
+            with self.lock:
+                if self.first_sample_at is not None and \
+                        time.monotonic() - self.first_sample_at >= self.flush_interval:
+                    self.__send_batch__()
+
+    def get_statistics(self):
+        """
+            Get telemetry statistics.
+        :return: dictionary
+        """
+        return {
+            "SamplesRecorded": self.samples_recorded,
+            "SamplesDropped": self.samples_dropped,
+            "BatchesSent": self.batches_sent,
+            "BytesSent": self.bytes_sent,
+        }
+
+
+class TelemetryReceiver:
+    """
+        Class used by host to unpack telemetry batches and keep the latest value of every channel.
+    """
+    def __init__(self, on_batch=None):
+        """
+            Constructor
+        :param on_batch: optional callback called as on_batch(samples) with the list of (timestamp, channel, value)
+                         of each received batch
+        """
+        self.on_batch = on_batch
+
+        # channel: (timestamp, value)
+        self.latest = {}
+
+        # telemetry statistics
+        self.samples_received = 0
+        self.batches_received = 0
+        self.bytes_received = 0
+        self.corrupted_batches = 0
+
+    def handle_batch(self, payload):
+        """
+            Unpack a received batch and update the latest values.
+        :param payload: telemetry data content as bytes-like object
+        :return: list of (timestamp, channel, value), empty if batch is corrupted
+        """
+        try:
+            samples = unpack_telemetry(payload)
+        except NameError as err:
+            logger.warning(str(err))
+            self.corrupted_batches += 1
+            return []
+
+        latest = self.latest
+        for timestamp, channel, value in samples:
+            latest[channel] = (timestamp, value)
+
+        self.samples_received += len(samples)
+        self.batches_received += 1
+        self.bytes_received += len(payload)
+
+        if self.on_batch is not None:
+            self.on_batch(samples)
+        return samples
+
+    def get_latest(self, channel):
+        """
+            Get channel's latest value.
+        :param channel: channel id as integer
+        :return: (timestamp, value), None if channel never received a sample
+        """
+        return self.latest.get(channel)
+
+    def get_statistics(self):
+        """
+            Get telemetry statistics.
+        :return: dictionary
+        """
+        return {
+            "SamplesReceived": self.samples_received,
+            "BatchesReceived": self.batches_received,
+            "BytesReceived": self.bytes_received,
+            "CorruptedBatches": self.corrupted_batches,
+            "Channels": len(self.latest),
+        }
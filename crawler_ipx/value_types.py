@@ -0,0 +1,174 @@
+import logging
+import struct
+
+logger = logging.getLogger('ipx_logger.value_types')
+
+
+class ValueType:
+    """
+        Class used to encode a command's or data's value in binary with a precompiled struct.Struct, instead of text.
+    A value type with a single field encodes a single value, one with several fields encodes a tuple. No value is sent
+    as an empty payload and decoded as None.
+    """
+    __slots__ = ('name', 'codec', 'single', 'parse')
+
+    def __init__(self, name, layout, parse=None):
+        """
+            Constructor
+        :param name: value type's name as string
+                     example: float32
+        :param layout: struct format of the value, big endian
+                       example: '>f'
+        :param parse: function converting a value typed by user as string, None to accept values of the right type only
+                      example: float
+        """
+        if type(name) is not str:
+            error = "Invalid value type name: {}".format(name) + "\nExpected str type!"
+            raise NameError(error)
+
+        try:
+            codec = struct.Struct(layout)
+        except (struct.error, TypeError) as err:
+            error = "Invalid value type layout: {}! {}".format(layout, err)
+            raise NameError(error)
+
+        self.name = name
+        self.codec = codec
+        self.single = len(codec.unpack(bytes(codec.size))) == 1
+        self.parse = parse
+
+    def encode(self, value):
+        """
+            Pack a value.
+        :param value: value, tuple of values if value type has several fields, None for no value
+        :return: payload - bytes, raises ValueError if value does not fit value type
+        """
+        if value is None:
+            return b''
+        try:
+            if type(value) is str and self.parse is not None:
+                value = self.parse(value)
+            if self.single:
+                return self.codec.pack(value)
+            return self.codec.pack(*value)
+        except (struct.error, TypeError, ValueError) as err:
+            error = "Invalid {} value: {}! {}".format(self.name, value, err)
+            raise ValueError(error)
+
+    def decode(self, payload):
+        """
+            Unpack a value packed by encode.
+        :param payload: frame's content as bytes-like object
+        :return: value, tuple of values if value type has several fields, None for no value
+        """
+        if not len(payload):
+            return None
+        if len(payload) != self.codec.size:
+            error = "Invalid {} value: {} bytes!".format(self.name, len(payload))
+            error += "\nExpected {} bytes!".format(self.codec.size)
+            raise NameError(error)
+        if self.single:
+            return self.codec.unpack(payload)[0]
+        return self.codec.unpack(payload)
+
+    def __str__(self):
+        """
+            Informal” or nicely printable string representation of the object.
+        :return: name
+        """
+        return self.name
+
+
+class BytesType:
+    """
+        Class used to send a command's or data's value as raw bytes, without text encoding.
+    """
+    __slots__ = ('name', )
+
+    def __init__(self, name='bytes'):
+        """
+            Constructor
+        :param name: value type's name as string
+        """
+        self.name = name
+
+    def encode(self, value):
+        """
+            Get a value's bytes.
+        :param value: bytes-like object, hex string when typed by user, None for no value
+        :return: payload - bytes, raises ValueError if value is not bytes-like
+        """
+        if value is None:
+            return b''
+        try:
+            if type(value) is str:
+                return bytes.fromhex(value)
+            return bytes(value)
+        except (TypeError, ValueError) as err:
+            error = "Invalid {} value: {}! {}".format(self.name, value, err)
+            raise ValueError(error)
+
+    def decode(self, payload):
+        """
+            Get a received value.
+        :param payload: frame's content as bytes-like object
+        :return: value - bytes, None for no value
+        """
+        if not len(payload):
+            return None
+        return bytes(payload)
+
+    def __str__(self):
+        """
+            Informal” or nicely printable string representation of the object.
+        :return: name
+        """
+        return self.name
+
+
+def parse_bool(text):
+    """
+        Convert a boolean typed by user.
+    :param text: value as string
+                 example: 'true'
+    :return: bool
+    """
+    return text.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def parse_fields(parse):
+    """
+        Get a function converting comma separated values typed by user, for value types with several fields.
+    :param parse: function converting each value
+    :return: function returning a tuple
+    """
+    def parse_all(text):
+        return tuple(parse(field) for field in text.split(','))
+    return parse_all
+
+
+def struct_type(name, layout, parse=float):
+    """
+        Create a value type with several fields.
+    :param name: value type's name as string
+                 example: imu_sample
+    :param layout: struct format of the fields, big endian
+                   example: '>fff'
+    :param parse: function converting each field typed by user
+    :return: ValueType
+    """
+    return ValueType(name, layout, parse_fields(parse))
+
+
+# ===================================================== CONSTANTS =====================================================
+# Value types commands and data may declare, values of commands and data without value type are sent as text
+INT8_VALUE = ValueType('int8', '>b', int)
+UINT8_VALUE = ValueType('uint8', '>B', int)
+INT16_VALUE = ValueType('int16', '>h', int)
+UINT16_VALUE = ValueType('uint16', '>H', int)
+INT32_VALUE = ValueType('int32', '>i', int)
+FLOAT32_VALUE = ValueType('float32', '>f', float)
+FLOAT64_VALUE = ValueType('float64', '>d', float)
+BOOL_VALUE = ValueType('bool', '>?', parse_bool)
+BYTES_VALUE = BytesType()
+# ===================================================== CONSTANTS =====================================================
@@ -0,0 +1,569 @@
+import io
+import logging
+import socket as py_socket
+import struct
+import threading
+import time
+
+from collections import deque
+
+from .generic_utils import VIDEO_FRAMES_PER_SECOND as GU_VFPS
+from .generic_utils import VIDEO_QUEUE_SIZE as GU_VQS
+from .generic_utils import VIDEO_BUFFER_SIZE as GU_VBS
+from .generic_utils import MAX_FRAME_SIZE
+from .generic_utils import AUTHENTICATION_TIMEOUT as GU_AT
+from .generic_utils import DATA_HEADER
+from .generic_utils import credentials_are_valid, decode_credentials
+
+from .frame_utils import FRAME_HEADER, FRAME_PREFIX
+from .frame_utils import encode_frame, pack_frame_prefix_into, recv_exactly_into, send_buffers
+
+from .buffer_pool import BufferPool
+
+from .generic_data_constants import CREDENTIALS_DATA_ID, VIDEO_FRAME_DATA_ID
+
+# ===================================================== CONSTANTS =====================================================
+# Video frame payload starts with: frame number (4 bytes), capture wall clock timestamp (8 bytes, float)
+VIDEO_FRAME_HEADER = struct.Struct('>Id')
+
+# Seconds of received frames used to compute the achieved frame rate
+FPS_WINDOW = 2.0
+
+# Synthetic frames start with their frame number
+SYNTHETIC_FRAME_NUMBER = struct.Struct('>I')
+# ===================================================== CONSTANTS =====================================================
+
+logger = logging.getLogger('ipx_logger.video_streaming')
+
+
+class FrameSource:
+    """
+        Base class of video frame sources. Sources return encoded frames (for instance JPEG) as bytes.
+    Sources able to write frames straight into a preallocated buffer should override read_frame_into as well.
+    """
+    def read_frame(self):
+        """
+            Capture a frame.
+        :return: frame - bytes
+        """
+        raise NotImplementedError
+
+    def read_frame_into(self, frame_buffer):
+        """
+            Capture a frame into a pooled buffer.
+        :param frame_buffer: FrameBuffer from buffer_pool.py, grown if the frame does not fit
+        :return: None, frame_buffer.length is set to frame's size
+        """
+        frame = self.read_frame()
+        frame_buffer.ensure_size(len(frame))
+        frame_buffer.view[:len(frame)] = frame
+        frame_buffer.length = len(frame)
+
+    def close(self):
+        """
+            Release source's resources.
+        :return: None
+        """
+        pass
+
+
+class SyntheticFrameSource(FrameSource):
+    """
+        Frame source generating fake frames, used for tests and when no camera is available.
+    """
+    def __init__(self, frame_size=32 * 1024):
+        """
+            Constructor
+        :param frame_size: size of each generated frame in bytes
+                           example: 32768
+        """
+        self.frame_size = max(frame_size, SYNTHETIC_FRAME_NUMBER.size)
+        self.frame_number = 0
+        self.filler = bytes(range(256)) * (self.frame_size // 256 + 1)
+
+    def read_frame(self):
+        """
+            Generate a frame: frame number followed by filler bytes.
+        :return: frame - bytes
+        """
+        self.frame_number += 1
+        number = SYNTHETIC_FRAME_NUMBER.pack(self.frame_number & 0xFFFFFFFF)
+        return number + self.filler[:self.frame_size - len(number)]
+
+    def read_frame_into(self, frame_buffer):
+        """
+            Generate a frame straight into a pooled buffer.
+        :param frame_buffer: FrameBuffer from buffer_pool.py
+        :return: None
+        """
+        self.frame_number += 1
+        frame_buffer.ensure_size(self.frame_size)
+        SYNTHETIC_FRAME_NUMBER.pack_into(frame_buffer.data, 0, self.frame_number & 0xFFFFFFFF)
+        frame_buffer.view[SYNTHETIC_FRAME_NUMBER.size:self.frame_size] = \
+            self.filler[:self.frame_size - SYNTHETIC_FRAME_NUMBER.size]
+        frame_buffer.length = self.frame_size
+
+
+class PiCameraFrameSource(FrameSource):
+    """
+        Frame source capturing JPEG frames from RaspberryPi's camera, requires picamera package.
+    """
+    def __init__(self, resolution=(640, 480), quality=75):
+        """
+            Constructor
+        :param resolution: (width, height) of captured frames
+        :param quality: JPEG quality, 1 to 100
+        """
+        try:
+            import picamera
+        except ImportError as err:
+            error = "Unable to use RaspberryPi's camera: {}!".format(err) + "\nInstall picamera package!"
+            raise NameError(error)
+
+        self.camera = picamera.PiCamera(resolution=resolution)
+        self.stream = io.BytesIO()
+        self.frames = self.camera.capture_continuous(self.stream, format='jpeg', quality=quality,
+                                                     use_video_port=True)
+
+    def read_frame(self):
+        """
+            Capture a JPEG frame.
+        :return: frame - bytes
+        """
+        self.stream.seek(0)
+        self.stream.truncate()
+        next(self.frames)
+        return self.stream.getvalue()
+
+    def read_frame_into(self, frame_buffer):
+        """
+            Capture a JPEG frame into a pooled buffer, copying straight from the capture stream.
+        :param frame_buffer: FrameBuffer from buffer_pool.py
+        :return: None
+        """
+        self.stream.seek(0)
+        self.stream.truncate()
+        next(self.frames)
+        length = self.stream.tell()
+        frame_buffer.ensure_size(length)
+        with self.stream.getbuffer() as frame:
+            frame_buffer.view[:length] = frame[:length]
+        frame_buffer.length = length
+
+    def close(self):
+        """
+            Release the camera.
+        :return: None
+        """
+        self.camera.close()
+
+
+def create_default_frame_source():
+    """
+        Get RaspberryPi's camera if available, synthetic frames otherwise.
+    :return: FrameSource
+    """
+    try:
+        return PiCameraFrameSource()
+    except Exception as err:
+        logger.warning("Camera not available, streaming synthetic frames! %s", err)
+        return SyntheticFrameSource()
+
+
+class VideoStreamer:
+    """
+        Class used by client to stream frames to host over a dedicated connection.
+    A capture thread reads frames at a fixed rate and a sender thread sends them. Only queue_size frames may wait to be
+    sent: when the link is slow the oldest frame is dropped, so capture never blocks and frames never pile up.
+    Frames are captured into pooled buffers and sent with their header through a scatter-gather send, so steady state
+    streaming does not allocate a buffer per frame.
+    """
+    def __init__(self, source, host, port, username, password, frames_per_second=GU_VFPS, queue_size=GU_VQS,
+                 buffer_size=GU_VBS, owns_source=False):
+        """
+            Constructor
+        :param source: FrameSource
+        :param host: host's name or ip
+        :param port: host's video port
+        :param username: client's username required for authentication
+        :param password: client's password required for authentication
+        :param frames_per_second: capture rate
+        :param queue_size: maximum number of frames waiting to be sent
+        :param buffer_size: size of pooled frame buffers in bytes
+        :param owns_source: close source when streaming stops, False for a source reused by the caller
+        """
+        self.source = source
+        self.owns_source = owns_source
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.frame_interval = 1.0 / frames_per_second
+
+        # queued frames + the one being captured + the one being sent
+        self.pool = BufferPool(buffer_size, queue_size + 2)
+        self.queue_size = queue_size
+
+        # frame prefix and video header, rewritten for every frame
+        self.header = bytearray(FRAME_PREFIX.size + VIDEO_FRAME_HEADER.size)
+
+        self.socket = None
+        self.queue = deque()
+        self.queue_condition = threading.Condition()
+        self.streaming = False
+        self.threads = []
+
+        # streaming statistics
+        self.frames_captured = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def start(self):
+        """
+            Connect to host's video port and start capture and sender threads.
+        :return: None
+        """
+        if self.streaming:
+            return
+
+        self.socket = py_socket.create_connection((self.host, self.port))
+        self.socket.setsockopt(py_socket.IPPROTO_TCP, py_socket.TCP_NODELAY, 1)
+        credentials = 'u:' + str(self.username) + '\np:' + str(self.password)
+        self.socket.sendall(encode_frame(DATA_HEADER, CREDENTIALS_DATA_ID, bytes(credentials, 'utf-8')))
+
+        self.streaming = True
+        self.threads = [
+            threading.Thread(target=self.__capture__, name='VideoCapture', daemon=True),
+            threading.Thread(target=self.__send__, name='VideoSender', daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        logger.info("Video streaming started to %s:%s", self.host, self.port)
+
+    def stop(self):
+        """
+            Stop streaming and close video connection, also after the connection was lost.
+        :return: None
+        """
+        if self.socket is None:
+            return
+
+        self.streaming = False
+        with self.queue_condition:
+            self.queue_condition.notify_all()
+        try:
+            self.socket.shutdown(py_socket.SHUT_RDWR)
+        except OSError:
+            pass
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self.socket.close()
+        self.socket = None
+        if self.owns_source:
+            self.source.close()
+        logger.info("Video streaming stopped. %s", self.get_statistics())
+
+    def __capture__(self):
+        """
+            Capture thread's loop: read frames at frame_interval pace.
+        :return: None
+        """
+        next_capture = time.monotonic()
+        while self.streaming:
+            frame_buffer = self.pool.acquire()
+            self.source.read_frame_into(frame_buffer)
+            frame_buffer.captured_at = time.time()
+            frame_buffer.frame_number = self.frames_captured & 0xFFFFFFFF
+
+            with self.queue_condition:
+                if len(self.queue) >= self.queue_size:
+                    self.pool.release(self.queue.popleft())
+                    self.frames_dropped += 1
+                self.queue.append(frame_buffer)
+                self.frames_captured += 1
+                self.queue_condition.notify()
+
+            next_capture += self.frame_interval
+            delay = next_capture - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.frame_interval:
+                # capture is late: restart pacing instead of bursting to catch up
+                next_capture = time.monotonic()
+
+    def __send__(self):
+        """
+            Sender thread's loop: send queued frames to host.
+        :return: None
+        """
+        header = self.header
+        header_view = memoryview(header)
+        while self.streaming:
+            with self.queue_condition:
+                while self.streaming and not self.queue:
+                    self.queue_condition.wait()
+                if not self.streaming:
+                    return
+                frame_buffer = self.queue.popleft()
+
+            pack_frame_prefix_into(header, 0, DATA_HEADER, VIDEO_FRAME_DATA_ID,
+                                   VIDEO_FRAME_HEADER.size + frame_buffer.length)
+            VIDEO_FRAME_HEADER.pack_into(header, FRAME_PREFIX.size, frame_buffer.frame_number, frame_buffer.captured_at)
+            try:
+                send_buffers(self.socket, [header_view, frame_buffer.get_frame()])
+            except OSError as err:
+                logger.warning("Video connection lost: %s", err)
+                self.streaming = False
+                with self.queue_condition:
+                    self.queue_condition.notify_all()
+                self.socket.close()
+                return
+            finally:
+                self.pool.release(frame_buffer)
+            self.frames_sent += 1
+
+    def get_statistics(self):
+        """
+            Get streaming statistics.
+        :return: dictionary
+        """
+        return {
+            "FramesCaptured": self.frames_captured,
+            "FramesSent": self.frames_sent,
+            "FramesDropped": self.frames_dropped,
+            "BufferAllocations": self.pool.allocations,
+        }
+
+
+class VideoReceiver:
+    """
+        Class used by host to receive frames streamed by a client and measure frame rate and latency.
+    Frames are received straight into pooled buffers. Latency is computed from client's capture timestamp, so it is only
+    accurate with synchronized clocks (NTP).
+    """
+    def __init__(self, name='', port=0, on_frame=None, encoding='utf-8', buffer_size=GU_VBS):
+        """
+            Constructor
+        :param name: interface to listen on, '' for all interfaces
+        :param port: video port, 0 to pick a free one
+        :param on_frame: optional callback called as on_frame(frame_number, frame) for each received frame,
+                         frame is a memoryview valid until the callback returns
+        :param encoding: connection encoding
+        :param buffer_size: size of pooled frame buffers in bytes
+        """
+        self.socket = py_socket.socket(py_socket.AF_INET, py_socket.SOCK_STREAM)
+        self.socket.setsockopt(py_socket.SOL_SOCKET, py_socket.SO_REUSEADDR, 1)
+        self.socket.bind((name, port))
+        self.socket.listen(1)
+        self.port = self.socket.getsockname()[1]
+
+        self.on_frame = on_frame
+        self.encoding = encoding
+        self.receiving = False
+        self.thread = None
+        self.connection = None
+
+        # frame being received + last received frame + spare one
+        self.pool = BufferPool(buffer_size, 3)
+        self.prefix = bytearray(FRAME_PREFIX.size + VIDEO_FRAME_HEADER.size)
+
+        # last received frame, see get_last_frame
+        self.last_frame_buffer = None
+        self.last_frame_number = None
+        self.last_frame_lock = threading.Lock()
+
+        # receiving statistics
+        self.frames_received = 0
+        self.frames_lost = 0
+        self.bytes_received = 0
+        self.last_latency = None
+        self.average_latency = None
+        self.max_latency = None
+        self.arrivals = deque()
+
+    def start(self):
+        """
+            Start waiting for the client's video connection on a background thread.
+        :return: None
+        """
+        if self.receiving:
+            return
+        self.receiving = True
+        self.thread = threading.Thread(target=self.__receive__, name='VideoReceiver', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+            Stop receiving and close sockets.
+        :return: None
+        """
+        self.receiving = False
+        for sock in (self.connection, self.socket):
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(py_socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def __read_prefix__(self, connection):
+        """
+            Receive next frame's prefix.
+        :param connection: client's video socket
+        :return: (header, message id, payload length)
+        """
+        view = memoryview(self.prefix)
+        recv_exactly_into(connection, view[:FRAME_PREFIX.size])
+        length, header, message_id, _ = FRAME_PREFIX.unpack_from(self.prefix)
+        if length < FRAME_HEADER.size or length > MAX_FRAME_SIZE:
+            error = "Corrupted stream: invalid frame length {}!".format(length)
+            raise ConnectionError(error)
+        return header, message_id, length - FRAME_HEADER.size
+
+    def __authenticate__(self, connection):
+        """
+            Verify credentials sent by client as first message of the video connection.
+        :param connection: client's video socket
+        :return: True if valid, False otherwise
+        """
+        connection.settimeout(GU_AT)
+        header, message_id, payload_length = self.__read_prefix__(connection)
+        if header != DATA_HEADER or message_id != CREDENTIALS_DATA_ID or payload_length > 1024:
+            return False
+        credentials = bytearray(payload_length)
+        recv_exactly_into(connection, memoryview(credentials))
+        connection.settimeout(None)
+
+        username, password = decode_credentials(str(credentials, self.encoding))
+        return credentials_are_valid(username, password)
+
+    def __receive_frames__(self, connection):
+        """
+            Read frames from client's video connection until it is closed.
+        :param connection: client's video socket
+        :return: None
+        """
+        prefix_view = memoryview(self.prefix)
+        while self.receiving:
+            header, message_id, payload_length = self.__read_prefix__(connection)
+
+            frame_length = payload_length - VIDEO_FRAME_HEADER.size
+            if header != DATA_HEADER or message_id != VIDEO_FRAME_DATA_ID or frame_length < 0:
+                # not a video frame: skip its payload
+                frame_buffer = self.pool.acquire(payload_length)
+                recv_exactly_into(connection, frame_buffer.view[:payload_length])
+                self.pool.release(frame_buffer)
+                continue
+
+            recv_exactly_into(connection, prefix_view[FRAME_PREFIX.size:])
+            frame_buffer = self.pool.acquire(frame_length)
+            recv_exactly_into(connection, frame_buffer.view[:frame_length])
+            frame_buffer.length = frame_length
+            frame_buffer.frame_number, frame_buffer.captured_at = \
+                VIDEO_FRAME_HEADER.unpack_from(self.prefix, FRAME_PREFIX.size)
+            self.handle_frame(frame_buffer)
+
+    def __receive__(self):
+        """
+            Receiver thread's loop: accept client's video connection and read its frames.
+        :return: None
+        """
+        while self.receiving:
+            connection = None
+            try:
+                connection, address = self.socket.accept()
+                self.connection = connection
+                if not self.__authenticate__(connection):
+                    logger.info("Unknown video connection from %s refused!", address)
+                    continue
+
+                logger.info("Receiving video from %s", address)
+                self.__receive_frames__(connection)
+            except (OSError, ValueError) as err:
+                if self.receiving:
+                    logger.warning("Video connection lost: %s", err)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def handle_frame(self, frame_buffer):
+        """
+            Update statistics with a received frame, hand it to on_frame callback and keep it as last frame.
+        :param frame_buffer: FrameBuffer holding the received frame
+        :return: None
+        """
+        received_at = time.time()
+        frame_number = frame_buffer.frame_number
+
+        if self.last_frame_number is not None and frame_number > self.last_frame_number + 1:
+            self.frames_lost += frame_number - self.last_frame_number - 1
+        self.last_frame_number = frame_number
+        self.frames_received += 1
+        self.bytes_received += frame_buffer.length + VIDEO_FRAME_HEADER.size
+
+        latency = received_at - frame_buffer.captured_at
+        self.last_latency = latency
+        if self.average_latency is None:
+            self.average_latency = latency
+            self.max_latency = latency
+        else:
+            self.average_latency += (latency - self.average_latency) / 8.0
+            self.max_latency = max(self.max_latency, latency)
+
+        now = time.monotonic()
+        self.arrivals.append(now)
+        while now - self.arrivals[0] > FPS_WINDOW:
+            self.arrivals.popleft()
+
+        if self.on_frame is not None:
+            self.on_frame(frame_number, frame_buffer.get_frame())
+
+        # keep new frame, recycle the previous one
+        with self.last_frame_lock:
+            previous = self.last_frame_buffer
+            self.last_frame_buffer = frame_buffer
+        if previous is not None:
+            self.pool.release(previous)
+
+    def get_last_frame(self):
+        """
+            Get a copy of the last received frame.
+        :return: frame - bytes, None if no frame was received yet
+        """
+        with self.last_frame_lock:
+            if self.last_frame_buffer is None:
+                return None
+            return bytes(self.last_frame_buffer.get_frame())
+
+    def get_fps(self):
+        """
+            Get achieved frame rate over the last FPS_WINDOW seconds.
+        :return: frames per second - float
+        """
+        if len(self.arrivals) < 2:
+            return 0.0
+        elapsed = self.arrivals[-1] - self.arrivals[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self.arrivals) - 1) / elapsed
+
+    def get_statistics(self):
+        """
+            Get receiving statistics: frame rate, latency, lost frames, etc...
+        :return: dictionary
+        """
+        return {
+            "FPS": self.get_fps(),
+            "FramesReceived": self.frames_received,
+            "FramesLost": self.frames_lost,
+            "BytesReceived": self.bytes_received,
+            "LastLatency": self.last_latency,
+            "AverageLatency": self.average_latency,
+            "MaxLatency": self.max_latency,
+            "BufferAllocations": self.pool.allocations,
+        }
@@ -1,10 +1,12 @@
 import logging
+from crawler_ipx.log_utils import configure_logging, get_log_file_path
 from crawler_ipx.host import Host
 
+configure_logging(logging.DEBUG, log_file=get_log_file_path())
 logger = logging.getLogger('ipx_logger')
 
 logger.info("Running host from bat script\n\n")
 
-ipx_host = Host()
+ipx_host = Host(accept_reconnects=True)
 logger.info(ipx_host.get_info())
 ipx_host.run_user_input_mode()
@@ -0,0 +1,43 @@
+"""
+    Replay a recording made with Host.start_recording or Client.start_recording.
+Drive a host (recorded client's data are sent by a client connecting to it):
+    python replay_start.py recordings/rec_18Oct2026_084432.ipxrec host 192.168.100.15 --speed 2
+Drive a client (recorded host's commands are sent by a host waiting for it):
+    python replay_start.py recordings/rec_18Oct2026_084432.ipxrec client
+"""
+import argparse
+import logging
+import threading
+
+from crawler_ipx.log_utils import configure_logging
+from crawler_ipx.generic_utils import DEFAULT_PORT
+from crawler_ipx.recorder import FrameReplayer
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+configure_logging(logging.INFO)
+logger = logging.getLogger('ipx_logger')
+
+parser = argparse.ArgumentParser(description="Replay a recording through a live host or client.")
+parser.add_argument('recording', help="path of the recording file")
+parser.add_argument('target', choices=('host', 'client'), help="side driven by the replay")
+parser.add_argument('address', nargs='?', default='localhost', help="host's address when driving a host")
+parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="host's port")
+parser.add_argument('--speed', type=float, default=1.0, help="replay speed factor, 0 for as fast as possible")
+arguments = parser.parse_args()
+
+replayer = FrameReplayer(arguments.recording, arguments.speed or None)
+
+if arguments.target == 'host':
+    ipx_client = Client(arguments.address, arguments.port)
+    if ipx_client.connect_to_host():
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+        replayer.drive_host(ipx_client)
+    ipx_client.terminate()
+else:
+    ipx_host = Host(arguments.port)
+    ipx_host.connect_with_client()
+    replayer.drive_client(ipx_host)
+    ipx_host.terminate()
+
+logger.info("Replay statistics: %s", replayer.get_statistics())
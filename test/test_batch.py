@@ -0,0 +1,84 @@
+import logging
+import socket
+import threading
+import unittest
+
+from crawler_ipx.frame_utils import decode_batch, encode_batch
+from crawler_ipx.host_server import HostServer
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_batch_encoding(self):
+        logger.info("\n\nRunning TestBatch - test_batch_encoding\n")
+        entries = [(5, b'0.5'), (3, b''), (7, b'\xff' * 300)]
+        decoded = decode_batch(encode_batch(entries))
+        self.assertEqual([(entry_id, bytes(value)) for entry_id, value in decoded], entries)
+
+        with self.assertRaises(NameError):
+            decode_batch(encode_batch(entries)[:-1])
+
+    def test_batch_in_one_frame(self):
+        logger.info("\n\nRunning TestBatch - test_batch_in_one_frame\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name())
+        ipx_host.client, ipx_client.socket = socket.socketpair()
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+        try:
+            commands = ipx_host.commands
+            responses = ipx_host.send_commands([
+                (commands.set_speed, 0.5),
+                (commands.set_steering, -0.25),
+                (commands.ping, 'abc'),
+                (commands.heartbeat, None),
+            ], timeout=5)
+
+            self.assertEqual([response["Content"] for response in responses], ['True', 'True', 'abc', 'True'])
+            self.assertEqual((ipx_client.speed, ipx_client.steering), (0.5, -0.25))
+            self.assertEqual(ipx_host.metrics.messages_sent.value, 1)
+            self.assertEqual(ipx_host.metrics.messages_received.value, 1)
+            self.assertEqual(ipx_client.metrics.batched_commands.value, 4)
+
+            # commands failing on client do not stop the batch
+            responses = ipx_host.send_commands([(commands.set_speed, 'fast'), (commands.ping, 'abc')], timeout=5)
+            self.assertEqual([response["Content"] for response in responses], ['False', 'abc'])
+
+            future = ipx_host.submit_commands([(commands.set_speed, None)])
+            with self.assertRaises(ValueError):
+                future.result(timeout=5)
+        finally:
+            ipx_host.stop_receiver()
+            ipx_host.client.close()
+            ipx_client.socket.close()
+            ipx_host.terminate()
+
+    def test_batch_in_server_mode(self):
+        logger.info("\n\nRunning TestBatch - test_batch_in_server_mode\n")
+        server = HostServer(name='127.0.0.1', port=0)
+        server.start_in_thread()
+        ipx_client = Client('127.0.0.1', server.port)
+        try:
+            self.assertTrue(ipx_client.connect_to_host())
+            threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+            self.assertTrue(wait_for(lambda: len(server.clients) == 1))
+            client_name = server.get_client_names()[0]
+
+            async def submit_batch():
+                commands = [(server.commands.ping, 'a'), (server.commands.set_speed, 1.0)]
+                return await (await server.submit_commands(client_name, commands))
+
+            responses = server.call(submit_batch(), timeout=5)
+            self.assertEqual([response["Content"] for response in responses], ['a', 'True'])
+        finally:
+            ipx_client.terminate()
+            server.stop_thread()
+
+
+if __name__ == '__main__':
+    unittest.main()
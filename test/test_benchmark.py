@@ -0,0 +1,45 @@
+import logging
+import unittest
+
+from benchmark import bench_loopback
+from benchmark import bench_scaling
+from benchmark.run_all import find_regressions
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_loopback_benchmark(self):
+        logger.info("\n\nRunning TestBenchmark - test_loopback_benchmark\n")
+        results = bench_loopback.main(number_of_commands=50, payload_sizes=(0, 256), concurrency_levels=(1, 4))
+
+        self.assertEqual(len(results), 4)
+        for result in results:
+            self.assertEqual(result["commands"], 50)
+            self.assertEqual(result["errors"], 0)
+            self.assertLessEqual(result["latency_p50_ms"], result["latency_p99_ms"])
+            self.assertGreater(result["commands_per_second"], 0)
+
+        slower = [dict(result, commands_per_second=result["commands_per_second"] / 2) for result in results]
+        self.assertEqual(find_regressions({'bench_loopback': results}, {'bench_loopback': results}), [])
+        self.assertEqual(len(find_regressions({'bench_loopback': slower}, {'bench_loopback': results})), 4)
+
+    def test_scaling_benchmark(self):
+        logger.info("\n\nRunning TestBenchmark - test_scaling_benchmark\n")
+        results = bench_scaling.main(client_counts=(1, 3), duration=0.2, handler_delay=0.001, telemetry_rate=20.0,
+                                     latency_limit_ms=1000.0)
+
+        self.assertEqual([result["clients"] for result in results], [1, 3])
+        for result in results:
+            self.assertFalse(result["saturated"])
+            self.assertEqual(result["errors"], 0)
+            self.assertGreater(result["commands"], 0)
+            self.assertGreater(result["host_cpu_ms_per_client"], 0)
+
+        with self.assertRaises(NameError):
+            bench_scaling.CrawlerFleet('127.0.0.1', 0, mode='asyncio')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import logging
+import socket
+import unittest
+
+from crawler_ipx.generic_utils import DATA_HEADER
+from crawler_ipx.buffer_pool import BufferPool
+from crawler_ipx.frame_utils import FRAME_PREFIX, MessageReader
+from crawler_ipx.frame_utils import pack_frame_prefix_into, send_buffers
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestBufferPool(unittest.TestCase):
+
+    def test_buffers_are_recycled(self):
+        logger.info("\n\nRunning TestBufferPool - test_buffers_are_recycled\n")
+        pool = BufferPool(1024, 2)
+
+        for _ in range(10):
+            first = pool.acquire()
+            second = pool.acquire(512)
+            pool.release(first)
+            pool.release(second)
+
+        self.assertEqual(pool.allocations, 0)
+        self.assertEqual(pool.get_available(), 2)
+
+        # pool exhausted or buffer too small: a new buffer is allocated
+        buffers = [pool.acquire(), pool.acquire(), pool.acquire(4096)]
+        self.assertEqual(pool.allocations, 1)
+        self.assertGreaterEqual(len(buffers[2].data), 4096)
+
+    def test_scatter_gather_send(self):
+        logger.info("\n\nRunning TestBufferPool - test_scatter_gather_send\n")
+        pool = BufferPool(64, 1)
+        frame_buffer = pool.acquire()
+        frame_buffer.data[:5] = b'hello'
+        frame_buffer.length = 5
+
+        header = bytearray(FRAME_PREFIX.size)
+        pack_frame_prefix_into(header, 0, DATA_HEADER, 3, frame_buffer.length, 9)
+
+        sender, receiver = socket.socketpair()
+        try:
+            send_buffers(sender, [header, frame_buffer.get_frame()])
+            frame = MessageReader().read_message(receiver)
+        finally:
+            sender.close()
+            receiver.close()
+
+        self.assertEqual((frame.header, frame.message_id, frame.request_id), (DATA_HEADER, 3, 9))
+        self.assertEqual(bytes(frame.payload), b'hello')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import logging
+import socket
+import threading
+import time
+import unittest
+
+from crawler_ipx.generic_utils import COMMAND_HEADER
+from crawler_ipx.frame_utils import MessageReader, send_frame
+from crawler_ipx.host_commands_constants import PING_CMD_ID, SET_SPEED_CMD_ID, SET_STEERING_CMD_ID
+from crawler_ipx.scheduler import OutboundScheduler
+from crawler_ipx.value_types import FLOAT32_VALUE
+from crawler_ipx.host import Host
+from crawler_ipx.host_server import HostServer
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+# Values sent by the operator's input thread, much faster than the throttled peer reads them
+SPEEDS = 3000
+
+
+def read_speeds(sock, last_speed, decode):
+    """
+        Read set_speed values slowly until the last one arrives.
+    :param sock: connected socket
+    :param last_speed: last value sent
+    :param decode: function converting a frame's payload to a float
+    :return: list of values read
+    """
+    reader = MessageReader()
+    speeds = []
+    while not speeds or speeds[-1] != last_speed:
+        message = reader.read_message(sock)
+        if message.message_id == SET_SPEED_CMD_ID:
+            speeds.append(decode(message.payload))
+            time.sleep(0.001)
+    return speeds
+
+
+class TestCoalescing(unittest.TestCase):
+
+    def test_queued_value_replaced(self):
+        logger.info("\n\nRunning TestCoalescing - test_queued_value_replaced\n")
+        scheduler = OutboundScheduler()
+        sending_socket, receiving_socket = socket.socketpair()
+        senders = []
+
+        def send(message_id, value, coalesce=True):
+            sender = threading.Thread(target=scheduler.send, daemon=True, kwargs={
+                'socket': sending_socket, 'header': COMMAND_HEADER, 'message_id': message_id, 'payload': value,
+                'coalesce': coalesce})
+            sender.start()
+            senders.append(sender)
+
+        try:
+            # connection busy: values pile up while the first frame waits
+            with scheduler.write_lock:
+                for value in (b'0.1', b'0.2', b'0.3'):
+                    send(SET_SPEED_CMD_ID, value)
+                    self.assertTrue(wait_for(lambda: scheduler.get_depth() == 1 and
+                                             sum(scheduler.frames_coalesced) == int(value[-1:]) - 1))
+                send(SET_STEERING_CMD_ID, b'-1')
+                send(SET_SPEED_CMD_ID, b'0.9', coalesce=False)
+                self.assertTrue(wait_for(lambda: scheduler.get_depth() == 3))
+
+            reader = MessageReader()
+            received = []
+            for _ in range(3):
+                message = reader.read_message(receiving_socket)
+                received.append((message.message_id, bytes(message.payload)))
+            for sender in senders:
+                sender.join()
+
+            self.assertEqual(received, [(SET_SPEED_CMD_ID, b'0.3'), (SET_STEERING_CMD_ID, b'-1'),
+                                        (SET_SPEED_CMD_ID, b'0.9')])
+            self.assertEqual(scheduler.get_statistics()["control"]["FramesCoalesced"], 2)
+            self.assertEqual(scheduler.coalescing, {})
+        finally:
+            sending_socket.close()
+            receiving_socket.close()
+
+    def test_client_runs_latest_value(self):
+        logger.info("\n\nRunning TestCoalescing - test_client_runs_latest_value\n")
+        ipx_client = Client('localhost', coalesce_commands=True)
+        host_socket, ipx_client.socket = socket.socketpair()
+        speeds = []
+
+        @ipx_client.handlers.register(SET_SPEED_CMD_ID)
+        def record_speed(client, host_command, value, request_id):
+            speeds.append(float(value))
+            if request_id:
+                client.send_data(client.data.command_accepted, True, request_id)
+
+        try:
+            # backlog received at once: only the latest untracked value is run, tracked commands are all run
+            for speed in (b'0.1', b'0.2', b'0.3', b'0.4'):
+                send_frame(host_socket, COMMAND_HEADER, SET_SPEED_CMD_ID, speed)
+            send_frame(host_socket, COMMAND_HEADER, SET_SPEED_CMD_ID, b'0.5', 7)
+            send_frame(host_socket, COMMAND_HEADER, PING_CMD_ID, b'done', 8)
+            threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+            reader = MessageReader()
+            self.assertEqual(reader.read_message(host_socket).request_id, 7)
+            self.assertEqual(reader.read_message(host_socket).request_id, 8)
+            self.assertEqual(speeds, [0.4, 0.5])
+            self.assertEqual(ipx_client.metrics.coalesced_commands.value, 3)
+        finally:
+            host_socket.close()
+            ipx_client.socket.close()
+
+    def test_host_backlog_coalesced(self):
+        logger.info("\n\nRunning TestCoalescing - test_host_backlog_coalesced\n")
+        ipx_host = Host(port=0, coalesce_commands=True)
+        ipx_host.client, peer_socket = socket.socketpair()
+        ipx_host.client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        peer_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        received = []
+
+        reading = threading.Thread(target=lambda: received.extend(
+            read_speeds(peer_socket, float(SPEEDS - 1), lambda payload: float(bytes(payload)))), daemon=True)
+        reading.start()
+        try:
+            # single input thread sending one value at a time
+            for speed in range(SPEEDS):
+                self.assertIs(ipx_host.send_command(ipx_host.commands.set_speed, float(speed)), True)
+            reading.join(10)
+
+            self.assertFalse(reading.is_alive())
+            self.assertGreater(ipx_host.metrics.coalesced_commands.value, 0)
+            self.assertEqual(len(received) + ipx_host.metrics.coalesced_commands.value, SPEEDS)
+            self.assertEqual(received, sorted(received))
+        finally:
+            ipx_host.terminate()
+            peer_socket.close()
+
+    def test_server_backlog_coalesced(self):
+        logger.info("\n\nRunning TestCoalescing - test_server_backlog_coalesced\n")
+        server = HostServer(name='127.0.0.1', port=0, dead_peer_timeout=30, coalesce_commands=True)
+        server.start_in_thread()
+        ipx_client = Client('127.0.0.1', server.port)
+        try:
+            self.assertTrue(ipx_client.connect_to_host())
+            self.assertTrue(wait_for(lambda: len(server.clients) == 1))
+            client_name = server.get_client_names()[0]
+            server.clients[client_name].writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET,
+                                                                                    socket.SO_SNDBUF, 4096)
+            ipx_client.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            received = []
+
+            reading = threading.Thread(target=lambda: received.extend(
+                read_speeds(ipx_client.socket, float(SPEEDS - 1), FLOAT32_VALUE.decode)), daemon=True)
+            reading.start()
+            for speed in range(SPEEDS):
+                result = server.call(server.send_command(client_name, server.commands.set_speed, float(speed)))
+                self.assertIs(result, True)
+            reading.join(10)
+
+            self.assertFalse(reading.is_alive())
+            self.assertGreater(server.metrics.coalesced_commands.value, 0)
+            self.assertEqual(len(received) + server.metrics.coalesced_commands.value, SPEEDS)
+            self.assertEqual(received, sorted(received))
+        finally:
+            ipx_client.terminate()
+            server.stop_thread()
+
+
+if __name__ == '__main__':
+    unittest.main()
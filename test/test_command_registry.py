@@ -0,0 +1,76 @@
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from crawler_ipx.generic_utils import Command
+from crawler_ipx.command_registry import Catalog, get_registry
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+logger = logging.getLogger('ipx_logger')
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCommandRegistry(unittest.TestCase):
+
+    def test_lookups(self):
+        logger.info("\n\nRunning TestCommandRegistry - test_lookups\n")
+        registry = get_registry()
+        self.assertIs(registry, get_registry())
+
+        for command in registry.host_commands:
+            self.assertIs(registry.host_commands.get_by_id(command.id), command)
+            self.assertIs(registry.host_commands.get_by_in_code(command.in_code), command)
+            self.assertIn(command.id, registry.host_commands)
+
+        self.assertIsNone(registry.host_commands.get_by_id(9999))
+        self.assertIsNone(registry.host_commands.get_by_in_code('unknown'))
+        self.assertEqual(registry.data.get_by_in_code('credentials').id, 1)
+
+    def test_read_only(self):
+        logger.info("\n\nRunning TestCommandRegistry - test_read_only\n")
+        registry = get_registry()
+        with self.assertRaises(AttributeError):
+            registry.host_commands = None
+        with self.assertRaises(TypeError):
+            registry.host_commands.by_id[9999] = None
+
+    def test_duplicated_id(self):
+        logger.info("\n\nRunning TestCommandRegistry - test_duplicated_id\n")
+        with self.assertRaises(NameError):
+            Catalog('test commands', [Command(1, 'A', 'A', 'a'), Command(1, 'B', 'B', 'b')])
+
+    def test_shared_catalogs(self):
+        logger.info("\n\nRunning TestCommandRegistry - test_shared_catalogs\n")
+        registry = get_registry()
+        ipx_host = Host(port=0)
+        ipx_client = Client('localhost')
+        try:
+            self.assertIs(ipx_host.commands, ipx_client.host_commands)
+            self.assertIs(ipx_host.data, registry.data)
+            self.assertIs(ipx_host.commands.start_video_streaming, registry.host_commands.get_by_in_code(
+                'start_video_streaming'))
+            with self.assertRaises(AttributeError):
+                ipx_host.commands.unknown_command
+        finally:
+            ipx_host.socket.close()
+            ipx_client.socket.close()
+
+        command = registry.host_commands.set_speed
+        with self.assertRaises(AttributeError):
+            command.extra = True
+        self.assertIn("Value required: True", command.get_description())
+
+    def test_import_has_no_side_effect(self):
+        logger.info("\n\nRunning TestCommandRegistry - test_import_has_no_side_effect\n")
+        code = "import logging, os, crawler_ipx.host, crawler_ipx.client; " \
+               "print(logging.getLogger().handlers, os.path.exists('logs'))"
+        with tempfile.TemporaryDirectory() as directory:
+            output = subprocess.check_output([sys.executable, '-c', code], cwd=directory,
+                                             env=dict(os.environ, PYTHONPATH=REPOSITORY_DIRECTORY))
+        self.assertEqual(output.split(), [b'[]', b'False'])
+
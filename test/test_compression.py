@@ -0,0 +1,106 @@
+import logging
+import threading
+import unittest
+
+from crawler_ipx.generic_utils import COMMAND_HEADER, DATA_HEADER
+from crawler_ipx.generic_data_constants import TELEMETRY_DATA_ID
+from crawler_ipx.frame_utils import COMPRESSED_FLAG, Frame
+from crawler_ipx.compression import PayloadCompressor
+from crawler_ipx.handshake import Capabilities
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestCompression(unittest.TestCase):
+
+    def test_compress_and_decompress(self):
+        logger.info("\n\nRunning TestCompression - test_compress_and_decompress\n")
+        compressor = PayloadCompressor(threshold=64)
+
+        # small and incompressible payloads are sent as they are
+        self.assertEqual(compressor.compress(DATA_HEADER, 2, b'True'), (DATA_HEADER, b'True'))
+        random_payload = bytes((i * 97) % 251 for i in range(80))
+        header, payload = compressor.compress(DATA_HEADER, 2, random_payload)
+        self.assertEqual(header, DATA_HEADER)
+
+        header, payload = compressor.compress(COMMAND_HEADER, 7, b'abc' * 100)
+        self.assertEqual(header, COMMAND_HEADER | COMPRESSED_FLAG)
+        self.assertLess(len(payload), 300)
+        message = compressor.decompress(Frame(header, 7, 5, payload))
+        self.assertEqual(message, Frame(COMMAND_HEADER, 7, 5, b'abc' * 100))
+
+        self.assertEqual(compressor.messages_compressed, 1)
+        self.assertEqual(compressor.messages_skipped, 1)
+        self.assertLess(compressor.get_ratio(), 0.2)
+        self.assertGreater(compressor.get_statistics()["CompressTime"], 0.0)
+
+        with self.assertRaises(ConnectionError):
+            compressor.decompress(Frame(header, 7, 5, payload[:-3]))
+
+        # decompressed payloads are bounded
+        small = PayloadCompressor(threshold=64, max_payload_size=100)
+        with self.assertRaises(ConnectionError):
+            small.decompress(Frame(header, 7, 5, payload))
+
+    def test_dictionary_per_data_type(self):
+        logger.info("\n\nRunning TestCompression - test_dictionary_per_data_type\n")
+        dictionary = b'speed=;battery=;imu_x=;imu_y=;imu_z=;' * 4
+        sender = PayloadCompressor(threshold=16)
+        receiver = PayloadCompressor(threshold=16)
+        for compressor in (sender, receiver):
+            compressor.set_profile(TELEMETRY_DATA_ID, level=9, dictionary=dictionary)
+
+        content = b'speed=0.5;battery=12.1;imu_x=0.01;imu_y=0.02;imu_z=9.81;'
+        header, with_dictionary = sender.compress(DATA_HEADER, TELEMETRY_DATA_ID, content)
+        self.assertTrue(header & COMPRESSED_FLAG)
+        _, without_dictionary = PayloadCompressor(threshold=16).compress(DATA_HEADER, TELEMETRY_DATA_ID, content)
+        self.assertLess(len(with_dictionary), len(without_dictionary))
+
+        message = receiver.decompress(Frame(header, TELEMETRY_DATA_ID, 0, with_dictionary))
+        self.assertEqual(message.payload, content)
+
+    def test_negotiated_compression(self):
+        logger.info("\n\nRunning TestCompression - test_negotiated_compression\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port)
+
+        accepting = threading.Thread(target=ipx_host.connect_with_client, daemon=True)
+        accepting.start()
+        try:
+            self.assertTrue(ipx_client.connect_to_host())
+            accepting.join()
+            threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+            self.assertIsNotNone(ipx_host.compressor)
+            self.assertIsNotNone(ipx_client.compressor)
+
+            value = 'telemetry,' * 200
+            response = ipx_host.submit_command(ipx_host.commands.ping, value).result(timeout=5)
+            self.assertEqual(response["Content"], value)
+            self.assertEqual(ipx_host.compressor.messages_compressed, 1)
+            self.assertEqual(ipx_host.compressor.messages_decompressed, 1)
+            self.assertLess(ipx_host.metrics.bytes_sent.value, len(value))
+        finally:
+            ipx_client.terminate()
+            ipx_host.terminate()
+
+    def test_compression_not_negotiated(self):
+        logger.info("\n\nRunning TestCompression - test_compression_not_negotiated\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port, capabilities=Capabilities(compression=()))
+
+        accepting = threading.Thread(target=ipx_host.connect_with_client, daemon=True)
+        accepting.start()
+        try:
+            self.assertTrue(ipx_client.connect_to_host())
+            accepting.join()
+            self.assertIsNone(ipx_host.compressor)
+            self.assertIsNone(ipx_client.compressor)
+        finally:
+            ipx_client.terminate()
+            ipx_host.terminate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import logging
+import socket
+import threading
+import time
+import unittest
+
+from crawler_ipx.generic_utils import COMMAND_HEADER
+from crawler_ipx.frame_utils import MessageReader, send_frame
+from crawler_ipx.host_commands_constants import PING_CMD_ID, SET_SPEED_CMD_ID
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+from crawler_ipx.control_channel import CONTROL_DATAGRAM_HEADER
+from crawler_ipx.control_channel import ControlChannelReceiver, create_control_token
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestControlChannel(unittest.TestCase):
+
+    def test_stale_and_unknown_datagrams_dropped(self):
+        logger.info("\n\nRunning TestControlChannel - test_stale_and_unknown_datagrams_dropped\n")
+        token = create_control_token()
+        commands = []
+        receiver = ControlChannelReceiver(token, lambda command_id, payload: commands.append((command_id,
+                                                                                              bytes(payload))))
+        try:
+            self.assertTrue(receiver.handle_datagram(CONTROL_DATAGRAM_HEADER.pack(token, 2, 5) + b'10'))
+            self.assertTrue(receiver.handle_datagram(CONTROL_DATAGRAM_HEADER.pack(token, 1, 6) + b'-3'))
+            # older than the last set_speed value
+            self.assertFalse(receiver.handle_datagram(CONTROL_DATAGRAM_HEADER.pack(token, 1, 5) + b'5'))
+            # wrong session token
+            self.assertFalse(receiver.handle_datagram(CONTROL_DATAGRAM_HEADER.pack(b'\x00' * 16, 3, 5) + b'0'))
+        finally:
+            receiver.stop()
+
+        self.assertEqual(commands, [(5, b'10'), (6, b'-3')])
+        statistics = receiver.get_statistics()
+        self.assertEqual(statistics["DatagramsStale"], 1)
+        self.assertEqual(statistics["DatagramsRefused"], 1)
+
+    def test_value_commands_over_udp(self):
+        logger.info("\n\nRunning TestControlChannel - test_value_commands_over_udp\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port)
+        ipx_host.client, ipx_client.socket = socket.socketpair()
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+        try:
+            self.assertTrue(ipx_host.open_control_channel('127.0.0.1'))
+            for speed in range(1, 21):
+                self.assertTrue(ipx_host.send_command(ipx_host.commands.set_speed, speed))
+            self.assertTrue(ipx_host.send_command(ipx_host.commands.set_steering, -0.5))
+
+            deadline = time.time() + 5
+            while (ipx_client.speed != 20.0 or ipx_client.steering is None) and time.time() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(ipx_client.speed, 20.0)
+            self.assertEqual(ipx_client.steering, -0.5)
+            self.assertEqual(ipx_host.control_channel.get_statistics()["DatagramsSent"], 21)
+        finally:
+            ipx_host.stop_receiver()
+            ipx_host.client.close()
+            ipx_client.socket.close()
+            ipx_host.terminate()
+            ipx_client.close_control_channel()
+
+    def test_bad_values_do_not_stop_receivers(self):
+        logger.info("\n\nRunning TestControlChannel - test_bad_values_do_not_stop_receivers\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port)
+        host_socket, ipx_client.socket = socket.socketpair()
+
+        @ipx_client.handlers.register(PING_CMD_ID)
+        def failing_ping(client, host_command, value, request_id):
+            raise RuntimeError("ping failed")
+
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+        reader = MessageReader()
+        try:
+            # over TCP: refused, slave mode keeps serving the host; request ids not used by the host afterwards
+            send_frame(host_socket, COMMAND_HEADER, SET_SPEED_CMD_ID, b'abc', 101)
+            send_frame(host_socket, COMMAND_HEADER, PING_CMD_ID, b'abc', 102)
+            send_frame(host_socket, COMMAND_HEADER, SET_SPEED_CMD_ID, b'0.5', 103)
+            replies = []
+            for _ in range(3):
+                reply = reader.read_message(host_socket)
+                replies.append((reply.request_id, bytes(reply.payload)))
+            self.assertEqual(replies, [(101, b'False'), (102, b'False'), (103, b'True')])
+            self.assertEqual(ipx_client.speed, 0.5)
+            self.assertEqual(ipx_client.metrics.handler_errors.value, 1)
+
+            # over UDP: dropped, control channel keeps receiving
+            ipx_host.client = host_socket
+            self.assertTrue(ipx_host.open_control_channel('127.0.0.1'))
+            self.assertTrue(ipx_host.send_command(ipx_host.commands.set_speed, 'abc'))
+            self.assertTrue(ipx_host.send_command(ipx_host.commands.set_speed, 2))
+
+            deadline = time.time() + 5
+            while ipx_client.speed != 2.0 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(ipx_client.speed, 2.0)
+            self.assertEqual(ipx_client.control_channel.get_statistics()["DatagramsReceived"], 2)
+        finally:
+            ipx_host.stop_receiver()
+            host_socket.close()
+            ipx_client.socket.close()
+            ipx_host.terminate()
+            ipx_client.close_control_channel()
+
+
+if __name__ == '__main__':
+    unittest.main()
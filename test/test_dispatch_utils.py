@@ -0,0 +1,37 @@
+import logging
+import unittest
+
+from crawler_ipx.generic_utils import Command
+from crawler_ipx.dispatch_utils import CommandDispatcher
+from crawler_ipx.client import Client
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestCommandDispatcher(unittest.TestCase):
+
+    def test_register_and_dispatch(self):
+        logger.info("\n\nRunning TestCommandDispatcher - test_register_and_dispatch\n")
+        dispatcher = CommandDispatcher()
+        calls = []
+
+        @dispatcher.register(13)
+        def handler(owner, command, value, request_id):
+            calls.append((owner, command.id, value, request_id))
+
+        command = Command(13, 'Set speed', 'Set speed', 'set_speed', True)
+        self.assertTrue(dispatcher.dispatch('owner', command, '50', 7))
+        self.assertFalse(dispatcher.dispatch('owner', Command(14, 'Other', 'Other', 'other')))
+
+        self.assertEqual(calls, [('owner', 13, '50', 7)])
+        self.assertEqual(dispatcher.get_statistics()[13][0], 1)
+
+    def test_client_handlers_per_instance(self):
+        logger.info("\n\nRunning TestCommandDispatcher - test_client_handlers_per_instance\n")
+        ipx_client = Client('localhost')
+        for command in ipx_client.registry.host_commands:
+            self.assertIn(command.id, ipx_client.handlers)
+
+        ipx_client.handlers.add_handler(100, lambda client, command, value, request_id: None)
+        self.assertIn(100, ipx_client.handlers)
+        self.assertNotIn(100, Client.handlers)
@@ -0,0 +1,74 @@
+import logging
+import socket
+import unittest
+
+from crawler_ipx.generic_utils import COMMAND_HEADER, DATA_HEADER
+from crawler_ipx.frame_utils import MessageReader
+from crawler_ipx.frame_utils import decode_message, encode_frame
+
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestMessageReader(unittest.TestCase):
+
+    def test_stream_with_small_buffer(self):
+        logger.info("\n\nRunning TestMessageReader - test_stream_with_small_buffer\n")
+        payloads = [bytes(str(index), 'utf-8') * (index % 50) for index in range(300)]
+        stream = b''.join(encode_frame(DATA_HEADER, index, payload) for index, payload in enumerate(payloads))
+
+        host_socket, client_socket = socket.socketpair()
+        try:
+            client_socket.sendall(stream)
+            client_socket.close()
+
+            reader = MessageReader(buffer_size=32)
+            received = [(message.message_id, bytes(message.payload)) for message in reader.read_messages(host_socket)]
+        finally:
+            host_socket.close()
+
+        self.assertEqual(received, list(enumerate(payloads)))
+
+    def test_decode_message(self):
+        logger.info("\n\nRunning TestMessageReader - test_decode_message\n")
+        reader = MessageReader()
+        host_socket, client_socket = socket.socketpair()
+        try:
+            client_socket.sendall(encode_frame(COMMAND_HEADER, 7, b'value') + encode_frame(COMMAND_HEADER, 8))
+            valid = decode_message(reader.read_message(host_socket), {7})
+            invalid = decode_message(reader.read_message(host_socket), {7})
+        finally:
+            host_socket.close()
+            client_socket.close()
+
+        self.assertEqual(valid, {"Type": COMMAND_HEADER, "ID": 7, "RequestID": 0, "Content": 'value', "Valid": True,
+                                 "Error": None})
+        self.assertFalse(invalid["Valid"])
+
+
+class TestFramedConnection(unittest.TestCase):
+
+    def test_host_client_messages(self):
+        logger.info("\n\nRunning TestFramedConnection - test_host_client_messages\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name())
+        ipx_host.client, ipx_client.socket = socket.socketpair()
+
+        try:
+            for _ in range(200):
+                self.assertTrue(ipx_host.send_command(ipx_host.commands.start_video_streaming))
+            for _ in range(200):
+                response = ipx_client.decode_server_response(ipx_client.receive_frame())
+                self.assertTrue(response["Valid"])
+                self.assertEqual(response["ID"], ipx_host.commands.start_video_streaming.id)
+
+            long_value = 'v' * 1000
+            ipx_client.send_data(ipx_client.data.command_accepted, long_value)
+            response = ipx_host.decode_response(ipx_host.receive_frame())
+            self.assertEqual(response["Content"], long_value)
+        finally:
+            ipx_host.client.close()
+            ipx_client.socket.close()
+            ipx_host.terminate()
@@ -0,0 +1,93 @@
+import logging
+import threading
+import unittest
+
+from crawler_ipx.handshake import CONTROL_CHANNEL, HEARTBEAT_CHANNEL, TELEMETRY_CHANNEL, VIDEO_CHANNEL
+from crawler_ipx.handshake import CAPABILITIES_FIELD, PASSWORD_FIELD, USERNAME_FIELD
+from crawler_ipx.handshake import Capabilities
+from crawler_ipx.handshake import decode_handshake, encode_handshake, read_capabilities
+from crawler_ipx.generic_utils import decode_credentials
+from crawler_ipx.host_server import HostServer
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestHandshake(unittest.TestCase):
+
+    def test_negotiation(self):
+        logger.info("\n\nRunning TestHandshake - test_negotiation\n")
+        host = Capabilities(2, 1024 * 1024, ('lz4', 'zlib'))
+        client = Capabilities(1, 64 * 1024, ('zlib', 'lz4'), (CONTROL_CHANNEL, VIDEO_CHANNEL, 'lidar'))
+
+        negotiated = host.negotiate(client)
+        self.assertEqual(negotiated.version, 1)
+        self.assertEqual(negotiated.max_frame_size, 64 * 1024)
+        self.assertEqual(negotiated.get_compression(), 'zlib')
+        self.assertEqual(negotiated.channels, {CONTROL_CHANNEL, VIDEO_CHANNEL})
+        self.assertEqual(Capabilities.decode(negotiated.encode()), negotiated)
+
+        # credentials carrying capabilities are still read by older hosts
+        content = encode_handshake({USERNAME_FIELD: 'user', PASSWORD_FIELD: 'pwd', CAPABILITIES_FIELD: client})
+        self.assertEqual(decode_credentials(content), ('user', 'pwd'))
+        self.assertEqual(read_capabilities(decode_handshake(content)), client)
+
+        # peers sending no or invalid capabilities are legacy peers
+        self.assertEqual(read_capabilities({}), Capabilities.legacy())
+        self.assertEqual(read_capabilities({CAPABILITIES_FIELD: 'max_frame_size=big'}), Capabilities.legacy())
+        self.assertFalse(Capabilities.legacy().supports(HEARTBEAT_CHANNEL))
+        with self.assertRaises(NameError):
+            Capabilities(max_frame_size=0)
+
+    def test_negotiated_on_connection(self):
+        logger.info("\n\nRunning TestHandshake - test_negotiated_on_connection\n")
+        ipx_host = Host(port=0, capabilities=Capabilities(max_frame_size=4096))
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port,
+                            capabilities=Capabilities(channels=(CONTROL_CHANNEL, TELEMETRY_CHANNEL)))
+
+        accepting = threading.Thread(target=ipx_host.connect_with_client, daemon=True)
+        accepting.start()
+        try:
+            self.assertTrue(ipx_client.connect_to_host())
+            accepting.join()
+
+            self.assertEqual(ipx_client.negotiated, ipx_host.negotiated)
+            self.assertEqual(ipx_client.negotiated.max_frame_size, 4096)
+            self.assertEqual(ipx_client.receiver.max_frame_size, 4096)
+            self.assertEqual(ipx_host.receiver.max_frame_size, 4096)
+
+            # channels not negotiated are not used
+            self.assertIsNone(ipx_client.heartbeat)
+            self.assertIsNone(ipx_host.heartbeat)
+            with self.assertRaises(ValueError):
+                ipx_host.start_video_streaming().result(timeout=5)
+
+            # telemetry batches fit in negotiated frames
+            telemetry = ipx_client.start_telemetry(batch_size=1000)
+            self.assertLess(telemetry.batch_size * 14, 4096)
+        finally:
+            ipx_client.terminate()
+            ipx_host.terminate()
+
+    def test_negotiated_in_server_mode(self):
+        logger.info("\n\nRunning TestHandshake - test_negotiated_in_server_mode\n")
+        server = HostServer(name='127.0.0.1', port=0, capabilities=Capabilities(compression=('zlib', )))
+        server.start_in_thread()
+        ipx_client = Client('127.0.0.1', server.port, capabilities=Capabilities(compression=('zlib', )))
+        try:
+            self.assertTrue(ipx_client.connect_to_host())
+            self.assertTrue(wait_for(lambda: len(server.clients) == 1))
+            connection = server.get_client(server.get_client_names()[0])
+            self.assertEqual(connection.negotiated, ipx_client.negotiated)
+            self.assertEqual(connection.negotiated.get_compression(), 'zlib')
+            self.assertTrue(connection.negotiated.supports(HEARTBEAT_CHANNEL))
+        finally:
+            ipx_client.terminate()
+            server.stop_thread()
+
+
+if __name__ == '__main__':
+    unittest.main()
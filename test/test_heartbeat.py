@@ -0,0 +1,76 @@
+import logging
+import threading
+import unittest
+
+from crawler_ipx.heartbeat import Heartbeat
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestHeartbeat(unittest.TestCase):
+
+    def test_rtt_estimation(self):
+        logger.info("\n\nRunning TestHeartbeat - test_rtt_estimation\n")
+        host_heartbeat = Heartbeat(wait_for_peer=True)
+        client_heartbeat = Heartbeat()
+
+        # host waits for client's first heartbeat, client's first heartbeat echoes nothing
+        self.assertIsNone(host_heartbeat.create_heartbeat(now=0.0))
+        self.assertIsNone(host_heartbeat.handle_heartbeat(client_heartbeat.create_heartbeat(now=10.0), now=100.0))
+
+        # host holds client's heartbeat 0.05s, client receives the echo 0.1s after sending its heartbeat
+        self.assertAlmostEqual(client_heartbeat.handle_heartbeat(host_heartbeat.create_heartbeat(now=100.05),
+                                                                 now=10.1), 0.05)
+        self.assertAlmostEqual(client_heartbeat.smoothed_rtt, 0.05)
+        self.assertAlmostEqual(client_heartbeat.jitter, 0.025)
+
+        # host's sample: client echoes host's heartbeat right away, 0.03s after host sent it
+        self.assertAlmostEqual(host_heartbeat.handle_heartbeat(client_heartbeat.create_heartbeat(now=10.1),
+                                                               now=100.08), 0.03)
+        self.assertEqual(host_heartbeat.rtt_samples, 1)
+
+        self.assertFalse(host_heartbeat.is_peer_dead(now=100.08 + host_heartbeat.dead_peer_timeout))
+        self.assertTrue(host_heartbeat.is_peer_dead(now=100.09 + host_heartbeat.dead_peer_timeout))
+
+        self.assertIsNone(host_heartbeat.handle_heartbeat(b'\x00' * 3))
+        self.assertEqual(host_heartbeat.corrupted_heartbeats, 1)
+
+    def test_dead_peer_and_reconnect(self):
+        logger.info("\n\nRunning TestHeartbeat - test_dead_peer_and_reconnect\n")
+        ipx_host = Host(port=0, accept_reconnects=True, heartbeat_interval=0.02, dead_peer_timeout=0.2)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port, auto_reconnect=True, heartbeat_interval=0.02,
+                            dead_peer_timeout=0.2)
+
+        accepting = threading.Thread(target=ipx_host.connect_with_client, daemon=True)
+        accepting.start()
+        ipx_client.connect_to_host()
+        accepting.join()
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+        try:
+            self.assertTrue(wait_for(lambda: ipx_host.heartbeat.smoothed_rtt is not None and
+                                     ipx_client.heartbeat.smoothed_rtt is not None))
+
+            # client goes silent: host drops it, client reconnects
+            ipx_client.heartbeat.stop()
+            self.assertTrue(wait_for(lambda: ipx_client.metrics.reconnects.value == 1 and
+                                     ipx_host.metrics.reconnects.value == 1))
+
+            self.assertEqual(ipx_host.metrics.dead_peers.value, 1)
+            self.assertEqual(ipx_client.metrics.recovery_time.count, 1)
+            self.assertLess(ipx_client.metrics.recovery_time.sum, 1.0)
+
+            self.assertTrue(wait_for(lambda: ipx_host.receiving))
+            response = ipx_host.submit_command(ipx_host.commands.ping, 'abc').result(timeout=5)
+            self.assertEqual(response["Content"], 'abc')
+        finally:
+            ipx_client.terminate()
+            ipx_host.terminate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+import unittest
+
+from crawler_ipx.host_server import HostServer
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestHostServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HostServer(name='127.0.0.1', port=0)
+        self.server.start_in_thread()
+        self.clients = []
+
+    def tearDown(self):
+        for ipx_client in self.clients:
+            ipx_client.socket.close()
+        self.server.stop_thread()
+
+    def connect_clients(self, number_of_clients, password=None):
+        for _ in range(number_of_clients):
+            ipx_client = Client('127.0.0.1', self.server.port)
+            if password is not None:
+                ipx_client.password = password
+            ipx_client.connect_to_host()
+            self.clients.append(ipx_client)
+
+    def test_many_clients(self):
+        logger.info("\n\nRunning TestHostServer - test_many_clients\n")
+        self.connect_clients(5)
+        self.assertTrue(wait_for(lambda: len(self.server.clients) == 5))
+
+        for ipx_client in self.clients:
+            threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+        result = self.server.call(self.server.broadcast_command(self.server.commands.ping, 'abc'), timeout=5)
+        self.assertEqual(result["Confirmed"], self.server.get_client_names())
+        self.assertEqual(result["Failed"], {})
+        self.assertTrue(all(response["Content"] == 'abc' for response in result["Responses"].values()))
+
+    def test_send_to_one_client(self):
+        logger.info("\n\nRunning TestHostServer - test_send_to_one_client\n")
+        self.connect_clients(2)
+        self.assertTrue(wait_for(lambda: len(self.server.clients) == 2))
+
+        client_name = self.server.get_client_names()[0]
+        command = self.server.commands.stop_video_streaming
+        self.assertTrue(self.server.call(self.server.send_command(client_name, command)))
+        self.assertNotEqual(self.server.call(self.server.send_command('unknown', command)), True)
+
+    def test_pipelined_commands(self):
+        logger.info("\n\nRunning TestHostServer - test_pipelined_commands\n")
+        self.connect_clients(2)
+        self.assertTrue(wait_for(lambda: len(self.server.clients) == 2))
+        for ipx_client in self.clients:
+            threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+        command = self.server.commands.stop_video_streaming
+
+        async def submit_all():
+            futures = []
+            for client_name in self.server.get_client_names():
+                for _ in range(50):
+                    futures.append(await self.server.submit_command(client_name, command))
+            return [await future for future in futures]
+
+        responses = self.server.call(submit_all(), timeout=5)
+        self.assertEqual(len(responses), 100)
+        self.assertTrue(all(response["Content"] == 'True' for response in responses))
+
+    def test_broadcast_with_acks(self):
+        logger.info("\n\nRunning TestHostServer - test_broadcast_with_acks\n")
+        self.connect_clients(3)
+        self.assertTrue(wait_for(lambda: len(self.server.clients) == 3))
+        # last client never answers
+        for ipx_client in self.clients[:2]:
+            threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+        client_names = self.server.get_client_names()
+
+        command = self.server.commands.ping
+        result = self.server.call(self.server.broadcast_command(command, 'x' * 1024, client_names + ['unknown'],
+                                                                deadline=0.5), timeout=5)
+        self.assertEqual(result["Confirmed"], client_names[:2])
+        self.assertEqual(sorted(result["Failed"]), [client_names[2], 'unknown'])
+        self.assertEqual(result["Responses"][client_names[0]]["Content"], 'x' * 1024)
+        self.assertEqual(result["WorstLatency"], max(result["Latencies"].values()))
+        self.assertLess(result["WorstLatency"], 0.5)
+        self.assertEqual(len(self.server.get_client(client_names[2]).pending_requests), 0)
+
+        # silent client still received the command
+        response = self.clients[2].decode_server_response(self.clients[2].receive_frame())
+        self.assertEqual((response["ID"], response["Content"]), (command.id, 'x' * 1024))
+
+        # only selected clients' encodings are used: a value an unselected client refuses does not abort the broadcast
+        for ipx_client in self.clients:
+            ipx_client.typed_values = False
+        for client_name in client_names:
+            self.server.get_client(client_name).typed_values = client_name == client_names[2]
+        result = self.server.call(self.server.broadcast_command(self.server.commands.set_speed, 'fast',
+                                                                client_names[:2]), timeout=5)
+        self.assertEqual(result["Confirmed"], client_names[:2])
+        self.assertEqual(result["Responses"][client_names[0]]["Content"], 'False')
+
+    def test_invalid_credentials(self):
+        logger.info("\n\nRunning TestHostServer - test_invalid_credentials\n")
+        self.connect_clients(1, password='wrong')
+        self.connect_clients(1)
+        self.assertTrue(wait_for(lambda: len(self.server.clients) == 1))
+        time.sleep(0.05)
+        self.assertEqual(len(self.server.clients), 1)
@@ -0,0 +1,42 @@
+import logging
+import queue
+import unittest
+
+from crawler_ipx.log_utils import QueueingHandler, parse_levels
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestLogUtils(unittest.TestCase):
+
+    def test_queued_records_formatted_later(self):
+        logger.info("\n\nRunning TestLogUtils - test_queued_records_formatted_later\n")
+        records = queue.SimpleQueue()
+        test_logger = logging.getLogger('test_log_utils.queued')
+        test_logger.propagate = False
+        test_logger.setLevel(logging.DEBUG)
+        handler = QueueingHandler(records)
+        test_logger.addHandler(handler)
+
+        try:
+            content = {"ID": 1}
+            test_logger.debug("Message %s from %s", content, 'host')
+            content["ID"] = 2
+        finally:
+            test_logger.removeHandler(handler)
+
+        record = records.get_nowait()
+        # mutable argument captured when logged, message still not formatted
+        self.assertEqual(record.msg, "Message %s from %s")
+        self.assertEqual(record.getMessage(), "Message {'ID': 1} from host")
+
+    def test_parse_levels(self):
+        logger.info("\n\nRunning TestLogUtils - test_parse_levels\n")
+        self.assertEqual(parse_levels('host=debug, video_streaming=WARNING'),
+                         {'host': 'DEBUG', 'video_streaming': 'WARNING'})
+        self.assertEqual(parse_levels(''), {})
+        self.assertRaises(NameError, parse_levels, 'host')
+
+
+if __name__ == '__main__':
+    unittest.main()
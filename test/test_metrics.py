@@ -0,0 +1,72 @@
+import logging
+import socket
+import threading
+import time
+import unittest
+
+from crawler_ipx.generic_utils import DATA_HEADER
+from crawler_ipx.frame_utils import FRAME_PREFIX, send_frame
+from crawler_ipx.metrics import Histogram
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram(self):
+        logger.info("\n\nRunning TestMetrics - test_histogram\n")
+        histogram = Histogram('test_seconds', "Test.", bounds=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [1, 2, 1])
+        self.assertEqual(histogram.get_percentile(50), 1.0)
+        self.assertEqual(histogram.get_percentile(100), float('inf'))
+
+        lines = histogram.render('{role="test"}')
+        self.assertIn('ipx_test_seconds_bucket{role="test",le="1.0"} 3', lines)
+        self.assertIn('ipx_test_seconds_bucket{role="test",le="+Inf"} 4', lines)
+        self.assertIn('ipx_test_seconds_count{role="test"} 4', lines)
+
+    def test_host_and_client_metrics(self):
+        logger.info("\n\nRunning TestMetrics - test_host_and_client_metrics\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port)
+        ipx_host.client, ipx_client.socket = socket.socketpair()
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+        try:
+            futures = [ipx_host.submit_command(ipx_host.commands.ping, 'abc') for _ in range(20)]
+            for future in futures:
+                self.assertEqual(future.result(timeout=5)["Content"], 'abc')
+
+            # unknown data id, then content that is not utf-8
+            send_frame(ipx_client.socket, DATA_HEADER, 999, b'')
+            send_frame(ipx_client.socket, DATA_HEADER, ipx_host.data.command_accepted.id, b'\xff\xfe')
+
+            deadline = time.time() + 5
+            while ipx_host.metrics.decode_errors.value < 1 and time.time() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(ipx_host.metrics.command_rtt.count, 20)
+            self.assertEqual(ipx_host.metrics.messages_sent.value, 20)
+            self.assertEqual(ipx_host.metrics.messages_received.value, 22)
+            self.assertEqual(ipx_host.metrics.invalid_ids.value, 1)
+            self.assertEqual(ipx_host.metrics.decode_errors.value, 1)
+            self.assertEqual(ipx_client.metrics.handler_time.count, 20)
+            self.assertEqual(ipx_client.metrics.bytes_sent.value, ipx_host.metrics.bytes_received.value - 2 * FRAME_PREFIX.size - 2)
+
+            exposition = ipx_host.get_metrics()
+            self.assertIn('ipx_invalid_ids_total{role="host"} 1', exposition)
+            self.assertIn('ipx_command_rtt_seconds_count{role="host"} 20', exposition)
+        finally:
+            ipx_host.stop_receiver()
+            ipx_host.client.close()
+            ipx_client.socket.close()
+            ipx_host.terminate()
+
+
+if __name__ == '__main__':
+    unittest.main()
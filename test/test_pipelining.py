@@ -0,0 +1,45 @@
+import logging
+import socket
+import threading
+import unittest
+
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestPipelinedCommands(unittest.TestCase):
+
+    def setUp(self):
+        self.ipx_host = Host(port=0)
+        self.ipx_client = Client(self.ipx_host.get_name())
+        self.ipx_host.client, self.ipx_client.socket = socket.socketpair()
+
+    def tearDown(self):
+        self.ipx_host.stop_receiver()
+        self.ipx_host.client.close()
+        self.ipx_client.socket.close()
+        self.ipx_host.terminate()
+
+    def test_many_commands_in_flight(self):
+        logger.info("\n\nRunning TestPipelinedCommands - test_many_commands_in_flight\n")
+        slave = threading.Thread(target=self.ipx_client.run_in_slave_mode, daemon=True)
+        slave.start()
+
+        command = self.ipx_host.commands.stop_video_streaming
+        futures = [self.ipx_host.submit_command(command) for _ in range(200)]
+        responses = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(len(set(response["RequestID"] for response in responses)), 200)
+        for response in responses:
+            self.assertTrue(response["Valid"])
+            self.assertEqual(response["ID"], self.ipx_host.data.command_accepted.id)
+            self.assertEqual(response["Content"], 'True')
+
+    def test_command_timeout(self):
+        logger.info("\n\nRunning TestPipelinedCommands - test_command_timeout\n")
+        future = self.ipx_host.submit_command(self.ipx_host.commands.start_video_streaming, timeout=0.1)
+        with self.assertRaises(TimeoutError):
+            future.result(timeout=5)
+        self.assertEqual(len(self.ipx_host.pending_requests), 0)
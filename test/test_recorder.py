@@ -0,0 +1,126 @@
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from crawler_ipx.generic_utils import COMMAND_HEADER, DATA_HEADER
+from crawler_ipx.generic_data_constants import CREDENTIALS_DATA_ID
+from crawler_ipx.host_commands_constants import HEARTBEAT_CMD_ID, PING_CMD_ID, SESSION_CMD_ID
+from crawler_ipx.recorder import RECEIVED, SENT
+from crawler_ipx.recorder import FrameRecorder, FrameReplayer
+from crawler_ipx.recorder import read_recording
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record_and_read(self):
+        logger.info("\n\nRunning TestRecorder - test_record_and_read\n")
+        path = os.path.join(self.directory, 'frames.ipxrec')
+        recorder = FrameRecorder(path, chunk_size=64)
+        recorder.record(SENT, COMMAND_HEADER, PING_CMD_ID, 1, b'abc')
+        recorder.record(RECEIVED, DATA_HEADER, 2, 1, memoryview(b'x' * 500))
+        recorder.record(SENT, COMMAND_HEADER, PING_CMD_ID, 2, b'')
+        recorder.record(RECEIVED, DATA_HEADER, CREDENTIALS_DATA_ID, 0, b'u:user\np:password')
+        recorder.record(SENT, COMMAND_HEADER, SESSION_CMD_ID, 0, b't:token')
+        size = recorder.get_size()
+        recorder.close()
+        self.assertEqual(os.path.getsize(path), size)
+
+        records = read_recording(path)
+        self.assertEqual([(record.direction, record.header, record.message_id, record.request_id, record.payload)
+                          for record in records],
+                         [(SENT, COMMAND_HEADER, PING_CMD_ID, 1, b'abc'),
+                          (RECEIVED, DATA_HEADER, 2, 1, b'x' * 500),
+                          (SENT, COMMAND_HEADER, PING_CMD_ID, 2, b''),
+                          # credentials and session token are left out
+                          (RECEIVED, DATA_HEADER, CREDENTIALS_DATA_ID, 0, b''),
+                          (SENT, COMMAND_HEADER, SESSION_CMD_ID, 0, b'')])
+        self.assertEqual(sorted(records, key=lambda record: record.timestamp), records)
+
+        with open(path, 'r+b') as file:
+            file.write(b'NOTREC')
+        with self.assertRaises(NameError):
+            read_recording(path)
+
+    def test_replay_timing(self):
+        logger.info("\n\nRunning TestRecorder - test_replay_timing\n")
+        path = os.path.join(self.directory, 'timing.ipxrec')
+        recorder = FrameRecorder(path)
+        recorder.record(SENT, COMMAND_HEADER, PING_CMD_ID, 1, b'a')
+        time.sleep(0.2)
+        recorder.record(SENT, COMMAND_HEADER, HEARTBEAT_CMD_ID, 0, b'')
+        recorder.record(SENT, COMMAND_HEADER, PING_CMD_ID, 2, b'b')
+        recorder.close()
+
+        sent = []
+
+        def send(header, message_id, payload, request_id):
+            sent.append((time.monotonic(), message_id, payload, request_id))
+            return True
+
+        # heartbeats are made by the live connection, not replayed
+        replayer = FrameReplayer(path, speed=2.0)
+        self.assertEqual(replayer.replay(send, COMMAND_HEADER), 2)
+        self.assertEqual([item[1:] for item in sent], [(PING_CMD_ID, b'a', 1), (PING_CMD_ID, b'b', 2)])
+        self.assertAlmostEqual(sent[1][0] - sent[0][0], 0.1, delta=0.05)
+        self.assertEqual(replayer.replay(send, DATA_HEADER), 0)
+
+    def test_record_client_and_drive_it_again(self):
+        logger.info("\n\nRunning TestRecorder - test_record_client_and_drive_it_again\n")
+        path = os.path.join(self.directory, 'client.ipxrec')
+        pings = []
+
+        def run_pair(record):
+            ipx_host = Host(port=0)
+            ipx_client = Client(ipx_host.get_name())
+            ipx_host.client, ipx_client.socket = socket.socketpair()
+
+            @ipx_client.handlers.register(PING_CMD_ID)
+            def count_pings(client, host_command, value, request_id):
+                pings.append(value)
+                client.send_data(client.data.command_accepted, value, request_id)
+
+            threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+            try:
+                if record:
+                    ipx_client.start_recording(path)
+                    for value in ('a', 'b', 'c'):
+                        ipx_host.submit_command(ipx_host.commands.ping, value).result(timeout=5)
+                    ipx_client.stop_recording()
+                else:
+                    self.assertEqual(FrameReplayer(path, speed=None).drive_client(ipx_host), 3)
+                    self.assertTrue(wait_for(lambda: len(pings) == 6))
+            finally:
+                ipx_host.stop_receiver()
+                ipx_host.client.close()
+                ipx_client.socket.close()
+                ipx_host.terminate()
+
+        run_pair(record=True)
+        records = read_recording(path)
+        self.assertEqual([(record.direction, record.header) for record in records],
+                         [(RECEIVED, COMMAND_HEADER), (SENT, DATA_HEADER)] * 3)
+
+        run_pair(record=False)
+        self.assertEqual(pings, ['a', 'b', 'c'] * 2)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
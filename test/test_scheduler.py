@@ -0,0 +1,74 @@
+import logging
+import socket
+import threading
+import unittest
+
+from crawler_ipx.generic_utils import COMMAND_HEADER, DATA_HEADER
+from crawler_ipx.frame_utils import COMPRESSED_FLAG, MessageReader
+from crawler_ipx.generic_data_constants import COMMAND_ACCEPTED_DATA_ID, TELEMETRY_DATA_ID, VIDEO_FRAME_DATA_ID
+from crawler_ipx.host_commands_constants import SET_SPEED_CMD_ID
+from crawler_ipx.scheduler import ACK_PRIORITY, CONTROL_PRIORITY, TELEMETRY_PRIORITY, VIDEO_PRIORITY
+from crawler_ipx.scheduler import OutboundScheduler
+from crawler_ipx.scheduler import get_priority
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestScheduler(unittest.TestCase):
+
+    def test_priorities(self):
+        logger.info("\n\nRunning TestScheduler - test_priorities\n")
+        self.assertEqual(get_priority(COMMAND_HEADER, SET_SPEED_CMD_ID), CONTROL_PRIORITY)
+        self.assertEqual(get_priority(DATA_HEADER | COMPRESSED_FLAG, COMMAND_ACCEPTED_DATA_ID), ACK_PRIORITY)
+        self.assertEqual(get_priority(DATA_HEADER, TELEMETRY_DATA_ID), TELEMETRY_PRIORITY)
+        self.assertEqual(get_priority(DATA_HEADER, VIDEO_FRAME_DATA_ID), VIDEO_PRIORITY)
+
+    def test_control_frame_preempts_queued_frames(self):
+        logger.info("\n\nRunning TestScheduler - test_control_frame_preempts_queued_frames\n")
+        scheduler = OutboundScheduler()
+        sending_socket, receiving_socket = socket.socketpair()
+        frames = [
+            (DATA_HEADER, VIDEO_FRAME_DATA_ID, b'v' * 65536),
+            (DATA_HEADER, TELEMETRY_DATA_ID, b't' * 1024),
+            (DATA_HEADER, TELEMETRY_DATA_ID, b'T' * 1024),
+            (DATA_HEADER, COMMAND_ACCEPTED_DATA_ID, b'True'),
+            (COMMAND_HEADER, SET_SPEED_CMD_ID, b'0'),
+        ]
+        try:
+            # connection busy: every frame is queued before the first one is written
+            with scheduler.write_lock:
+                senders = [threading.Thread(target=scheduler.send, args=(sending_socket, ) + frame, daemon=True)
+                           for frame in frames]
+                for sender in senders:
+                    sender.start()
+                    self.assertTrue(wait_for(lambda: scheduler.get_depth() == senders.index(sender) + 1))
+
+            reader = MessageReader()
+            received = []
+            for _ in frames:
+                message = reader.read_message(receiving_socket)
+                received.append((message.message_id, bytes(message.payload)))
+            for sender in senders:
+                sender.join()
+
+            # control first, then ack, telemetry in queued order, video last
+            self.assertEqual(received, [frame[1:] for frame in (frames[4], frames[3], frames[1], frames[2], frames[0])])
+
+            statistics = scheduler.get_statistics()
+            self.assertEqual(statistics["telemetry"]["MaxDepth"], 2)
+            self.assertEqual(statistics["telemetry"]["FramesSent"], 2)
+            self.assertEqual(statistics["video"]["Depth"], 0)
+            self.assertGreater(statistics["video"]["MaxWait"], statistics["control"]["MaxWait"])
+        finally:
+            sending_socket.close()
+            receiving_socket.close()
+
+        # connection closed: error raised to the sender
+        with self.assertRaises(OSError):
+            scheduler.send(sending_socket, COMMAND_HEADER, SET_SPEED_CMD_ID, b'0')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import logging
+import socket
+import threading
+import unittest
+
+from concurrent.futures import Future
+
+from crawler_ipx.generic_utils import COMMAND_HEADER
+from crawler_ipx.frame_utils import MessageReader, send_frame
+from crawler_ipx.host_commands_constants import PING_CMD_ID
+from crawler_ipx.session import SessionStore
+from crawler_ipx.host_server import HostServer
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestSession(unittest.TestCase):
+
+    def test_session_store(self):
+        logger.info("\n\nRunning TestSession - test_session_store\n")
+        sessions = SessionStore(session_timeout=10.0)
+        session = sessions.create('user', 'user_1')
+        token = session.token
+
+        self.assertIs(sessions.resume(token), session)
+        self.assertNotEqual(session.token, token)
+        self.assertIsNone(sessions.resume(token))
+
+        future = Future()
+        session.pending_requests.add(future, timeout=None, message=(PING_CMD_ID, b'abc'))
+        self.assertEqual(session.pending_requests.get_unanswered(), [(1, (PING_CMD_ID, b'abc'))])
+
+        sessions.lost(session, now=100.0)
+        self.assertEqual(sessions.expire(now=105.0), 0)
+        self.assertFalse(future.done())
+        self.assertEqual(sessions.expire(now=111.0), 1)
+        self.assertIsInstance(future.exception(), ConnectionError)
+        self.assertIsNone(sessions.resume(session.token))
+
+    def test_kept_reply_sent_again(self):
+        logger.info("\n\nRunning TestSession - test_kept_reply_sent_again\n")
+        ipx_client = Client('localhost')
+        host_socket, ipx_client.socket = socket.socketpair()
+        calls = []
+
+        @ipx_client.handlers.register(PING_CMD_ID)
+        def count_pings(client, host_command, value, request_id):
+            calls.append(request_id)
+            client.send_data(client.data.command_accepted, value, request_id)
+
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+        reader = MessageReader()
+        try:
+            for _ in range(2):
+                send_frame(host_socket, COMMAND_HEADER, PING_CMD_ID, b'abc', 5)
+                reply = reader.read_message(host_socket)
+                self.assertEqual((reply.request_id, bytes(reply.payload)), (5, b'abc'))
+            self.assertEqual(calls, [5])
+        finally:
+            host_socket.close()
+            ipx_client.socket.close()
+
+    def test_resume_with_pending_command(self):
+        logger.info("\n\nRunning TestSession - test_resume_with_pending_command\n")
+        ipx_host = Host(port=0, accept_reconnects=True)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port, auto_reconnect=True)
+        calls = []
+
+        @ipx_client.handlers.register(PING_CMD_ID)
+        def drop_first_ping(client, host_command, value, request_id):
+            calls.append(request_id)
+            if len(calls) == 1:
+                # link lost before the reply is sent
+                client.socket.shutdown(socket.SHUT_RDWR)
+                return
+            client.send_data(client.data.command_accepted, value, request_id)
+
+        accepting = threading.Thread(target=ipx_host.connect_with_client, daemon=True)
+        accepting.start()
+        self.assertTrue(ipx_client.connect_to_host())
+        accepting.join()
+        self.assertFalse(ipx_client.session_resumed)
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+        try:
+            future = ipx_host.submit_command(ipx_host.commands.ping, 'abc', timeout=5)
+            self.assertEqual(future.result(timeout=5)["Content"], 'abc')
+            self.assertEqual(calls[0], calls[1])
+
+            self.assertTrue(ipx_client.session_resumed)
+            self.assertEqual(ipx_host.metrics.sessions_resumed.value, 1)
+            self.assertEqual(ipx_host.metrics.reconnects.value, 1)
+            self.assertEqual(len(ipx_host.sessions), 1)
+        finally:
+            ipx_client.terminate()
+            ipx_host.terminate()
+
+    def test_resume_in_server_mode(self):
+        logger.info("\n\nRunning TestSession - test_resume_in_server_mode\n")
+        server = HostServer(name='127.0.0.1', port=0)
+        server.start_in_thread()
+        ipx_client = Client('127.0.0.1', server.port)
+        try:
+            self.assertTrue(ipx_client.connect_to_host())
+            self.assertTrue(wait_for(lambda: len(server.clients) == 1))
+            client_name = server.get_client_names()[0]
+
+            ipx_client.socket.close()
+            self.assertTrue(ipx_client.connect_to_host())
+            self.assertTrue(ipx_client.session_resumed)
+            self.assertTrue(wait_for(lambda: server.metrics.sessions_resumed.value == 1))
+            self.assertEqual(server.get_client_names(), [client_name])
+
+            # unknown token: client falls back to credentials
+            ipx_client.session_token = '00' * 16
+            self.assertTrue(ipx_client.connect_to_host())
+            self.assertFalse(ipx_client.session_resumed)
+            self.assertTrue(wait_for(lambda: len(server.clients) == 1 and server.get_client_names() != [client_name]))
+        finally:
+            ipx_client.terminate()
+            server.stop_thread()
+
+
+if __name__ == '__main__':
+    unittest.main()
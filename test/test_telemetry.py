@@ -0,0 +1,73 @@
+import logging
+import socket
+import time
+import unittest
+
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+from crawler_ipx.telemetry import BATTERY_CHANNEL, SPEED_CHANNEL
+from crawler_ipx.telemetry import TelemetryBatcher, unpack_telemetry
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_size_and_time_triggers(self):
+        logger.info("\n\nRunning TestTelemetry - test_size_and_time_triggers\n")
+        batches = []
+
+        def send(payload):
+            batches.append(unpack_telemetry(payload))
+            return True
+
+        batcher = TelemetryBatcher(send, batch_size=4, flush_interval=0.05)
+        batcher.start()
+        try:
+            for value in range(6):
+                batcher.record(SPEED_CHANNEL, value, timestamp=100.0 + value)
+            self.assertEqual(len(batches), 1)
+            self.assertEqual(batches[0][3], (103.0, SPEED_CHANNEL, 3.0))
+
+            deadline = time.time() + 2
+            while len(batches) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual([sample[2] for sample in batches[1]], [4.0, 5.0])
+        finally:
+            batcher.stop()
+
+        self.assertEqual(batcher.get_statistics()["BatchesSent"], 2)
+        self.assertRaises(NameError, unpack_telemetry, b'\x00' * 5)
+
+    def test_host_receives_batches(self):
+        logger.info("\n\nRunning TestTelemetry - test_host_receives_batches\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port)
+        ipx_host.client, ipx_client.socket = socket.socketpair()
+        ipx_host.start_receiver()
+
+        try:
+            ipx_client.start_telemetry(batch_size=100)
+            for value in range(250):
+                ipx_client.record_telemetry(SPEED_CHANNEL, value)
+            ipx_client.record_telemetry(BATTERY_CHANNEL, 11.5)
+            ipx_client.stop_telemetry()
+
+            deadline = time.time() + 5
+            while ipx_host.telemetry.samples_received < 251 and time.time() < deadline:
+                time.sleep(0.01)
+
+            statistics = ipx_host.telemetry.get_statistics()
+            self.assertEqual(statistics["SamplesReceived"], 251)
+            self.assertEqual(statistics["BatchesReceived"], 3)
+            self.assertEqual(ipx_host.telemetry.get_latest(SPEED_CHANNEL)[1], 249.0)
+            self.assertEqual(ipx_host.telemetry.get_latest(BATTERY_CHANNEL)[1], 11.5)
+        finally:
+            ipx_host.stop_receiver()
+            ipx_host.client.close()
+            ipx_client.socket.close()
+            ipx_host.terminate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import logging
+import struct
+import threading
+import unittest
+
+from crawler_ipx.generic_utils import COMMAND_HEADER, Command
+from crawler_ipx.frame_utils import Frame, decode_message, encode_typed_value
+from crawler_ipx.handshake import Capabilities
+from crawler_ipx.host_commands_constants import SET_SPEED_CMD_ID
+from crawler_ipx.command_registry import get_registry
+from crawler_ipx.value_types import BOOL_VALUE, BYTES_VALUE, FLOAT32_VALUE, INT8_VALUE, UINT16_VALUE, struct_type
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class TestValueTypes(unittest.TestCase):
+
+    def test_value_codecs(self):
+        logger.info("\n\nRunning TestValueTypes - test_value_codecs\n")
+        self.assertEqual(INT8_VALUE.encode(-3), b'\xfd')
+        self.assertEqual(INT8_VALUE.decode(b'\xfd'), -3)
+        self.assertEqual(FLOAT32_VALUE.decode(FLOAT32_VALUE.encode(0.5)), 0.5)
+        self.assertEqual(UINT16_VALUE.decode(UINT16_VALUE.encode('8080')), 8080)
+        self.assertIs(BOOL_VALUE.decode(BOOL_VALUE.encode('false')), False)
+        self.assertEqual(BYTES_VALUE.decode(BYTES_VALUE.encode(b'\x00\x01')), b'\x00\x01')
+
+        imu_sample = struct_type('imu_sample', '>fff')
+        self.assertEqual(imu_sample.decode(imu_sample.encode('0.5, -1, 2')), (0.5, -1.0, 2.0))
+
+        # no value is an empty payload
+        self.assertEqual(FLOAT32_VALUE.encode(None), b'')
+        self.assertIsNone(FLOAT32_VALUE.decode(b''))
+
+        with self.assertRaises(ValueError):
+            INT8_VALUE.encode(200)
+        with self.assertRaises(ValueError):
+            FLOAT32_VALUE.encode('fast')
+        with self.assertRaises(NameError):
+            FLOAT32_VALUE.decode(b'\x00\x00')
+        with self.assertRaises(NameError):
+            Command(13, 'Set speed', 'Set speed', 'set_speed', True, 'float32')
+
+    def test_typed_and_text_messages(self):
+        logger.info("\n\nRunning TestValueTypes - test_typed_and_text_messages\n")
+        registry = get_registry()
+        command_types = registry.host_commands.value_types
+        set_speed = registry.host_commands.set_speed
+        ping = registry.host_commands.ping
+        self.assertIs(command_types[SET_SPEED_CMD_ID], FLOAT32_VALUE)
+
+        # typed values only once negotiated, commands without value type are always sent as text
+        self.assertEqual(encode_typed_value(set_speed, 0.5, typed=True), struct.pack('>f', 0.5))
+        self.assertEqual(encode_typed_value(set_speed, 0.5), b'0.5')
+        self.assertEqual(encode_typed_value(ping, 'abc', typed=True), b'abc')
+
+        message = Frame(COMMAND_HEADER, SET_SPEED_CMD_ID, 1, struct.pack('>f', 0.5))
+        response = decode_message(message, registry.host_commands.ids, None, 'utf-8', command_types)
+        self.assertEqual((response["Content"], response["Valid"]), (0.5, True))
+
+        # corrupted value
+        message = Frame(COMMAND_HEADER, SET_SPEED_CMD_ID, 1, b'\x00')
+        response = decode_message(message, registry.host_commands.ids, None, 'utf-8', command_types)
+        self.assertEqual((response["Content"], response["Valid"]), (b'\x00', False))
+
+    def test_negotiated_value_encoding(self):
+        logger.info("\n\nRunning TestValueTypes - test_negotiated_value_encoding\n")
+        for capabilities, expected_type in ((Capabilities(), float), (Capabilities(version=1), str)):
+            ipx_host = Host(port=0)
+            ipx_client = Client(ipx_host.get_name(), ipx_host.port, capabilities=capabilities)
+            values = []
+
+            @ipx_client.handlers.register(SET_SPEED_CMD_ID)
+            def record_speed(client, host_command, value, request_id):
+                values.append(value)
+                client.send_data(client.data.command_accepted, True, request_id)
+
+            accepting = threading.Thread(target=ipx_host.connect_with_client, daemon=True)
+            accepting.start()
+            try:
+                self.assertTrue(ipx_client.connect_to_host())
+                accepting.join()
+                self.assertEqual(ipx_host.typed_values, expected_type is float)
+                self.assertEqual(ipx_client.typed_values, expected_type is float)
+                threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+                future = ipx_host.submit_command(ipx_host.commands.set_speed, 0.25, timeout=5)
+                self.assertEqual(future.result(timeout=5)["Content"], 'True')
+                self.assertTrue(wait_for(lambda: len(values) == 1))
+                self.assertIsInstance(values[0], expected_type)
+                self.assertEqual(float(values[0]), 0.25)
+            finally:
+                ipx_client.terminate()
+                ipx_host.terminate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import logging
+import socket
+import threading
+import time
+import unittest
+
+from crawler_ipx.generic_utils import CLIENT_PASSWORD, CLIENT_USERNAME, DATA_HEADER
+from crawler_ipx.frame_utils import encode_frame
+from crawler_ipx.generic_data_constants import CREDENTIALS_DATA_ID
+from crawler_ipx.host import Host
+from crawler_ipx.client import Client
+from crawler_ipx.video_streaming import SyntheticFrameSource, VideoReceiver, VideoStreamer
+
+from .utils import wait_for
+
+logger = logging.getLogger('ipx_logger')
+
+
+class ClosedCountingFrameSource(SyntheticFrameSource):
+
+    def __init__(self):
+        super().__init__(1024)
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+class TestVideoStreaming(unittest.TestCase):
+
+    def test_stream_synthetic_frames(self):
+        logger.info("\n\nRunning TestVideoStreaming - test_stream_synthetic_frames\n")
+        ipx_host = Host(port=0)
+        ipx_client = Client(ipx_host.get_name(), ipx_host.port, frame_source=SyntheticFrameSource(4096))
+        ipx_host.client, ipx_client.socket = socket.socketpair()
+        threading.Thread(target=ipx_client.run_in_slave_mode, daemon=True).start()
+
+        try:
+            response = ipx_host.start_video_streaming().result(timeout=5)
+            self.assertEqual(response["Content"], 'True')
+
+            deadline = time.time() + 5
+            while ipx_host.video_receiver.frames_received < 10 and time.time() < deadline:
+                time.sleep(0.05)
+
+            statistics = ipx_host.video_receiver.get_statistics()
+            self.assertGreaterEqual(statistics["FramesReceived"], 10)
+            self.assertGreater(statistics["FPS"], 0)
+            self.assertIsNotNone(statistics["AverageLatency"])
+            self.assertEqual(len(ipx_host.video_receiver.get_last_frame()), 4096)
+            self.assertEqual(statistics["BufferAllocations"], 0)
+            self.assertEqual(ipx_client.video_streamer.get_statistics()["BufferAllocations"], 0)
+
+            response = ipx_host.stop_video_streaming().result(timeout=5)
+            self.assertEqual(response["Content"], 'True')
+            self.assertIsNone(ipx_client.video_streamer)
+        finally:
+            ipx_client.stop_video_streaming()
+            ipx_host.stop_receiver()
+            ipx_host.client.close()
+            ipx_client.socket.close()
+            ipx_host.terminate()
+
+    def test_lost_video_connection(self):
+        logger.info("\n\nRunning TestVideoStreaming - test_lost_video_connection\n")
+        receiver = VideoReceiver('127.0.0.1')
+        receiver.start()
+        source = ClosedCountingFrameSource()
+        streamer = VideoStreamer(source, '127.0.0.1', receiver.port, CLIENT_USERNAME, CLIENT_PASSWORD)
+        try:
+            streamer.start()
+            self.assertTrue(wait_for(lambda: receiver.frames_received > 0))
+            receiver.stop()
+
+            # sender closes its socket, stop still joins the threads; caller's source is not closed
+            self.assertTrue(wait_for(lambda: not streamer.streaming))
+            self.assertEqual(streamer.socket.fileno(), -1)
+            streamer.stop()
+            self.assertIsNone(streamer.socket)
+            self.assertFalse(any(thread.is_alive() for thread in streamer.threads))
+            self.assertEqual(source.closed, 0)
+
+            # a source created for the streamer is closed with it
+            receiver = VideoReceiver('127.0.0.1')
+            receiver.start()
+            streamer = VideoStreamer(source, '127.0.0.1', receiver.port, CLIENT_USERNAME, CLIENT_PASSWORD,
+                                     owns_source=True)
+            streamer.start()
+            streamer.stop()
+            self.assertEqual(source.closed, 1)
+
+            # receiver closes a connection lost by the client before accepting the next one
+            peer = socket.create_connection(('127.0.0.1', receiver.port))
+            credentials = bytes('u:' + CLIENT_USERNAME + '\np:' + CLIENT_PASSWORD, 'utf-8')
+            peer.sendall(encode_frame(DATA_HEADER, CREDENTIALS_DATA_ID, credentials))
+            self.assertTrue(wait_for(lambda: receiver.connection is not None and receiver.connection.fileno() != -1))
+            connection = receiver.connection
+            peer.close()
+            self.assertTrue(wait_for(lambda: connection.fileno() == -1))
+        finally:
+            streamer.stop()
+            receiver.stop()
@@ -0,0 +1,16 @@
+import time
+
+
+def wait_for(condition, timeout=5.0):
+    """
+        Poll a condition until it is true, used by tests waiting for other threads.
+    :param condition: function returning bool
+    :param timeout: seconds to wait
+    :return: True if condition became true, False on timeout
+    """
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True